@@ -0,0 +1,193 @@
+"""Micro-benchmarks de validación y serialización de los esquemas de salida.
+
+Mide, por esquema y para un número realista de filas ORM:
+  - validar: construir el esquema desde objetos ORM (from_attributes)
+  - dump: model_dump() a diccionarios
+  - dump_json: model_dump_json() de cada fila
+  - respuesta: el camino de una ruta List[Esquema] (TypeAdapter + dump_json)
+
+Uso:
+    python benchmarks/bench_schemas.py --filas 1000
+    python benchmarks/bench_schemas.py --guardar-baseline benchmarks/results/schemas_base.json
+    python benchmarks/bench_schemas.py --baseline benchmarks/results/schemas_base.json --umbral 20
+
+Con --baseline el proceso termina con código 1 si alguna medición empeora más
+del umbral, para poder usarlo en CI.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("API_KEY", "bench")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import (  # noqa: E402
+    Boolean, Date, DateTime, Enum as SAEnum, Integer, LargeBinary, Numeric, String, Text, inspect,
+)
+
+import models  # noqa: E402
+import schemas  # noqa: E402
+from routers.audit_router import AuditLogResponse  # noqa: E402
+
+# (nombre, esquema de salida, modelo ORM) de las rutas de listado
+ESQUEMAS = [
+    ("FacturaOut", schemas.FacturaOut, models.FinancieroFactura),
+    ("AuditLogResponse", AuditLogResponse, models.AuditLog),
+    ("MuestraOut", schemas.MuestraOut, models.MolderiaMuestra),
+    ("Cliente", schemas.Cliente, models.CRMCliente),
+    ("ProyectoOut", schemas.ProyectoOut, models.Proyecto),
+    ("MoldeOut", schemas.MoldeOut, models.MolderiaMolde),
+    ("ImagenMuestraOut", schemas.ImagenMuestraOut, models.MolderiaImagenMuestra),
+    ("TallerOut", schemas.TallerOut, models.ProduccionTaller),
+    ("PlanOut", schemas.PlanOut, models.ProduccionPlan),
+    ("MaterialOut", schemas.MaterialOut, models.ProduccionMaterial),
+    ("PagoOut", schemas.PagoOut, models.FinancieroPago),
+    ("GastoOut", schemas.GastoOut, models.FinancieroGasto),
+    ("CuentaCobrarOut", schemas.CuentaCobrarOut, models.FinancieroCuentaCobrar),
+]
+
+OPERACIONES = ("validar", "dump", "dump_json", "respuesta")
+
+
+def _valor_columna(column, i: int, blob_bytes: int):
+    """Valor sintético plausible para una columna según su tipo"""
+    tipo = column.type
+    if isinstance(tipo, SAEnum):
+        if tipo.enum_class is not None:
+            return list(tipo.enum_class)[i % len(tipo.enum_class)]
+        return tipo.enums[i % len(tipo.enums)]
+    if isinstance(tipo, Boolean):
+        return i % 2 == 0
+    if isinstance(tipo, Integer):
+        return i + 1
+    if isinstance(tipo, Numeric):
+        return Decimal("1234.56") + i
+    if isinstance(tipo, DateTime):
+        return datetime(2024, 1, 1)
+    if isinstance(tipo, Date):
+        return date(2024, 1, 1)
+    if isinstance(tipo, LargeBinary):
+        return b"\x00" * blob_bytes if blob_bytes else None
+    if isinstance(tipo, Text):
+        return "Texto de ejemplo para el benchmark " * 4
+    if isinstance(tipo, String):
+        if "email" in column.name.lower():
+            return f"usuario{i}@example.com"
+        valor = f"{column.name.lower()}-{i}"
+        return valor[:tipo.length] if tipo.length else valor
+    return None
+
+
+def construir_filas(modelo, n: int, blob_bytes: int) -> list:
+    """Instancias ORM transitorias con todas las columnas pobladas"""
+    attrs = inspect(modelo).column_attrs
+    filas = []
+    for i in range(n):
+        datos = {attr.key: _valor_columna(attr.columns[0], i, blob_bytes) for attr in attrs}
+        filas.append(modelo(**datos))
+    return filas
+
+
+def _operaciones(esquema, filas) -> Dict[str, Callable[[], object]]:
+    adapter = TypeAdapter(List[esquema])
+    validadas = [esquema.model_validate(f) for f in filas]
+    return {
+        "validar": lambda: [esquema.model_validate(f) for f in filas],
+        "dump": lambda: [v.model_dump() for v in validadas],
+        "dump_json": lambda: [v.model_dump_json() for v in validadas],
+        "respuesta": lambda: adapter.dump_json(adapter.validate_python(filas, from_attributes=True)),
+    }
+
+
+def medir(funcion: Callable[[], object], repeticiones: int) -> float:
+    """Mejor tiempo (s) de varias ejecuciones; el mínimo es el más estable"""
+    return min(timeit.repeat(funcion, number=1, repeat=repeticiones))
+
+
+def ejecutar(filas_por_esquema: int, repeticiones: int, blob_bytes: int, seleccion=None) -> Dict[str, dict]:
+    resultados = {}
+    for nombre, esquema, modelo in ESQUEMAS:
+        if seleccion and nombre not in seleccion:
+            continue
+
+        filas = construir_filas(modelo, filas_por_esquema, blob_bytes)
+        operaciones = _operaciones(esquema, filas)
+        resultados[nombre] = {}
+        for operacion in OPERACIONES:
+            segundos = medir(operaciones[operacion], repeticiones)
+            resultados[nombre][operacion] = round(segundos / filas_por_esquema * 1e6, 3)
+
+    return resultados
+
+
+def comparar(actual: Dict[str, dict], baseline: Dict[str, dict], umbral: float) -> List[Tuple[str, str, float]]:
+    """Mediciones que empeoran más del umbral (%) respecto al baseline"""
+    regresiones = []
+    for nombre, ops in actual.items():
+        for operacion, us in ops.items():
+            previo = baseline.get(nombre, {}).get(operacion)
+            if not previo:
+                continue
+            delta = (us - previo) / previo * 100
+            if delta > umbral:
+                regresiones.append((nombre, operacion, delta))
+    return regresiones
+
+
+def imprimir(resultados: Dict[str, dict], filas: int) -> None:
+    print(f"µs por fila ({filas} filas por esquema)")
+    print(f"{'esquema':<18}" + "".join(f"{op:>12}" for op in OPERACIONES))
+    orden = sorted(resultados.items(), key=lambda item: item[1]["respuesta"], reverse=True)
+    for nombre, ops in orden:
+        print(f"{nombre:<18}" + "".join(f"{ops[op]:>12.2f}" for op in OPERACIONES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de esquemas Pydantic")
+    parser.add_argument("--filas", type=int, default=1000, help="Filas ORM por esquema")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--blob-bytes", type=int, default=0,
+                        help="Tamaño de las columnas BLOB (0 = NULL, como en la mayoría de filas)")
+    parser.add_argument("--esquemas", nargs="*", choices=[e[0] for e in ESQUEMAS])
+    parser.add_argument("--guardar-baseline", help="Guardar los resultados como baseline JSON")
+    parser.add_argument("--baseline", help="Comparar contra un baseline JSON")
+    parser.add_argument("--umbral", type=float, default=20.0, help="Regresión tolerada (%%)")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.filas, args.repeticiones, args.blob_bytes, args.esquemas)
+    imprimir(resultados, args.filas)
+
+    if args.guardar_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.guardar_baseline)), exist_ok=True)
+        with open(args.guardar_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "fecha": datetime.now().isoformat(),
+                "filas": args.filas,
+                "blob_bytes": args.blob_bytes,
+                "resultados": resultados,
+            }, f, indent=2)
+        print(f"\nBaseline guardado en {args.guardar_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["resultados"]
+        regresiones = comparar(resultados, baseline, args.umbral)
+        if regresiones:
+            print(f"\nRegresiones mayores a {args.umbral:.0f}%:")
+            for nombre, operacion, delta in regresiones:
+                print(f"  {nombre}.{operacion}: {delta:+.1f}%")
+            sys.exit(1)
+        print(f"\nSin regresiones mayores a {args.umbral:.0f}% respecto a {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
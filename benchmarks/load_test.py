@@ -0,0 +1,283 @@
+"""Prueba de carga de la API contra una base SQLite sembrada.
+
+Arranca main:app con uvicorn apuntando a la base de benchmarks, lanza
+peticiones concurrentes a las rutas principales y reporta p50/p95/p99 y
+throughput por ruta. Los resultados se guardan en JSON para compararlos
+entre corridas.
+
+Uso:
+    python benchmarks/seed_data.py --escala 1.0
+    python benchmarks/load_test.py --concurrencia 16 --peticiones 500
+    python benchmarks/load_test.py --comparar benchmarks/results/anterior.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from seed_data import DEFAULT_DB, ROOT_DIR, sqlite_url
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+API_KEY = "bench"
+
+# Tablas de las que se toman IDs aleatorios para las rutas de detalle
+TABLAS_ID = {
+    "clientes": ("CRM_CLIENTES", "ID_CLIENTE"),
+    "proyectos": ("PROYECTOS_PEDIDOS", "ID_PROYECTO"),
+    "moldes": ("MOLDERIA_MOLDES", "ID_MOLDE"),
+    "muestras": ("MOLDERIA_MUESTRAS", "ID_MUESTRA"),
+    "imagenes": ("MOLDERIA_IMAGENES_MUESTRAS", "ID_IMAGEN"),
+    "facturas": ("FINANCIERO_FACTURAS", "ID_FACTURA"),
+    "audit_logs": ("AUDIT_LOGS", "ID"),
+}
+
+
+def _pagina(rnd: random.Random, total: int, limite: int) -> int:
+    return rnd.randrange(max(1, total - limite))
+
+
+# nombre -> función que genera la URL a partir de los máximos de cada tabla
+ESCENARIOS: Dict[str, Callable[[random.Random, Dict[str, int]], str]] = {
+    "clientes_lista": lambda r, n: f"/clients/?skip={_pagina(r, n['clientes'], 100)}&limit=100",
+    "clientes_detalle": lambda r, n: f"/clients/{r.randint(1, n['clientes'])}",
+    "proyectos_lista": lambda r, n: f"/projects/?skip={_pagina(r, n['proyectos'], 100)}&limit=100",
+    "moldes_lista": lambda r, n: f"/moldes/?skip={_pagina(r, n['moldes'], 100)}&limit=100",
+    "muestras_lista": lambda r, n: f"/muestras/?skip={_pagina(r, n['muestras'], 100)}&limit=100",
+    "imagenes_lista": lambda r, n: f"/imagenes-muestras/?skip={_pagina(r, n['imagenes'], 20)}&limit=20",
+    "imagenes_detalle": lambda r, n: f"/imagenes-muestras/{r.randint(1, n['imagenes'])}",
+    "facturas_lista": lambda r, n: f"/financiero/facturas/?skip={_pagina(r, n['facturas'], 100)}&limit=100",
+    "audit_logs": lambda r, n: f"/audit/logs?skip={_pagina(r, n['audit_logs'], 100)}&limit=100",
+    "audit_stats": lambda r, n: "/audit/stats",
+    "talleres_lista": lambda r, n: "/produccion/talleres/",
+}
+
+
+def leer_maximos(db_path: str) -> Dict[str, int]:
+    """Máximo ID de cada tabla para generar rutas de detalle válidas"""
+    maximos = {}
+    with sqlite3.connect(db_path) as conn:
+        for nombre, (tabla, columna) in TABLAS_ID.items():
+            fila = conn.execute(f'SELECT MAX("{columna}") FROM "{tabla}"').fetchone()
+            maximos[nombre] = fila[0] or 1
+    return maximos
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def arrancar_servidor(db_path: str, puerto: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": sqlite_url(db_path),
+        "API_KEY": API_KEY,
+        "LOG_LEVEL": env.get("LOG_LEVEL", "WARNING"),
+    })
+    if workers > 1:
+        env["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="valbrand_prom_")
+
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(puerto),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=ROOT_DIR,
+        env=env,
+    )
+
+
+def esperar_servidor(base_url: str, proceso: subprocess.Popen, timeout: float = 30.0) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"uvicorn terminó con código {proceso.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a /health a tiempo")
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada"""
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[indice]
+
+
+async def ejecutar_escenario(
+    client: httpx.AsyncClient,
+    generador: Callable[[random.Random, Dict[str, int]], str],
+    maximos: Dict[str, int],
+    peticiones: int,
+    concurrencia: int,
+    semilla: int,
+) -> dict:
+    rnd = random.Random(semilla)
+    urls = [generador(rnd, maximos) for _ in range(peticiones)]
+    latencias: List[float] = []
+    estados: Dict[str, int] = {}
+    siguiente = iter(urls)
+
+    async def trabajador():
+        for url in siguiente:
+            inicio = time.perf_counter()
+            try:
+                response = await client.get(url)
+                await response.aread()
+                codigo = str(response.status_code)
+            except httpx.HTTPError as e:
+                codigo = type(e).__name__
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            estados[codigo] = estados.get(codigo, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    errores = sum(v for k, v in estados.items() if not k.startswith("2"))
+    return {
+        "peticiones": len(latencias),
+        "errores": errores,
+        "estados": estados,
+        "duracion_s": round(duracion, 3),
+        "throughput_rps": round(len(latencias) / duracion, 2) if duracion else 0.0,
+        "p50_ms": round(percentil(latencias, 50), 2),
+        "p95_ms": round(percentil(latencias, 95), 2),
+        "p99_ms": round(percentil(latencias, 99), 2),
+        "max_ms": round(latencias[-1], 2) if latencias else 0.0,
+    }
+
+
+async def correr(args, maximos: Dict[str, int], base_url: str) -> Dict[str, dict]:
+    nombres = args.rutas or list(ESCENARIOS)
+    limits = httpx.Limits(max_connections=args.concurrencia, max_keepalive_connections=args.concurrencia)
+    resultados = {}
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"X-API-Key": API_KEY},
+        limits=limits,
+        timeout=args.timeout,
+    ) as client:
+        for i, nombre in enumerate(nombres):
+            generador = ESCENARIOS[nombre]
+            if args.calentamiento:
+                await ejecutar_escenario(client, generador, maximos, args.calentamiento,
+                                         args.concurrencia, args.semilla + 1000 + i)
+            resultado = await ejecutar_escenario(client, generador, maximos, args.peticiones,
+                                                 args.concurrencia, args.semilla + i)
+            resultados[nombre] = resultado
+            print(
+                f"{nombre:<18} p50={resultado['p50_ms']:>8.1f}ms p95={resultado['p95_ms']:>8.1f}ms "
+                f"p99={resultado['p99_ms']:>8.1f}ms {resultado['throughput_rps']:>8.1f} req/s "
+                f"errores={resultado['errores']}"
+            )
+
+    return resultados
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual: Dict[str, dict], anterior_path: str) -> None:
+    """Imprimir la variación de p95 y throughput respecto a una corrida anterior"""
+    with open(anterior_path, encoding="utf-8") as f:
+        anterior = json.load(f)["resultados"]
+
+    print(f"\nComparación con {anterior_path}:")
+    for nombre, datos in actual.items():
+        previo = anterior.get(nombre)
+        if not previo or not previo["p95_ms"] or not previo["throughput_rps"]:
+            continue
+        delta_p95 = (datos["p95_ms"] - previo["p95_ms"]) / previo["p95_ms"] * 100
+        delta_rps = (datos["throughput_rps"] - previo["throughput_rps"]) / previo["throughput_rps"] * 100
+        print(f"{nombre:<18} p95 {delta_p95:+7.1f}%  throughput {delta_rps:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API sobre SQLite")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Base sembrada con seed_data.py")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn")
+    parser.add_argument("--concurrencia", type=int, default=16, help="Clientes concurrentes")
+    parser.add_argument("--peticiones", type=int, default=500, help="Peticiones por ruta")
+    parser.add_argument("--calentamiento", type=int, default=20, help="Peticiones descartadas por ruta")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout por petición (s)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--rutas", nargs="*", choices=sorted(ESCENARIOS), help="Subconjunto de escenarios")
+    parser.add_argument("--url", help="Usar un servidor ya levantado en lugar de arrancar uvicorn")
+    parser.add_argument("--salida", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        sys.exit(f"No existe {args.db}; generarla primero con benchmarks/seed_data.py")
+
+    maximos = leer_maximos(args.db)
+    proceso = None
+    base_url = args.url
+
+    if base_url is None:
+        puerto = _puerto_libre()
+        base_url = f"http://127.0.0.1:{puerto}"
+        proceso = arrancar_servidor(args.db, puerto, args.workers)
+
+    try:
+        if proceso is not None:
+            esperar_servidor(base_url, proceso)
+        resultados = asyncio.run(correr(args, maximos, base_url))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait(timeout=30)
+
+    salida = args.salida or os.path.join(
+        RESULTS_DIR, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump({
+            "fecha": datetime.now().isoformat(),
+            "commit": _git_commit(),
+            "configuracion": {
+                "db": os.path.abspath(args.db),
+                "maximos": maximos,
+                "workers": args.workers,
+                "concurrencia": args.concurrencia,
+                "peticiones": args.peticiones,
+                "calentamiento": args.calentamiento,
+            },
+            "resultados": resultados,
+        }, f, indent=2)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Genera una base SQLite con volúmenes realistas para los benchmarks.
+
+Uso:
+    python benchmarks/seed_data.py --db benchmarks/data/valbrand_bench.db --escala 1.0
+
+Con escala 1.0 se generan 100k clientes, 1M de logs de auditoría y miles de
+imágenes; usar --escala 0.01 para una corrida rápida.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = os.path.join(ROOT_DIR, "benchmarks", "data", "valbrand_bench.db")
+
+# Volúmenes con escala 1.0
+VOLUMENES = {
+    "clientes": 100_000,
+    "proyectos": 10_000,
+    "moldes": 30_000,
+    "muestras": 50_000,
+    "imagenes": 5_000,
+    "talleres": 200,
+    "planes": 20_000,
+    "facturas": 50_000,
+    "pagos": 100_000,
+    "gastos": 50_000,
+    "audit_logs": 1_000_000,
+}
+
+LOTE = 10_000
+
+
+def sqlite_url(path: str) -> str:
+    return f"sqlite:///{os.path.abspath(path)}"
+
+
+def _configurar_entorno(db_path: str) -> None:
+    # database.py crea el engine al importarse a partir de DATABASE_URL
+    os.environ["DATABASE_URL"] = sqlite_url(db_path)
+    os.environ.setdefault("API_KEY", "bench")
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+
+def crear_esquema(engine, metadata) -> None:
+    """Crear las tablas sin llaves foráneas (SQLite no necesita validarlas aquí)"""
+    from sqlalchemy import Column, MetaData, Table
+
+    destino = MetaData()
+    for table in metadata.tables.values():
+        columnas = [
+            Column(
+                c.name, c.type,
+                primary_key=c.primary_key,
+                nullable=c.nullable,
+                server_default=c.server_default,
+                index=c.index,
+                unique=c.unique,
+            )
+            for c in table.columns
+        ]
+        Table(table.name, destino, *columnas)
+    destino.drop_all(engine)
+    destino.create_all(engine)
+
+
+def _insertar(conn, table, filas) -> None:
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= LOTE:
+            conn.execute(table.insert(), lote)
+            lote = []
+    if lote:
+        conn.execute(table.insert(), lote)
+
+
+def _fecha(rnd: random.Random, inicio: date, dias: int) -> date:
+    return inicio + timedelta(days=rnd.randrange(dias))
+
+
+def poblar(engine, escala: float, semilla: int, tamano_imagen: int) -> dict:
+    """Insertar datos sintéticos; devuelve el número de filas por entidad"""
+    import models
+
+    rnd = random.Random(semilla)
+    n = {k: max(1, int(v * escala)) for k, v in VOLUMENES.items()}
+    inicio = date(2022, 1, 1)
+    ahora = datetime(2025, 1, 1)
+    t = models
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=OFF")
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+
+        _insertar(conn, t.CRMCliente.__table__, (
+            {
+                "ID_CLIENTE": i,
+                "NOMBRE": f"Cliente {i}",
+                "EMAIL": f"cliente{i}@example.com",
+                "CIUDAD": rnd.choice(["CDMX", "Monterrey", "Guadalajara", "Puebla"]),
+                "ESTADO": rnd.choice(["ACTIVO", "INACTIVO", "POTENCIAL"]),
+                "TIPO_CLIENTE": rnd.choice(["CONFECCION", "MOLDERIA", "BRANDING", "ECOMMERCE"]),
+                "FECHA_REGISTRO": ahora,
+                "FECHA_ACTUALIZACION": ahora,
+            }
+            for i in range(1, n["clientes"] + 1)
+        ))
+
+        _insertar(conn, t.Proyecto.__table__, (
+            {
+                "ID_PROYECTO": i,
+                "CODIGO_PROYECTO": f"PRY-{i:06d}",
+                "ID_CLIENTE": rnd.randint(1, n["clientes"]),
+                "NOMBRE_PROYECTO": f"Proyecto {i}",
+                "ID_TIPO_PROYECTO": rnd.randint(1, 4),
+                "ESTADO": rnd.choice(["PRESUPUESTO", "EN_PROCESO", "APROBADO", "FINALIZADO"]),
+                "PRIORIDAD": rnd.choice(["BAJA", "MEDIA", "ALTA", "URGENTE"]),
+                "PROGRESO_PORCENTAJE": 0,
+                "FECHA_CREACION": ahora,
+                "FECHA_ACTUALIZACION": ahora,
+            }
+            for i in range(1, n["proyectos"] + 1)
+        ))
+
+        _insertar(conn, t.MolderiaMolde.__table__, (
+            {
+                "ID_MOLDE": i,
+                "CODIGO_MOLDE": f"MLD-{i:06d}",
+                "ID_PROYECTO": rnd.randint(1, n["proyectos"]),
+                "NOMBRE_MOLDE": f"Molde {i}",
+                "TALLA": rnd.choice(["S", "M", "L", "XL"]),
+                "ESTADO": rnd.choice(["EN_DESARROLLO", "REVISION", "APROBADO"]),
+                "FECHA_CREACION": ahora,
+                "FECHA_ULTIMA_MODIFICACION": ahora,
+            }
+            for i in range(1, n["moldes"] + 1)
+        ))
+
+        _insertar(conn, t.MolderiaMuestra.__table__, (
+            {
+                "ID_MUESTRA": i,
+                "CODIGO_MUESTRA": f"MST-{i:06d}",
+                "ID_PROYECTO": rnd.randint(1, n["proyectos"]),
+                "ID_MOLDE": rnd.randint(1, n["moldes"]),
+                "NOMBRE_MUESTRA": f"Muestra {i}",
+                "ESTADO": rnd.choice(["PLANIFICADA", "EN_CONFECCION", "COMPLETADA", "APROBADA"]),
+                "FECHA_CREACION": ahora - timedelta(days=rnd.randrange(900)),
+                "COSTO": round(rnd.uniform(100, 5000), 2),
+            }
+            for i in range(1, n["muestras"] + 1)
+        ))
+
+        imagen = os.urandom(tamano_imagen)
+        _insertar(conn, t.MolderiaImagenMuestra.__table__, (
+            {
+                "ID_IMAGEN": i,
+                "ID_MUESTRA": rnd.randint(1, n["muestras"]),
+                "IMAGEN": imagen,
+                "NOMBRE_IMAGEN": f"imagen_{i}.jpg",
+                "FECHA_SUBIDA": ahora,
+                "ORDEN_VISUALIZACION": 0,
+            }
+            for i in range(1, n["imagenes"] + 1)
+        ))
+
+        _insertar(conn, t.ProduccionTaller.__table__, (
+            {
+                "ID_TALLER": i,
+                "nombre": f"Taller {i}",
+                "codigo": f"TLL-{i:04d}",
+                "capacidad": rnd.choice([500, 1000, 2000]),
+                "estado": "ACTIVO",
+                "fecha_reg": ahora,
+            }
+            for i in range(1, n["talleres"] + 1)
+        ))
+
+        _insertar(conn, t.ProduccionPlan.__table__, (
+            {
+                "ID_PLAN": i,
+                "codigo_plan": f"PLN-{i:06d}",
+                "id_proyecto": rnd.randint(1, n["proyectos"]),
+                "id_taller": rnd.randint(1, n["talleres"]),
+                "fecha_ini_est": _fecha(rnd, inicio, 900),
+                "estado": rnd.choice(["PLANIFICADO", "EN_PROCESO", "COMPLETADO"]),
+                "cantidad_prod": rnd.randint(50, 2000),
+                "cantidad_comp": 0,
+                "prioridad": "MEDIA",
+                "fecha_creacion": ahora,
+            }
+            for i in range(1, n["planes"] + 1)
+        ))
+
+        _insertar(conn, t.FinancieroFactura.__table__, (
+            {
+                "ID_FACTURA": i,
+                "NUMERO_FACTURA": f"FAC-{i:07d}",
+                "ID_PROYECTO": rnd.randint(1, n["proyectos"]),
+                "FECHA_EMISION": _fecha(rnd, inicio, 900),
+                "SUBTOTAL": 1000,
+                "DESCUENTO": 0,
+                "IMPUESTOS": 160,
+                "TOTAL": 1160,
+                "MONEDA": "MXN",
+                "TIPO_CAMBIO": 1,
+                "ESTADO": rnd.choice(["BORRADOR", "EMITIDA", "PAGADA"]),
+                "FECHA_CREACION": ahora,
+            }
+            for i in range(1, n["facturas"] + 1)
+        ))
+
+        _insertar(conn, t.FinancieroPago.__table__, (
+            {
+                "ID_PAGO": i,
+                "NUMERO_PAGO": f"PAG-{i:07d}",
+                "ID_FACTURA": rnd.randint(1, n["facturas"]),
+                "MONTO": round(rnd.uniform(100, 1160), 2),
+                "FECHA_PAGO": _fecha(rnd, inicio, 900),
+                "METODO_PAGO": rnd.choice(["TRANSFERENCIA", "EFECTIVO", "TARJETA"]),
+                "FECHA_REGISTRO": ahora,
+            }
+            for i in range(1, n["pagos"] + 1)
+        ))
+
+        _insertar(conn, t.FinancieroGasto.__table__, (
+            {
+                "ID_GASTO": i,
+                "NUMERO_GASTO": f"GAS-{i:07d}",
+                "ID_PROYECTO": rnd.randint(1, n["proyectos"]),
+                "CONCEPTO": "Insumos",
+                "MONTO": round(rnd.uniform(50, 5000), 2),
+                "MONEDA": "MXN",
+                "FECHA_GASTO": _fecha(rnd, inicio, 900),
+                "CATEGORIA": rnd.choice(["MATERIALES", "SERVICIOS", "NOMINA"]),
+                "DEDUCIBLE": True,
+                "FECHA_REGISTRO": ahora,
+            }
+            for i in range(1, n["gastos"] + 1)
+        ))
+
+        endpoints = ["/clients/", "/moldes/", "/muestras/", "/projects/", "/financiero/facturas/"]
+        _insertar(conn, t.AuditLog.__table__, (
+            {
+                "ID": i,
+                "ENDPOINT": rnd.choice(endpoints),
+                "METHOD": rnd.choice(["GET", "GET", "GET", "POST", "PUT"]),
+                "API_KEY": "bench",
+                "USER_AGENT": "bench",
+                "IP_ADDRESS": "127.0.0.1",
+                "STATUS_CODE": rnd.choice([200, 200, 200, 201, 404]),
+                "TIMESTAMP": ahora - timedelta(minutes=rnd.randrange(525_600)),
+            }
+            for i in range(1, n["audit_logs"] + 1)
+        ))
+
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poblar la base SQLite de benchmarks")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Ruta del archivo SQLite")
+    parser.add_argument("--escala", type=float, default=1.0, help="Factor sobre los volúmenes base")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--tamano-imagen", type=int, default=20_000, help="Bytes por imagen")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    _configurar_entorno(args.db)
+
+    from database import Base, engine
+    import models  # noqa: F401  (registra las tablas en Base.metadata)
+
+    inicio = time.perf_counter()
+    crear_esquema(engine, Base.metadata)
+    volumenes = poblar(engine, args.escala, args.semilla, args.tamano_imagen)
+    duracion = time.perf_counter() - inicio
+
+    for entidad, filas in volumenes.items():
+        print(f"{entidad:>12}: {filas:,}")
+    print(f"Base generada en {duracion:.1f}s: {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+# Máximo de elementos aceptados por una petición /bulk
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+
+
+def _pk_attr(model):
+    mapper = inspect(model)
+    return getattr(model, mapper.get_property_by_column(mapper.primary_key[0]).key)
+
+
+def bulk_insert(db: Session, model, rows: List[Dict], natural_key=None) -> List[int]:
+    """Insertar filas en una sola sentencia y devolver sus IDs en orden de entrada.
+
+    No hace commit: la transacción la controla el endpoint.
+    """
+    if not rows:
+        return []
+
+    pk_attr = _pk_attr(model)
+
+    if db.get_bind().dialect.insert_executemany_returning:
+        # SQLite 3.35+, PostgreSQL, MariaDB 10.5+: INSERT ... RETURNING por lotes
+        stmt = insert(model).returning(pk_attr, sort_by_parameter_order=True)
+        return list(db.scalars(stmt, rows))
+
+    if natural_key is not None:
+        # MySQL no tiene RETURNING: insertar en bloque y recuperar los IDs
+        # por la llave natural (única) de cada fila
+        db.execute(insert(model), rows)
+        keys = [row[natural_key.key] for row in rows]
+        ids = dict(db.execute(select(natural_key, pk_attr).where(natural_key.in_(keys))).all())
+        return [ids[key] for key in keys]
+
+    if db.get_bind().dialect.name == "mysql":
+        # Un solo INSERT de varias filas: InnoDB asigna a un "simple insert"
+        # IDs consecutivos y LAST_INSERT_ID() es el de la primera fila
+        # (supone auto_increment_increment = 1)
+        columnas = {attr.key: attr.columns[0] for attr in inspect(model).column_attrs}
+        valores = [{columnas[campo]: valor for campo, valor in row.items()} for row in rows]
+        primero = db.execute(insert(model).values(valores)).lastrowid
+        return list(range(primero, primero + len(rows)))
+
+    # Sin RETURNING ni llave natural, el ORM inserta fila a fila dentro de la
+    # misma transacción para obtener cada ID generado
+    objects = [model(**row) for row in rows]
+    db.add_all(objects)
+    db.flush()
+    return [getattr(obj, pk_attr.key) for obj in objects]
+
+
+def bulk_criteria(model, ids: Optional[List[int]], filtro: Optional[BaseModel]) -> list:
+    """Condiciones WHERE de una operación masiva a partir de IDs y/o un filtro.
+
+    Exige al menos una de las dos para no modificar la tabla completa por error.
+    """
+    criterios = []
+
+    if ids is not None:
+        if len(ids) > BULK_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Se admiten como máximo {BULK_MAX_ITEMS} IDs por petición"
+            )
+        criterios.append(_pk_attr(model).in_(ids))
+
+    if filtro is not None:
+        # Solo igualdad sobre los campos declarados en el esquema del filtro
+        for campo, valor in filtro.model_dump(exclude_none=True).items():
+            criterios.append(getattr(model, campo) == valor)
+
+    if not criterios:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Se requiere una lista de 'ids' o un 'filtro' con al menos un campo"
+        )
+    return criterios
+
+
+def bulk_update(db: Session, model, criterios: list, valores: Dict[str, Any]) -> int:
+    """UPDATE por conjunto; devuelve el número de filas afectadas (sin commit)"""
+    stmt = (
+        update(model)
+        .where(*criterios)
+        .values(**valores)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount
+
+
+def bulk_delete(db: Session, model, criterios: list) -> int:
+    """DELETE por conjunto; devuelve el número de filas eliminadas (sin commit)"""
+    stmt = delete(model).where(*criterios).execution_options(synchronize_session=False)
+    return db.execute(stmt).rowcount
@@ -1,8 +1,10 @@
 import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
 import pymysql
 pymysql.install_as_MySQLdb()
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 
@@ -25,11 +27,67 @@ def get_database_url():
     
     return f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
 
+# Zona horaria (offset fijo "+HH:MM") de las fechas automáticas. Si se define,
+# la sesión MySQL se fija a esa zona; si no, se usa la zona de la sesión que da
+# el servidor. En ambos casos NOW() y los valores que genera Python (ahora,
+# hoy) salen del mismo reloj sin importar la zona del host de la API
+DB_TIME_ZONE = os.getenv("DB_TIME_ZONE")
+
+
+def _zona_horaria(offset: str) -> timezone:
+    signo = -1 if offset.startswith("-") else 1
+    horas, minutos = offset.lstrip("+-").split(":")
+    return timezone(signo * timedelta(hours=int(horas), minutes=int(minutos)))
+
+
 # Crear el engine usando la URL construida
 engine = create_engine(get_database_url())
 
+if engine.dialect.name == "mysql" and DB_TIME_ZONE:
+    @event.listens_for(engine, "connect")
+    def _fijar_zona_horaria(dbapi_connection, connection_record):
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute("SET time_zone = %s", (DB_TIME_ZONE,))
+
+_zona: Optional[timezone] = _zona_horaria(DB_TIME_ZONE) if DB_TIME_ZONE else None
+
+
+def zona_horaria() -> timezone:
+    """Zona de las fechas automáticas: DB_TIME_ZONE o la de la sesión MySQL.
+
+    El offset del servidor se lee una vez por proceso (un cambio de horario de
+    verano se toma al reiniciar); otros motores (SQLite guarda
+    CURRENT_TIMESTAMP en UTC) usan UTC.
+    """
+    global _zona
+    if _zona is None:
+        if engine.dialect.name == "mysql":
+            with engine.connect() as conn:
+                minutos = conn.scalar(text("SELECT TIMESTAMPDIFF(MINUTE, UTC_TIMESTAMP(), NOW())"))
+            _zona = timezone(timedelta(minutes=int(minutos)))
+        else:
+            _zona = timezone.utc
+    return _zona
+
+
+def ahora_con_zona() -> datetime:
+    """Hora actual en la zona de la base, con zona (columnas DateTime(timezone=True))"""
+    return datetime.now(zona_horaria())
+
+
+def ahora() -> datetime:
+    """Hora actual en la zona de la base sin zona, como la devuelve NOW()"""
+    return ahora_con_zona().replace(tzinfo=None)
+
+
+def hoy() -> date:
+    """Fecha actual en la zona de la base, como la devuelve CURRENT_DATE"""
+    return ahora_con_zona().date()
+
 # Configurar la sesión
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: los objetos conservan sus valores tras el commit y la
+# respuesta se construye sin volver a consultar la base de datos
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base para los modelos
 Base = declarative_base()
@@ -0,0 +1,147 @@
+import csv
+import enum
+import io
+import tempfile
+from datetime import date, datetime
+from typing import Iterator, List, Optional
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import inspect, select
+from database import SessionLocal
+from query_utils import non_blob_attrs, non_blob_columns
+
+# Filas por lote leídas del cursor del servidor
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_FORMAT_PATTERN = "^(csv|xlsx)$"
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def build_export_query(
+    model,
+    date_column,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    *criterios,
+    **filtros
+):
+    """Construir el SELECT de exportación (sin BLOBs) con filtros opcionales"""
+    stmt = select(*non_blob_columns(model))
+
+    if fecha_desde:
+        stmt = stmt.where(date_column >= fecha_desde)
+
+    if fecha_hasta:
+        stmt = stmt.where(date_column <= fecha_hasta)
+
+    for criterio in criterios:
+        stmt = stmt.where(criterio)
+
+    for campo, valor in filtros.items():
+        if valor is not None:
+            stmt = stmt.where(getattr(model, campo) == valor)
+
+    # Orden por llave primaria para exportaciones reproducibles
+    return stmt.order_by(*inspect(model).primary_key)
+
+
+def _iter_partitions(stmt) -> Iterator[list]:
+    """Leer el resultado por lotes usando un cursor del lado del servidor"""
+    # La sesión vive dentro del generador porque la respuesta se envía
+    # después de que FastAPI cierra las dependencias de la petición
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            stmt.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_ROWS)
+        )
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _xlsx_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Excel no admite fechas con zona horaria
+        return value.replace(tzinfo=None)
+    return value
+
+
+def _csv_chunks(stmt, headers: List[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # BOM para que Excel detecte UTF-8 al abrir el archivo
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    yield buffer.getvalue()
+
+    for partition in _iter_partitions(stmt):
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows([_csv_value(v) for v in row] for row in partition)
+        yield buffer.getvalue()
+
+
+def _xlsx_chunks(stmt, headers: List[str]) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    # En modo write_only openpyxl vuelca las filas a disco en lugar de memoria
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+
+    for partition in _iter_partitions(stmt):
+        for row in partition:
+            sheet.append([_xlsx_value(v) for v in row])
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(64 * 1024)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_export(model, stmt, formato: str, nombre: str) -> StreamingResponse:
+    """Responder la exportación como CSV o XLSX en streaming"""
+    headers = non_blob_attrs(model)
+    fecha = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    if formato == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="La exportación a Excel requiere el paquete openpyxl"
+            )
+        content = _xlsx_chunks(stmt, headers)
+        media_type = XLSX_MEDIA_TYPE
+    else:
+        content = _csv_chunks(stmt, headers)
+        media_type = CSV_MEDIA_TYPE
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{nombre}_{fecha}.{formato}"'
+        }
+    )
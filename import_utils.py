@@ -0,0 +1,199 @@
+import csv
+import io
+import os
+import types
+from typing import AbstractSet, Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union, get_args, get_origin
+from fastapi import UploadFile
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, inspect, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+# Filas validadas y escritas por lote (un commit por lote)
+IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", "500"))
+
+# Máximo de filas con error detalladas en la respuesta
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+
+def _allows_none(annotation) -> bool:
+    return get_origin(annotation) in (Union, types.UnionType) and type(None) in get_args(annotation)
+
+
+def _iter_csv_chunks(archivo: UploadFile, chunk_rows: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """Leer el CSV por lotes de (número de línea, fila) sin cargarlo completo"""
+    # UploadFile ya está volcado a un archivo temporal; se decodifica al vuelo
+    # ("utf-8-sig" descarta el BOM que agrega Excel)
+    text = io.TextIOWrapper(archivo.file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        chunk = []
+        for row in reader:
+            chunk.append((reader.line_num, row))
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        # Evitar que el wrapper cierre el archivo subido al recolectarse
+        text.detach()
+
+
+def _clean_row(row: Dict[str, Any]) -> Dict[str, str]:
+    """Descartar columnas sin encabezado y celdas vacías"""
+    cleaned = {}
+    for campo, valor in row.items():
+        if campo is None or valor is None:
+            continue
+        valor = valor.strip()
+        if valor:
+            cleaned[campo.strip()] = valor
+    return cleaned
+
+
+def _format_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(p) for p in e['loc']) or 'fila'}: {e['msg']}"
+        for e in error.errors()
+    ]
+
+
+class _ImportReport:
+    def __init__(self):
+        self.procesadas = 0
+        self.creadas = 0
+        self.actualizadas = 0
+        self.con_error = 0
+        self.errores: List[Dict[str, Any]] = []
+
+    def add_error(self, fila: int, errores: List[str]) -> None:
+        self.con_error += 1
+        if len(self.errores) < IMPORT_MAX_ERRORS:
+            self.errores.append({"fila": fila, "errores": errores})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "procesadas": self.procesadas,
+            "creadas": self.creadas,
+            "actualizadas": self.actualizadas,
+            "con_error": self.con_error,
+            "errores": self.errores,
+        }
+
+
+def _write_chunk(
+    db: Session, model, key_attr, pk_attr, rows: List[Tuple[int, BaseModel, set]], excluidos: AbstractSet[str]
+) -> Tuple[int, int]:
+    """Upsert de un lote: un SELECT de llaves, un UPDATE y un INSERT por lotes.
+
+    Los campos de `excluidos` no se escriben. Devuelve (creadas, actualizadas).
+    """
+    # Si la llave se repite dentro del lote gana la última fila
+    by_key: Dict[Any, Tuple[int, BaseModel, set]] = {}
+    sin_llave = []
+    for item in rows:
+        key = getattr(item[1], key_attr.key)
+        if key is None:
+            sin_llave.append(item)
+        else:
+            by_key[key] = item
+
+    existentes = {}
+    if by_key:
+        existentes = dict(
+            db.execute(select(key_attr, pk_attr).where(key_attr.in_(list(by_key)))).all()
+        )
+
+    updates, inserts = [], []
+    actualizadas = 0
+    for key, (fila, datos, campos) in by_key.items():
+        if key in existentes:
+            # Solo se sobrescriben las columnas con valor en el CSV
+            cambios = datos.model_dump(include=campos - excluidos)
+            if cambios:
+                cambios[pk_attr.key] = existentes[key]
+                updates.append(cambios)
+            actualizadas += 1
+        else:
+            inserts.append(datos.model_dump(exclude=excluidos))
+    inserts.extend(datos.model_dump(exclude=excluidos) for _, datos, _ in sin_llave)
+
+    if updates:
+        # UPDATE ... WHERE pk = ? ejecutado como executemany
+        db.execute(update(model), updates)
+    if inserts:
+        db.execute(insert(model), inserts)
+
+    return len(inserts), actualizadas
+
+
+def import_csv(
+    db: Session,
+    archivo: UploadFile,
+    schema: Type[BaseModel],
+    model,
+    key_attr,
+    campos_excluidos: AbstractSet[str] = frozenset(),
+    al_escribir: Optional[Callable[[Session, List[Tuple[BaseModel, set]]], None]] = None,
+) -> Dict[str, Any]:
+    """Importar un CSV validando cada fila con `schema` y haciendo upsert por `key_attr`.
+
+    Cada lote se confirma por separado: un error de base de datos solo marca
+    las filas de su lote y la importación continúa. Los `campos_excluidos` no
+    se escriben en la tabla; `al_escribir` recibe las filas del lote (datos y
+    campos presentes en el CSV) después del upsert y antes del commit, para
+    aplicarlos por otra vía dentro de la misma transacción.
+    """
+    mapper = inspect(model)
+    pk_attr = getattr(model, mapper.get_property_by_column(mapper.primary_key[0]).key)
+
+    # Campos Optional sin valor por defecto: una columna ausente equivale a vacía
+    nullable_required = {
+        name: None
+        for name, field in schema.model_fields.items()
+        if field.is_required() and _allows_none(field.annotation)
+    }
+
+    report = _ImportReport()
+    chunks = _iter_csv_chunks(archivo, IMPORT_CHUNK_ROWS)
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            break
+        except (UnicodeDecodeError, csv.Error) as e:
+            # El resto del archivo no se puede leer de forma fiable
+            report.add_error(report.procesadas + 2, [f"archivo: {e}"])
+            break
+
+        validas = []
+        for fila, row in chunk:
+            report.procesadas += 1
+            cleaned = _clean_row(row)
+            try:
+                datos = schema.model_validate({**nullable_required, **cleaned})
+            except ValidationError as e:
+                report.add_error(fila, _format_errors(e))
+                continue
+            validas.append((fila, datos, set(cleaned) & set(schema.model_fields)))
+
+        if not validas:
+            continue
+
+        try:
+            creadas, actualizadas = _write_chunk(db, model, key_attr, pk_attr, validas, campos_excluidos)
+            if al_escribir is not None:
+                al_escribir(db, [(datos, campos) for _, datos, campos in validas])
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            mensaje = f"base de datos: {type(getattr(e, 'orig', None) or e).__name__}"
+            for fila, _, _ in validas:
+                report.add_error(fila, [mensaje])
+            continue
+
+        report.creadas += creadas
+        report.actualizadas += actualizadas
+
+    return report.as_dict()
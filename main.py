@@ -1,11 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime, timezone
 import logging
+from logging_config import setup_logging
 
 # Comentar o eliminar la importación del middleware de auditoría
 # from audit_middleware import AuditMiddleware
+from metrics import MetricsMiddleware, mark_worker_dead, render_metrics
+from sql_instrumentation import QueryStatsMiddleware
+from profiling import ProfilingMiddleware, instrument_routes
 
 from routers.clients import router as clients_router
 from routers.users import router as users_router
@@ -21,6 +25,7 @@ from routers.produccion_planes import router as planes_router
 from routers.produccion_detalle_plan import router as detalle_router
 from routers.produccion_materiales import router as materiales_router
 from routers.produccion_materiales_proyecto import router as matproy_router
+from routers.produccion_movimientos_stock import router as movimientos_stock_router
 from routers.branding_proyectos import router as branding_proyectos_router
 from routers.branding_entregables import router as branding_entregables_router
 from routers.branding_revisiones import router as branding_revisiones_router
@@ -29,6 +34,8 @@ from routers.financiero_facturas import router as facturas_router
 from routers.financiero_pagos import router as pagos_router
 from routers.financiero_gastos import router as gastos_router
 from routers.financiero_cuentas_cobrar import router as cuentas_router
+from routers.financiero_rentabilidad import router as rentabilidad_router
+from routers.financiero_flujo import router as flujo_router
 from routers import (
     ecommerce_proyectos,
     ecommerce_credenciales,
@@ -37,9 +44,10 @@ from routers import (
 )
 from routers.auth_routes import router as auth_router
 from routers.audit_router import router as audit_router  # Mantener el router de auditoría
+from routers.profiles import router as profiles_router
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (niveles por módulo con LOG_LEVELS, formato con LOG_FORMAT)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -50,15 +58,23 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-# SOLO CORS MIDDLEWARE
 # Eliminar o comentar el middleware de auditoría
 # app.add_middleware(AuditMiddleware)
 
+# Perfilado bajo demanda (cabecera X-Profile: 1) o por muestreo (PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+# Conteo y tiempo de consultas SQL por petición (cabecera Server-Timing)
+app.add_middleware(QueryStatsMiddleware)
+
+# Métricas de Prometheus (latencia y conteo por plantilla de ruta)
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # En producción especifica dominios específicos
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
 )
 
@@ -83,6 +99,7 @@ app.include_router(planes_router)
 app.include_router(detalle_router)
 app.include_router(materiales_router)
 app.include_router(matproy_router)
+app.include_router(movimientos_stock_router)
 
 # Branding routers
 app.include_router(branding_proyectos_router)
@@ -101,6 +118,8 @@ app.include_router(facturas_router)
 app.include_router(pagos_router)
 app.include_router(gastos_router)
 app.include_router(cuentas_router)
+app.include_router(rentabilidad_router)
+app.include_router(flujo_router)
 
 # Authentication router
 app.include_router(auth_router)
@@ -108,6 +127,12 @@ app.include_router(auth_router)
 # Audit router (mantener solo el router, no el middleware)
 app.include_router(audit_router)
 
+# Admin routers
+app.include_router(profiles_router)
+
+# Debe ejecutarse después de registrar todas las rutas
+instrument_routes(app)
+
 @app.get("/", tags=["root"])
 def read_root():
     """Endpoint raíz de la API"""
@@ -127,6 +152,16 @@ def health_check():
         "service": "ValBrand CRM API"
     }
 
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    content, content_type = render_metrics()
+    return Response(content=content, headers={"Content-Type": content_type})
+
+@app.on_event("shutdown")
+def shutdown_metrics():
+    mark_worker_dead()
+
 # Endpoint de prueba (ya no necesario para auditoría automática)
 @app.post("/test/audit", tags=["test"])
 def test_audit_endpoint():
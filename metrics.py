@@ -0,0 +1,151 @@
+# metrics.py
+import os
+import time
+from typing import Tuple
+from fastapi import Request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
+from database import engine
+
+# Con varios workers de uvicorn, prometheus_client guarda los valores en
+# archivos mmap dentro de este directorio (debe existir y vaciarse al arrancar)
+MULTIPROCESS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Etiqueta para peticiones que no coinciden con ninguna ruta (evita cardinalidad alta)
+UNMATCHED_ROUTE = "__unmatched__"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter(
+    "valbrand_http_requests_total",
+    "Peticiones HTTP atendidas",
+    ["method", "route", "status"]
+)
+
+HTTP_LATENCY = Histogram(
+    "valbrand_http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por plantilla de ruta",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+
+HTTP_IN_PROGRESS = Gauge(
+    "valbrand_http_requests_in_progress",
+    "Peticiones HTTP en curso",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "valbrand_db_queries_per_request",
+    "Consultas SQL ejecutadas por petición",
+    ["route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250)
+)
+
+DB_TIME_PER_REQUEST = Histogram(
+    "valbrand_db_time_per_request_seconds",
+    "Tiempo total en la base de datos por petición",
+    ["route"],
+    buckets=LATENCY_BUCKETS
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "valbrand_db_pool_checked_out",
+    "Conexiones del pool prestadas a una sesión",
+    multiprocess_mode="livesum"
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "valbrand_db_pool_connections",
+    "Conexiones abiertas por el pool",
+    multiprocess_mode="livesum"
+)
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    DB_POOL_CONNECTIONS.inc()
+
+
+@event.listens_for(engine, "close")
+def _on_close(dbapi_connection, connection_record):
+    DB_POOL_CONNECTIONS.dec()
+
+
+@event.listens_for(engine, "close_detached")
+def _on_close_detached(dbapi_connection):
+    DB_POOL_CONNECTIONS.dec()
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def get_route_template(request: Request) -> str:
+    """Obtener la plantilla de la ruta (p. ej. /moldes/{molde_id}) de la petición"""
+    route = request.scope.get("route")
+    if route is not None:
+        return route.path
+
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        method = request.method
+        route = get_route_template(request)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start_time = time.perf_counter()
+        status_code = 500
+
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - start_time)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            in_progress.dec()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Generar el texto de exposición de Prometheus"""
+    if MULTIPROCESS_DIR:
+        # Agregar los valores de todos los workers en un registro temporal
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """Descartar los gauges "live" del worker actual al apagarse"""
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,95 @@
+"""Aplicar las migraciones de esquema (Alembic) con estimación previa.
+
+Uso:
+    python migrate.py --dry-run              # pendientes, tamaño de tablas y SQL a ejecutar
+    python migrate.py                        # upgrade hasta head
+    python migrate.py --revision 0001        # upgrade hasta una revisión concreta
+    python migrate.py --stamp head           # marcar como aplicada (base creada con create_all)
+
+También se puede usar alembic directamente (alembic upgrade head, alembic
+revision -m "..."); este script solo agrega la estimación del dry-run.
+"""
+import argparse
+import os
+import sys
+from typing import List
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from alembic.runtime.migration import MigrationContext  # noqa: E402
+from alembic.script import ScriptDirectory  # noqa: E402
+
+from database import engine  # noqa: E402
+from migration_utils import LARGE_TABLE_ROWS, estimate_table_sizes  # noqa: E402
+
+
+def alembic_config() -> Config:
+    return Config(os.path.join(ROOT_DIR, "alembic.ini"))
+
+
+def revisiones_pendientes(script: ScriptDirectory, actual, destino: str) -> List:
+    """Revisiones entre la actual y el destino, en orden de aplicación"""
+    return list(reversed(list(script.iterate_revisions(destino, actual))))
+
+
+def dry_run(config: Config, destino: str) -> None:
+    script = ScriptDirectory.from_config(config)
+
+    with engine.connect() as conn:
+        actual = MigrationContext.configure(conn).get_current_revision()
+        pendientes = revisiones_pendientes(script, actual, destino)
+        if not pendientes:
+            print(f"Base al día (revisión {actual})")
+            return
+
+        tablas = sorted({t for rev in pendientes for t in getattr(rev.module, "tablas_afectadas", [])})
+        tamanos = estimate_table_sizes(conn, tablas)
+
+    print(f"Revisión actual: {actual or '(ninguna)'}")
+    print("Pendientes:")
+    for rev in pendientes:
+        print(f"  {rev.revision}  {rev.doc}")
+
+    if tablas:
+        print(f"\n{'tabla':<32}{'filas':>12}{'datos MB':>10}{'índices MB':>12}")
+        for tabla in tablas:
+            info = tamanos.get(tabla)
+            if info is None:
+                print(f"{tabla:<32}{'(no existe)':>12}")
+                continue
+            datos = "-" if info["datos_mb"] is None else f"{info['datos_mb']:.1f}"
+            indices = "-" if info["indices_mb"] is None else f"{info['indices_mb']:.1f}"
+            aviso = "  <- tabla grande" if info["filas"] >= LARGE_TABLE_ROWS else ""
+            print(f"{tabla:<32}{info['filas']:>12}{datos:>10}{indices:>12}{aviso}")
+
+    # El SQL offline no comprueba índices existentes: en la ejecución real
+    # se omiten los que ya cubren las mismas columnas
+    print("\nSQL a ejecutar:\n")
+    rango = f"{actual}:{destino}" if actual else destino
+    command.upgrade(config, rango, sql=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migraciones de esquema")
+    parser.add_argument("--revision", default="head", help="Revisión destino (por defecto head)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Mostrar pendientes, tamaño de las tablas afectadas y el SQL sin aplicarlo")
+    parser.add_argument("--stamp", metavar="REVISION",
+                        help="Registrar la revisión como aplicada sin ejecutar DDL")
+    args = parser.parse_args()
+
+    config = alembic_config()
+    if args.stamp:
+        command.stamp(config, args.stamp)
+    elif args.dry_run:
+        dry_run(config, args.revision)
+    else:
+        command.upgrade(config, args.revision)
+
+
+if __name__ == "__main__":
+    main()
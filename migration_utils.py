@@ -0,0 +1,102 @@
+import logging
+from typing import Dict, List, Sequence
+from alembic import context, op
+from sqlalchemy import Column, bindparam, func, inspect, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Tablas a partir de las cuales el dry-run advierte sobre la duración del DDL
+LARGE_TABLE_ROWS = 1_000_000
+
+
+def _is_mysql() -> bool:
+    return op.get_context().dialect.name == "mysql"
+
+
+def _quote(nombre: str) -> str:
+    return f"`{nombre}`"
+
+
+def _existing_indexes(tabla: str) -> List[dict]:
+    # En modo offline (--sql) no hay conexión: se emite el DDL sin comprobar
+    if context.is_offline_mode():
+        return []
+    return inspect(op.get_bind()).get_indexes(tabla)
+
+
+def create_index_online(nombre: str, tabla: str, columnas: Sequence[str]) -> None:
+    """Crear un índice sin bloquear escrituras en MySQL (ALGORITHM=INPLACE, LOCK=NONE).
+
+    Se omite si ya existe con ese nombre o si otro índice empieza por las mismas
+    columnas (p. ej. el índice implícito que MySQL crea para una FOREIGN KEY).
+    """
+    columnas = list(columnas)
+    for indice in _existing_indexes(tabla):
+        if indice["name"] == nombre or indice["column_names"][:len(columnas)] == columnas:
+            logger.info("Índice %s omitido: ya existe %s sobre esas columnas", nombre, indice["name"])
+            return
+
+    if _is_mysql():
+        op.execute(
+            f"ALTER TABLE {_quote(tabla)} "
+            f"ADD INDEX {_quote(nombre)} ({', '.join(_quote(c) for c in columnas)}), "
+            "ALGORITHM=INPLACE, LOCK=NONE"
+        )
+    else:
+        op.create_index(nombre, tabla, columnas)
+
+
+def drop_index_online(nombre: str, tabla: str) -> None:
+    """Eliminar un índice creado por create_index_online, si existe"""
+    if not context.is_offline_mode() and nombre not in {i["name"] for i in _existing_indexes(tabla)}:
+        return
+
+    if _is_mysql():
+        op.execute(
+            f"ALTER TABLE {_quote(tabla)} DROP INDEX {_quote(nombre)}, ALGORITHM=INPLACE, LOCK=NONE"
+        )
+    else:
+        op.drop_index(nombre, table_name=tabla)
+
+
+def add_column_online(tabla: str, columna: Column) -> None:
+    """Agregar una columna sin bloquear escrituras en MySQL (ALGORITHM=INPLACE, LOCK=NONE)"""
+    if _is_mysql():
+        ddl = CreateColumn(columna).compile(dialect=op.get_context().dialect)
+        op.execute(f"ALTER TABLE {_quote(tabla)} ADD COLUMN {ddl}, ALGORITHM=INPLACE, LOCK=NONE")
+    else:
+        op.add_column(tabla, columna)
+
+
+def estimate_table_sizes(conn: Connection, tablas: Sequence[str]) -> Dict[str, dict]:
+    """Filas y tamaño aproximados de cada tabla.
+
+    En MySQL se leen de information_schema (estimaciones de InnoDB, sin recorrer
+    la tabla); en otros motores se cuenta con COUNT(*).
+    """
+    tamanos = {}
+    if conn.dialect.name == "mysql":
+        filas = conn.execute(
+            text(
+                "SELECT TABLE_NAME, TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH "
+                "FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN :tablas"
+            ).bindparams(bindparam("tablas", expanding=True)),
+            {"tablas": list(tablas)},
+        ).all()
+        for nombre, filas_aprox, datos, indices in filas:
+            tamanos[nombre] = {
+                "filas": int(filas_aprox or 0),
+                "datos_mb": round((datos or 0) / 1024 / 1024, 1),
+                "indices_mb": round((indices or 0) / 1024 / 1024, 1),
+            }
+        return tamanos
+
+    existentes = set(inspect(conn).get_table_names())
+    for nombre in tablas:
+        if nombre in existentes:
+            filas = conn.execute(select(func.count()).select_from(table(nombre))).scalar_one()
+            tamanos[nombre] = {"filas": filas, "datos_mb": None, "indices_mb": None}
+    return tamanos
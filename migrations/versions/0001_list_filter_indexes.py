@@ -0,0 +1,76 @@
+"""Índices para los filtros y el orden de los listados
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00
+
+Solo las columnas indexadas admiten filtro u orden en la API
+(query_utils.list_filters); estos son los índices declarados con index=True
+en models.py para id_proyecto, id_cliente, estado, llaves de registros padre
+y fechas de documentos.
+"""
+from migration_utils import create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas)
+INDICES = [
+    ("ix_CRM_CLIENTES_ESTADO", "CRM_CLIENTES", ["ESTADO"]),
+    ("ix_PROYECTOS_PEDIDOS_ID_CLIENTE", "PROYECTOS_PEDIDOS", ["ID_CLIENTE"]),
+    ("ix_PROYECTOS_PEDIDOS_ESTADO", "PROYECTOS_PEDIDOS", ["ESTADO"]),
+    ("ix_MOLDERIA_MOLDES_ID_PROYECTO", "MOLDERIA_MOLDES", ["ID_PROYECTO"]),
+    ("ix_MOLDERIA_MOLDES_ESTADO", "MOLDERIA_MOLDES", ["ESTADO"]),
+    ("ix_MOLDERIA_ARCHIVOS_ID_MOLDE", "MOLDERIA_ARCHIVOS", ["ID_MOLDE"]),
+    ("ix_MOLDERIA_MUESTRAS_ID_PROYECTO", "MOLDERIA_MUESTRAS", ["ID_PROYECTO"]),
+    ("ix_MOLDERIA_MUESTRAS_ID_MOLDE", "MOLDERIA_MUESTRAS", ["ID_MOLDE"]),
+    ("ix_MOLDERIA_MUESTRAS_ESTADO", "MOLDERIA_MUESTRAS", ["ESTADO"]),
+    ("ix_MOLDERIA_IMAGENES_MUESTRAS_ID_MUESTRA", "MOLDERIA_IMAGENES_MUESTRAS", ["ID_MUESTRA"]),
+    ("ix_PRODUCCION_TALLERES_estado", "PRODUCCION_TALLERES", ["estado"]),
+    ("ix_PRODUCCION_PLANES_id_proyecto", "PRODUCCION_PLANES", ["id_proyecto"]),
+    ("ix_PRODUCCION_PLANES_id_taller", "PRODUCCION_PLANES", ["id_taller"]),
+    ("ix_PRODUCCION_PLANES_estado", "PRODUCCION_PLANES", ["estado"]),
+    ("ix_PRODUCCION_PLANES_fecha_ini_est", "PRODUCCION_PLANES", ["fecha_ini_est"]),
+    ("ix_PRODUCCION_DETALLE_PLAN_id_plan", "PRODUCCION_DETALLE_PLAN", ["id_plan"]),
+    ("ix_PRODUCCION_DETALLE_PLAN_estado", "PRODUCCION_DETALLE_PLAN", ["estado"]),
+    ("ix_PRODUCCION_MATERIALES_categoria", "PRODUCCION_MATERIALES", ["categoria"]),
+    ("ix_PRODUCCION_MATERIALES_PROYECTO_id_proyecto", "PRODUCCION_MATERIALES_PROYECTO", ["id_proyecto"]),
+    ("ix_PRODUCCION_MATERIALES_PROYECTO_id_material", "PRODUCCION_MATERIALES_PROYECTO", ["id_material"]),
+    ("ix_BRANDING_PROYECTOS_ID_PROYECTO", "BRANDING_PROYECTOS", ["ID_PROYECTO"]),
+    ("ix_BRANDING_PROYECTOS_ESTADO", "BRANDING_PROYECTOS", ["ESTADO"]),
+    ("ix_BRANDING_ENTREGABLES_ID_PROYECTO_BRANDING", "BRANDING_ENTREGABLES", ["ID_PROYECTO_BRANDING"]),
+    ("ix_BRANDING_REVISIONES_ID_PROYECTO_BRANDING", "BRANDING_REVISIONES", ["ID_PROYECTO_BRANDING"]),
+    ("ix_BRANDING_FEEDBACK_FECHAS_ID_PROYECTO_BRANDING", "BRANDING_FEEDBACK_FECHAS", ["ID_PROYECTO_BRANDING"]),
+    ("ix_ECOMMERCE_PROYECTOS_id_proyecto", "ECOMMERCE_PROYECTOS", ["id_proyecto"]),
+    ("ix_ECOMMERCE_PROYECTOS_estado", "ECOMMERCE_PROYECTOS", ["estado"]),
+    ("ix_ECOMMERCE_CREDENCIALES_id_proyecto_ecommerce", "ECOMMERCE_CREDENCIALES", ["id_proyecto_ecommerce"]),
+    ("ix_ECOMMERCE_DOCUMENTOS_id_proyecto_ecommerce", "ECOMMERCE_DOCUMENTOS", ["id_proyecto_ecommerce"]),
+    ("ix_ECOMMERCE_DATOS_MARCA_id_proyecto_ecommerce", "ECOMMERCE_DATOS_MARCA", ["id_proyecto_ecommerce"]),
+    ("ix_FINANCIERO_FACTURAS_ID_PROYECTO", "FINANCIERO_FACTURAS", ["ID_PROYECTO"]),
+    ("ix_FINANCIERO_FACTURAS_ESTADO", "FINANCIERO_FACTURAS", ["ESTADO"]),
+    ("ix_FINANCIERO_FACTURAS_FECHA_EMISION", "FINANCIERO_FACTURAS", ["FECHA_EMISION"]),
+    ("ix_FINANCIERO_PAGOS_ID_FACTURA", "FINANCIERO_PAGOS", ["ID_FACTURA"]),
+    ("ix_FINANCIERO_PAGOS_FECHA_PAGO", "FINANCIERO_PAGOS", ["FECHA_PAGO"]),
+    ("ix_FINANCIERO_GASTOS_ID_PROYECTO", "FINANCIERO_GASTOS", ["ID_PROYECTO"]),
+    ("ix_FINANCIERO_GASTOS_CATEGORIA", "FINANCIERO_GASTOS", ["CATEGORIA"]),
+    ("ix_FINANCIERO_GASTOS_FECHA_GASTO", "FINANCIERO_GASTOS", ["FECHA_GASTO"]),
+    ("ix_FINANCIERO_CUENTAS_COBRAR_ID_CLIENTE", "FINANCIERO_CUENTAS_COBRAR", ["ID_CLIENTE"]),
+    ("ix_FINANCIERO_CUENTAS_COBRAR_ESTADO", "FINANCIERO_CUENTAS_COBRAR", ["ESTADO"]),
+    ("ix_FINANCIERO_CUENTAS_COBRAR_FECHA_VENCIMIENTO", "FINANCIERO_CUENTAS_COBRAR", ["FECHA_VENCIMIENTO"]),
+]
+
+# Tablas cuyo tamaño estima `python migrate.py --dry-run`
+tablas_afectadas = sorted({tabla for _, tabla, _ in INDICES})
+
+
+def upgrade() -> None:
+    for nombre, tabla, columnas in INDICES:
+        create_index_online(nombre, tabla, columnas)
+
+
+def downgrade() -> None:
+    for nombre, tabla, _ in reversed(INDICES):
+        drop_index_online(nombre, tabla)
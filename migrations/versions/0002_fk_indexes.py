@@ -0,0 +1,42 @@
+"""Índices de las llaves foráneas restantes y de AUDIT_LOGS
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00
+
+AUDIT_LOGS es la tabla más grande: sus índices se crean en línea
+(ALGORITHM=INPLACE, LOCK=NONE) para no bloquear la escritura de logs.
+"""
+from migration_utils import create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas)
+INDICES = [
+    ("ix_USUARIOS_ID_ROL", "USUARIOS", ["ID_ROL"]),
+    ("ix_PROYECTOS_PEDIDOS_ID_TIPO_PROYECTO", "PROYECTOS_PEDIDOS", ["ID_TIPO_PROYECTO"]),
+    ("ix_PRODUCCION_DETALLE_PLAN_id_etapa", "PRODUCCION_DETALLE_PLAN", ["id_etapa"]),
+    ("ix_FINANCIERO_FACTURAS_CREADA_POR", "FINANCIERO_FACTURAS", ["CREADA_POR"]),
+    ("ix_FINANCIERO_PAGOS_REGISTRADO_POR", "FINANCIERO_PAGOS", ["REGISTRADO_POR"]),
+    ("ix_FINANCIERO_GASTOS_REGISTRADO_POR", "FINANCIERO_GASTOS", ["REGISTRADO_POR"]),
+    ("ix_FINANCIERO_CUENTAS_COBRAR_ID_FACTURA", "FINANCIERO_CUENTAS_COBRAR", ["ID_FACTURA"]),
+    ("ix_AUDIT_LOGS_API_KEY_TIMESTAMP", "AUDIT_LOGS", ["API_KEY", "TIMESTAMP"]),
+    ("ix_AUDIT_LOGS_TIMESTAMP", "AUDIT_LOGS", ["TIMESTAMP"]),
+]
+
+# Tablas cuyo tamaño estima `python migrate.py --dry-run`
+tablas_afectadas = sorted({tabla for _, tabla, _ in INDICES})
+
+
+def upgrade() -> None:
+    for nombre, tabla, columnas in INDICES:
+        create_index_online(nombre, tabla, columnas)
+
+
+def downgrade() -> None:
+    for nombre, tabla, _ in reversed(INDICES):
+        drop_index_online(nombre, tabla)
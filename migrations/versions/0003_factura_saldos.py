@@ -0,0 +1,51 @@
+"""Monto pagado y saldo de facturas
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00
+
+Agrega FINANCIERO_FACTURAS.MONTO_PAGADO y SALDO (con índice para el filtro de
+facturas abiertas) y los inicializa desde FINANCIERO_PAGOS. A partir de aquí
+los mantiene services.facturacion; `python -m services.facturacion` verifica
+que sigan cuadrando.
+"""
+import sqlalchemy as sa
+from alembic import op
+from migration_utils import add_column_online, create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Tablas cuyo tamaño estima `python migrate.py --dry-run`
+tablas_afectadas = ["FINANCIERO_FACTURAS", "FINANCIERO_PAGOS"]
+
+
+def upgrade() -> None:
+    add_column_online(
+        "FINANCIERO_FACTURAS",
+        sa.Column("MONTO_PAGADO", sa.DECIMAL(18, 2), nullable=False, server_default="0"),
+    )
+    add_column_online(
+        "FINANCIERO_FACTURAS",
+        sa.Column("SALDO", sa.DECIMAL(18, 2), nullable=False, server_default="0"),
+    )
+
+    # Dos sentencias: MySQL evalúa el SET de izquierda a derecha con los
+    # valores ya asignados y PostgreSQL/SQLite con los originales
+    op.execute(
+        "UPDATE FINANCIERO_FACTURAS SET MONTO_PAGADO = COALESCE(("
+        "SELECT SUM(p.MONTO) FROM FINANCIERO_PAGOS p "
+        "WHERE p.ID_FACTURA = FINANCIERO_FACTURAS.ID_FACTURA), 0)"
+    )
+    op.execute("UPDATE FINANCIERO_FACTURAS SET SALDO = TOTAL - MONTO_PAGADO")
+
+    create_index_online("ix_FINANCIERO_FACTURAS_SALDO", "FINANCIERO_FACTURAS", ["SALDO"])
+
+
+def downgrade() -> None:
+    drop_index_online("ix_FINANCIERO_FACTURAS_SALDO", "FINANCIERO_FACTURAS")
+    op.drop_column("FINANCIERO_FACTURAS", "SALDO")
+    op.drop_column("FINANCIERO_FACTURAS", "MONTO_PAGADO")
@@ -0,0 +1,38 @@
+"""Flujo de efectivo diario
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00
+
+Crea FINANCIERO_FLUJO_DIARIO vacía. La carga inicial se hace aparte, por tramos
+de días y con un commit por tramo, para no sostener una transacción larga
+sobre pagos y gastos:
+    python -m services.flujo
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Tablas cuyo tamaño estima `python migrate.py --dry-run`
+tablas_afectadas = ["FINANCIERO_PAGOS", "FINANCIERO_GASTOS"]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "FINANCIERO_FLUJO_DIARIO",
+        sa.Column("FECHA", sa.Date, primary_key=True),
+        sa.Column("MONEDA", sa.String(3), primary_key=True),
+        sa.Column("ENTRADAS", sa.DECIMAL(18, 2), nullable=False, server_default="0"),
+        sa.Column("SALIDAS", sa.DECIMAL(18, 2), nullable=False, server_default="0"),
+        sa.Column("NUM_PAGOS", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("NUM_GASTOS", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("FINANCIERO_FLUJO_DIARIO")
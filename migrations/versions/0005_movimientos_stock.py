@@ -0,0 +1,64 @@
+"""Libro de movimientos de stock y cortes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 13:00:00
+
+Crea PRODUCCION_MOVIMIENTOS_STOCK y PRODUCCION_STOCK_CORTES. El stock_actual
+vigente de cada material queda como corte de apertura (último movimiento 0),
+así la verificación parte del valor actual sin movimientos históricos.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# Tablas cuyo tamaño estima `python migrate.py --dry-run`
+tablas_afectadas = ["PRODUCCION_MATERIALES"]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "PRODUCCION_MOVIMIENTOS_STOCK",
+        sa.Column("ID_MOVIMIENTO", sa.Integer, primary_key=True),
+        sa.Column("id_material", sa.Integer,
+                  sa.ForeignKey("PRODUCCION_MATERIALES.ID_MATERIAL", ondelete="CASCADE"), nullable=False),
+        sa.Column("tipo", sa.Enum("ENTRADA", "SALIDA", "AJUSTE", name="produccion_movimiento_tipo"), nullable=False),
+        sa.Column("cantidad", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("stock_resultante", sa.DECIMAL(10, 2)),
+        sa.Column("id_proyecto", sa.Integer, sa.ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO")),
+        sa.Column("referencia", sa.String(100)),
+        sa.Column("notas", sa.Text),
+        sa.Column("registrado_por", sa.Integer),
+        sa.Column("fecha", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_index("ix_PRODUCCION_MOVIMIENTOS_STOCK_id_material", "PRODUCCION_MOVIMIENTOS_STOCK", ["id_material"])
+    op.create_index("ix_PRODUCCION_MOVIMIENTOS_STOCK_id_proyecto", "PRODUCCION_MOVIMIENTOS_STOCK", ["id_proyecto"])
+    op.create_index("ix_PRODUCCION_MOVIMIENTOS_STOCK_fecha", "PRODUCCION_MOVIMIENTOS_STOCK", ["fecha"])
+
+    op.create_table(
+        "PRODUCCION_STOCK_CORTES",
+        sa.Column("ID_CORTE", sa.Integer, primary_key=True),
+        sa.Column("id_material", sa.Integer,
+                  sa.ForeignKey("PRODUCCION_MATERIALES.ID_MATERIAL", ondelete="CASCADE"), nullable=False),
+        sa.Column("ultimo_movimiento", sa.Integer, nullable=False),
+        sa.Column("stock", sa.DECIMAL(12, 2), nullable=False),
+        sa.Column("fecha_corte", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_PRODUCCION_STOCK_CORTES_MATERIAL_ULTIMO", "PRODUCCION_STOCK_CORTES", ["id_material", "ultimo_movimiento"]
+    )
+
+    op.execute(
+        "INSERT INTO PRODUCCION_STOCK_CORTES (id_material, ultimo_movimiento, stock) "
+        "SELECT ID_MATERIAL, 0, COALESCE(stock_actual, 0) FROM PRODUCCION_MATERIALES"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("PRODUCCION_STOCK_CORTES")
+    op.drop_table("PRODUCCION_MOVIMIENTOS_STOCK")
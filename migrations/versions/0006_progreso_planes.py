@@ -0,0 +1,34 @@
+"""Avance de planes de producción
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 14:00:00
+
+Agrega PRODUCCION_PLANES.progreso_porcentaje. Desde aquí services.progreso
+mantiene el avance de planes y proyectos en cada cambio de etapas; para el
+valor inicial de los existentes ejecutar después:
+    python -m services.progreso
+"""
+import sqlalchemy as sa
+from alembic import op
+from migration_utils import add_column_online
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Tablas cuyo tamaño estima `python migrate.py --dry-run`
+tablas_afectadas = ["PRODUCCION_PLANES"]
+
+
+def upgrade() -> None:
+    add_column_online(
+        "PRODUCCION_PLANES",
+        sa.Column("progreso_porcentaje", sa.DECIMAL(5, 2), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("PRODUCCION_PLANES", "progreso_porcentaje")
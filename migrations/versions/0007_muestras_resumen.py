@@ -0,0 +1,51 @@
+"""Resumen de muestras para analítica
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 15:00:00
+
+Crea MOLDERIA_MUESTRAS_RESUMEN vacía. La llena services.muestras, que debe
+programarse como job nocturno; ejecutarlo una vez después de migrar:
+    python -m services.muestras
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Tablas cuyo tamaño estima `python migrate.py --dry-run`
+tablas_afectadas = ["MOLDERIA_MUESTRAS"]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "MOLDERIA_MUESTRAS_RESUMEN",
+        sa.Column("MES", sa.Date, primary_key=True),
+        sa.Column("ID_PROYECTO", sa.Integer, primary_key=True),
+        sa.Column("ID_MOLDE", sa.Integer, primary_key=True),
+        sa.Column("ESTADO", sa.String(30), primary_key=True),
+        sa.Column("MUESTRAS", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("ENTREGADAS", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("A_TIEMPO", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("CON_RETRASO", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("VENCIDAS_PENDIENTES", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("DIAS_CICLO_TOTAL", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("DIAS_RETRASO_TOTAL", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("CICLO_MIN", sa.Integer),
+        sa.Column("CICLO_MAX", sa.Integer),
+        sa.Column("CICLO_0_7", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("CICLO_8_14", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("CICLO_15_30", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("CICLO_31_MAS", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("COSTO_TOTAL", sa.DECIMAL(14, 2), nullable=False, server_default="0"),
+        sa.Column("CON_COSTO", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("FECHA_CALCULO", sa.DateTime, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("MOLDERIA_MUESTRAS_RESUMEN")
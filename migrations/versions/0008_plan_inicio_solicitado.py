@@ -0,0 +1,37 @@
+"""Inicio solicitado de los planes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 16:00:00
+
+Agrega PRODUCCION_PLANES.fecha_ini_solicitada, la fecha desde la que un plan
+puede empezar, y la inicializa con fecha_ini_est. A partir de aquí
+services.programacion escribe en fecha_ini_est el inicio programado; para
+recalcularlo en los planes existentes ejecutar después:
+    python -m services.programacion
+"""
+import sqlalchemy as sa
+from alembic import op
+from migration_utils import add_column_online
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Tablas cuyo tamaño estima `python migrate.py --dry-run`
+tablas_afectadas = ["PRODUCCION_PLANES"]
+
+
+def upgrade() -> None:
+    add_column_online("PRODUCCION_PLANES", sa.Column("fecha_ini_solicitada", sa.Date))
+    op.execute("UPDATE PRODUCCION_PLANES SET fecha_ini_solicitada = fecha_ini_est")
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE PRODUCCION_PLANES SET fecha_ini_est = fecha_ini_solicitada "
+        "WHERE fecha_ini_solicitada IS NOT NULL"
+    )
+    op.drop_column("PRODUCCION_PLANES", "fecha_ini_solicitada")
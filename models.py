@@ -1,8 +1,12 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Text, DateTime, Date, Enum as SAEnum, Boolean
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text, DateTime, Date, Enum as SAEnum, Boolean
 from sqlalchemy.types import DECIMAL, JSON, LargeBinary
 from sqlalchemy.sql import func
 import enum
-from database import Base
+from database import Base, ahora, ahora_con_zona, hoy
+
+# Las fechas automáticas también tienen valor por defecto en Python: así el ORM
+# conoce el valor tras el INSERT/UPDATE y no necesita releer la fila (refresh).
+# ahora/hoy usan la misma zona que la sesión MySQL (database.zona_horaria)
 
 class ClienteEstado(enum.Enum):
     ACTIVO = "ACTIVO"
@@ -29,9 +33,9 @@ class CRMCliente(Base):
     pais = Column("PAIS", String(50))
     codigo_postal = Column("CODIGO_POSTAL", String(20))
     rfc = Column("RFC", String(20))
-    estado = Column("ESTADO", SAEnum(ClienteEstado), default=ClienteEstado.ACTIVO)
-    fecha_registro = Column("FECHA_REGISTRO", DateTime, server_default=func.now())
-    fecha_actualizacion = Column("FECHA_ACTUALIZACION", DateTime, server_default=func.now(), onupdate=func.now())
+    estado = Column("ESTADO", SAEnum(ClienteEstado), default=ClienteEstado.ACTIVO, index=True)
+    fecha_registro = Column("FECHA_REGISTRO", DateTime, default=ahora, server_default=func.now())
+    fecha_actualizacion = Column("FECHA_ACTUALIZACION", DateTime, default=ahora, server_default=func.now(), onupdate=ahora)
     notas = Column("NOTAS", Text)
     tipo_cliente = Column("TIPO_CLIENTE", SAEnum(ClienteTipo), nullable=False)
     creado_por = Column("CREADO_POR", Integer)
@@ -49,11 +53,11 @@ class Usuario(Base):
     apellidos = Column("APELLIDOS", String(100))
     email = Column("EMAIL", String(100), unique=True, index=True, nullable=False)
     contrasena = Column("CONTRASEÑA", String(255), nullable=False)
-    id_rol = Column("ID_ROL", Integer, nullable=False)
+    id_rol = Column("ID_ROL", Integer, nullable=False, index=True)
     telefono = Column("TELEFONO", String(20))
     cargo = Column("CARGO", String(100))
     departamento = Column("DEPARTAMENTO", String(100))
-    fecha_registro = Column("FECHA_REGISTRO", DateTime, server_default=func.now())
+    fecha_registro = Column("FECHA_REGISTRO", DateTime, default=ahora, server_default=func.now())
     fecha_ultimo_acceso = Column("FECHA_ULTIMO_ACCESO", DateTime)
     estado = Column("ESTADO", SAEnum(UsuarioEstado), default=UsuarioEstado.ACTIVO)
     foto_perfil = Column("FOTO_PERFIL", LargeBinary)
@@ -75,9 +79,9 @@ class Proyecto(Base):
     __tablename__ = "PROYECTOS_PEDIDOS"
     id_proyecto = Column("ID_PROYECTO", Integer, primary_key=True, index=True)
     codigo_proyecto = Column("CODIGO_PROYECTO", String(50), unique=True, nullable=False)
-    id_cliente = Column("ID_CLIENTE", Integer, nullable=False)
+    id_cliente = Column("ID_CLIENTE", Integer, nullable=False, index=True)
     nombre_proyecto = Column("NOMBRE_PROYECTO", String(100), nullable=False)
-    id_tipo_proyecto = Column("ID_TIPO_PROYECTO", Integer, nullable=False)
+    id_tipo_proyecto = Column("ID_TIPO_PROYECTO", Integer, nullable=False, index=True)
     descripcion = Column("DESCRIPCION", Text)
     especificaciones_tecnicas = Column("ESPECIFICACIONES_TECNICAS", Text)
     fecha_inicio = Column("FECHA_INICIO", DateTime)
@@ -86,14 +90,14 @@ class Proyecto(Base):
     fecha_finalizacion = Column("FECHA_FINALIZACION", DateTime)
     estado = Column("ESTADO", SAEnum(
         'PRESUPUESTO','EN_PROCESO','APROBADO','FINALIZADO','CANCELADO','PAUSADO',
-        name="proyecto_estado"), default='PRESUPUESTO')
+        name="proyecto_estado"), default='PRESUPUESTO', index=True)
     prioridad = Column("PRIORIDAD", SAEnum(
         'BAJA','MEDIA','ALTA','URGENTE', name="proyecto_prioridad"), default='MEDIA')
     progreso_porcentaje = Column("PROGRESO_PORCENTAJE", DECIMAL(5,2), default=0)
     notas = Column("NOTAS", Text)
-    fecha_creacion = Column("FECHA_CREACION", DateTime, server_default=func.now())
+    fecha_creacion = Column("FECHA_CREACION", DateTime, default=ahora, server_default=func.now())
     fecha_actualizacion = Column("FECHA_ACTUALIZACION", DateTime,
-                                 server_default=func.now(), onupdate=func.now())
+                                 default=ahora, server_default=func.now(), onupdate=ahora)
     creado_por = Column("CREADO_POR", Integer)
 
 class MoldeEstado(enum.Enum):
@@ -122,14 +126,14 @@ class MolderiaMolde(Base):
     __tablename__ = "MOLDERIA_MOLDES"
     id_molde = Column("ID_MOLDE", Integer, primary_key=True, index=True)
     codigo_molde = Column("CODIGO_MOLDE", String(50), unique=True, nullable=False)
-    id_proyecto = Column("ID_PROYECTO", Integer, nullable=False)
+    id_proyecto = Column("ID_PROYECTO", Integer, nullable=False, index=True)
     nombre_molde = Column("NOMBRE_MOLDE", String(100), nullable=False)
     categoria = Column("CATEGORIA", String(50))
     talla = Column("TALLA", String(20))
     version = Column("VERSION", String(20), default="1.0")
-    estado = Column("ESTADO", SAEnum(MoldeEstado), default=MoldeEstado.EN_DESARROLLO)
-    fecha_creacion = Column("FECHA_CREACION", DateTime, server_default=func.now())
-    fecha_modificacion = Column("FECHA_ULTIMA_MODIFICACION", DateTime, server_default=func.now(), onupdate=func.now())
+    estado = Column("ESTADO", SAEnum(MoldeEstado), default=MoldeEstado.EN_DESARROLLO, index=True)
+    fecha_creacion = Column("FECHA_CREACION", DateTime, default=ahora, server_default=func.now())
+    fecha_modificacion = Column("FECHA_ULTIMA_MODIFICACION", DateTime, default=ahora, server_default=func.now(), onupdate=ahora)
     notas = Column("NOTAS", Text)
     medidas = Column("MEDIDAS", Text)
     observaciones_tecnicas = Column("OBSERVACIONES_TECNICAS", Text)
@@ -138,11 +142,11 @@ class MolderiaMolde(Base):
 class MolderiaArchivo(Base):
     __tablename__ = "MOLDERIA_ARCHIVOS"
     id_archivo = Column("ID_ARCHIVO_MOLDE", Integer, primary_key=True, index=True)
-    id_molde = Column("ID_MOLDE", Integer, nullable=False)
+    id_molde = Column("ID_MOLDE", Integer, nullable=False, index=True)
     nombre_archivo = Column("NOMBRE_ARCHIVO", String(200), nullable=False)
     tipo_archivo = Column("TIPO_ARCHIVO", SAEnum(ArchivoTipo), nullable=False)
     archivo = Column("ARCHIVO", LargeBinary, nullable=False)
-    fecha_subida = Column("FECHA_SUBIDA", DateTime, server_default=func.now())
+    fecha_subida = Column("FECHA_SUBIDA", DateTime, default=ahora, server_default=func.now())
     version = Column("VERSION", String(20))
     es_principal = Column("ES_PRINCIPAL", Boolean, default=False)
     notas = Column("NOTAS", Text)
@@ -152,30 +156,55 @@ class MolderiaMuestra(Base):
     __tablename__ = "MOLDERIA_MUESTRAS"
     id_muestra = Column("ID_MUESTRA", Integer, primary_key=True, index=True)
     codigo_muestra = Column("CODIGO_MUESTRA", String(50), unique=True, nullable=False)
-    id_proyecto = Column("ID_PROYECTO", Integer, nullable=False)
-    id_molde = Column("ID_MOLDE", Integer)
+    id_proyecto = Column("ID_PROYECTO", Integer, nullable=False, index=True)
+    id_molde = Column("ID_MOLDE", Integer, index=True)
     nombre_muestra = Column("NOMBRE_MUESTRA", String(100), nullable=False)
     descripcion = Column("DESCRIPCION", Text)
     talla = Column("TALLA", String(20))
     color = Column("COLOR", String(50))
     material = Column("MATERIAL", String(100))
-    fecha_creacion = Column("FECHA_CREACION", DateTime, server_default=func.now())
+    fecha_creacion = Column("FECHA_CREACION", DateTime, default=ahora, server_default=func.now())
     fecha_entrega_estimada = Column("FECHA_ENTREGA_ESTIMADA", DateTime)
     fecha_entrega_real = Column("FECHA_ENTREGA_REAL", DateTime)
-    estado = Column("ESTADO", SAEnum(MuestraEstado), default=MuestraEstado.PLANIFICADA)
+    estado = Column("ESTADO", SAEnum(MuestraEstado), default=MuestraEstado.PLANIFICADA, index=True)
     feedback_cliente = Column("FEEDBACK_CLIENTE", Text)
     feedback_interno = Column("FEEDBACK_INTERNO", Text)
     costo = Column("COSTO", DECIMAL(10, 2))
     creada_por = Column("CREADA_POR", Integer)
 
+# Resumen de muestras por mes de creación, proyecto, molde y estado; lo
+# reconstruye services.muestras (job nocturno) y lo lee /muestras/analytics
+class MolderiaMuestraResumen(Base):
+    __tablename__ = "MOLDERIA_MUESTRAS_RESUMEN"
+    mes = Column("MES", Date, primary_key=True)
+    id_proyecto = Column("ID_PROYECTO", Integer, primary_key=True)
+    id_molde = Column("ID_MOLDE", Integer, primary_key=True)  # 0: sin molde
+    estado = Column("ESTADO", String(30), primary_key=True)
+    muestras = Column("MUESTRAS", Integer, nullable=False, default=0)
+    entregadas = Column("ENTREGADAS", Integer, nullable=False, default=0)
+    a_tiempo = Column("A_TIEMPO", Integer, nullable=False, default=0)
+    con_retraso = Column("CON_RETRASO", Integer, nullable=False, default=0)
+    vencidas_pendientes = Column("VENCIDAS_PENDIENTES", Integer, nullable=False, default=0)
+    dias_ciclo_total = Column("DIAS_CICLO_TOTAL", Integer, nullable=False, default=0)
+    dias_retraso_total = Column("DIAS_RETRASO_TOTAL", Integer, nullable=False, default=0)
+    ciclo_min = Column("CICLO_MIN", Integer)
+    ciclo_max = Column("CICLO_MAX", Integer)
+    ciclo_0_7 = Column("CICLO_0_7", Integer, nullable=False, default=0)
+    ciclo_8_14 = Column("CICLO_8_14", Integer, nullable=False, default=0)
+    ciclo_15_30 = Column("CICLO_15_30", Integer, nullable=False, default=0)
+    ciclo_31_mas = Column("CICLO_31_MAS", Integer, nullable=False, default=0)
+    costo_total = Column("COSTO_TOTAL", DECIMAL(14, 2), nullable=False, default=0)
+    con_costo = Column("CON_COSTO", Integer, nullable=False, default=0)
+    fecha_calculo = Column("FECHA_CALCULO", DateTime, default=ahora, server_default=func.now())
+
 class MolderiaImagenMuestra(Base):
     __tablename__ = "MOLDERIA_IMAGENES_MUESTRAS"
     id_imagen = Column("ID_IMAGEN", Integer, primary_key=True, index=True)
-    id_muestra = Column("ID_MUESTRA", Integer, nullable=False)
+    id_muestra = Column("ID_MUESTRA", Integer, nullable=False, index=True)
     imagen = Column("IMAGEN", LargeBinary, nullable=False)
     nombre_imagen = Column("NOMBRE_IMAGEN", String(200))
     descripcion = Column("DESCRIPCION", Text)
-    fecha_subida = Column("FECHA_SUBIDA", DateTime, server_default=func.now())
+    fecha_subida = Column("FECHA_SUBIDA", DateTime, default=ahora, server_default=func.now())
     es_principal = Column("ES_PRINCIPAL", Boolean, default=False)
     orden_visualizacion = Column("ORDEN_VISUALIZACION", Integer, default=0)
     subido_por = Column("SUBIDO_POR", Integer)
@@ -196,10 +225,10 @@ class ProduccionTaller(Base):
     email         = Column(String(100))
     especialidad  = Column(String(100))
     capacidad     = Column(Integer)
-    estado        = Column(SAEnum(TallerEstado), default=TallerEstado.ACTIVO)
+    estado        = Column(SAEnum(TallerEstado), default=TallerEstado.ACTIVO, index=True)
     calificacion  = Column(DECIMAL(3,2))
     notas         = Column(Text)
-    fecha_reg     = Column(DateTime, server_default=func.now())
+    fecha_reg     = Column(DateTime, default=ahora, server_default=func.now())
 
 class ProduccionEtapa(Base):
     __tablename__ = "PRODUCCION_ETAPAS"
@@ -214,13 +243,16 @@ class ProduccionPlan(Base):
     __tablename__ = "PRODUCCION_PLANES"
     id_plan        = Column(Integer, name="ID_PLAN", primary_key=True, index=True)
     codigo_plan    = Column(String(50), unique=True, nullable=False)
-    id_proyecto    = Column(Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"))
-    id_taller      = Column(Integer, ForeignKey("PRODUCCION_TALLERES.ID_TALLER"))
-    fecha_ini_est  = Column(Date)
+    id_proyecto    = Column(Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"), index=True)
+    id_taller      = Column(Integer, ForeignKey("PRODUCCION_TALLERES.ID_TALLER"), index=True)
+    # fecha_ini_est/fecha_fin_est las calcula services.programacion; el plan
+    # no empieza antes de fecha_ini_solicitada
+    fecha_ini_est  = Column(Date, index=True)
     fecha_fin_est  = Column(Date)
+    fecha_ini_solicitada = Column(Date)
     fecha_ini_real = Column(Date)
     fecha_fin_real = Column(Date)
-    estado         = Column(SAEnum('PLANIFICADO','EN_PROCESO','COMPLETADO','PAUSADO','CANCELADO', name="produccion_plan_estado"), default='PLANIFICADO')
+    estado         = Column(SAEnum('PLANIFICADO','EN_PROCESO','COMPLETADO','PAUSADO','CANCELADO', name="produccion_plan_estado"), default='PLANIFICADO', index=True)
     cantidad_prod  = Column(Integer, nullable=False)
     cantidad_comp  = Column(Integer, default=0)
     prioridad      = Column(SAEnum('BAJA','MEDIA','ALTA','URGENTE', name="produccion_plan_prioridad"), default='MEDIA')
@@ -229,18 +261,20 @@ class ProduccionPlan(Base):
     costo_real     = Column(DECIMAL(12,2))
     responsable    = Column(String(100))
     creado_por     = Column(Integer)
-    fecha_creacion = Column(DateTime, server_default=func.now())
+    fecha_creacion = Column(DateTime, default=ahora, server_default=func.now())
+    # Calculado desde las etapas por services.progreso
+    progreso_porcentaje = Column(DECIMAL(5,2), nullable=False, default=0, server_default="0")
 
 class ProduccionDetallePlan(Base):
     __tablename__ = "PRODUCCION_DETALLE_PLAN"
     id_detalle     = Column(Integer, name="ID_DETALLE_PLAN", primary_key=True, index=True)
-    id_plan        = Column(Integer, ForeignKey("PRODUCCION_PLANES.ID_PLAN", ondelete="CASCADE"))
-    id_etapa       = Column(Integer, ForeignKey("PRODUCCION_ETAPAS.ID_ETAPA"))
+    id_plan        = Column(Integer, ForeignKey("PRODUCCION_PLANES.ID_PLAN", ondelete="CASCADE"), index=True)
+    id_etapa       = Column(Integer, ForeignKey("PRODUCCION_ETAPAS.ID_ETAPA"), index=True)
     fecha_ini_est  = Column(Date)
     fecha_fin_est  = Column(Date)
     fecha_ini_real = Column(Date)
     fecha_fin_real = Column(Date)
-    estado         = Column(SAEnum('PENDIENTE','EN_PROCESO','COMPLETADO','PAUSADO', name="produccion_detalle_estado"), default='PENDIENTE')
+    estado         = Column(SAEnum('PENDIENTE','EN_PROCESO','COMPLETADO','PAUSADO', name="produccion_detalle_estado"), default='PENDIENTE', index=True)
     responsable    = Column(String(100))
     observaciones  = Column(Text)
     tiempo_inv     = Column(DECIMAL(6,2))
@@ -252,26 +286,53 @@ class ProduccionMaterial(Base):
     codigo_material= Column(String(50), unique=True, nullable=False)
     nombre         = Column(String(100), nullable=False)
     descripcion    = Column(Text)
-    categoria      = Column(String(50))
+    categoria      = Column(String(50), index=True)
     unidad_medida  = Column(String(20))
     stock_actual   = Column(DECIMAL(10,2), default=0)
     stock_minimo   = Column(DECIMAL(10,2), default=0)
     costo_unitario = Column(DECIMAL(10,2))
     proveedor      = Column(String(100))
     estado         = Column(SAEnum('ACTIVO','INACTIVO','DESCONTINUADO', name="produccion_material_estado"), default='ACTIVO')
-    fecha_registro = Column(DateTime, server_default=func.now())
+    fecha_registro = Column(DateTime, default=ahora, server_default=func.now())
 
 class ProduccionMaterialProyecto(Base):
     __tablename__ = "PRODUCCION_MATERIALES_PROYECTO"
     id_mat_proy    = Column(Integer, name="ID_MATERIAL_PROYECTO", primary_key=True, index=True)
-    id_proyecto    = Column(Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"))
-    id_material    = Column(Integer, ForeignKey("PRODUCCION_MATERIALES.ID_MATERIAL"))
+    id_proyecto    = Column(Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"), index=True)
+    id_material    = Column(Integer, ForeignKey("PRODUCCION_MATERIALES.ID_MATERIAL"), index=True)
     cantidad_req   = Column(DECIMAL(10,2), nullable=False)
     cantidad_uso   = Column(DECIMAL(10,2), default=0)
     costo_unit     = Column(DECIMAL(10,2))
     costo_total    = Column(DECIMAL(12,2))
-    fecha_asig     = Column(Date, server_default=func.current_date())
+    fecha_asig     = Column(Date, default=hoy, server_default=func.current_date())
+    notas          = Column(Text)
+
+# Cada cambio de stock_actual queda aquí con su cantidad firmada (+ entra, - sale)
+class ProduccionMovimientoStock(Base):
+    __tablename__ = "PRODUCCION_MOVIMIENTOS_STOCK"
+    id_movimiento  = Column(Integer, name="ID_MOVIMIENTO", primary_key=True, index=True)
+    id_material    = Column(Integer, ForeignKey("PRODUCCION_MATERIALES.ID_MATERIAL", ondelete="CASCADE"), nullable=False, index=True)
+    tipo           = Column(SAEnum('ENTRADA','SALIDA','AJUSTE', name="produccion_movimiento_tipo"), nullable=False)
+    cantidad       = Column(DECIMAL(10,2), nullable=False)
+    stock_resultante = Column(DECIMAL(10,2))
+    id_proyecto    = Column(Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"), index=True)
+    referencia     = Column(String(100))
     notas          = Column(Text)
+    registrado_por = Column(Integer)
+    fecha          = Column(DateTime, default=ahora, server_default=func.now(), index=True)
+
+# Stock de cada material según el libro hasta el movimiento `ultimo_movimiento`
+class ProduccionStockCorte(Base):
+    __tablename__ = "PRODUCCION_STOCK_CORTES"
+    id_corte          = Column(Integer, name="ID_CORTE", primary_key=True, index=True)
+    id_material       = Column(Integer, ForeignKey("PRODUCCION_MATERIALES.ID_MATERIAL", ondelete="CASCADE"), nullable=False)
+    ultimo_movimiento = Column(Integer, nullable=False, default=0)
+    stock             = Column(DECIMAL(12,2), nullable=False)
+    fecha_corte       = Column(DateTime, default=ahora, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_PRODUCCION_STOCK_CORTES_MATERIAL_ULTIMO", "id_material", "ultimo_movimiento"),
+    )
 
 
 class ServicioTipo(enum.Enum):
@@ -332,7 +393,7 @@ class BrandingProyecto(Base):
     __tablename__ = "BRANDING_PROYECTOS"
 
     id_proyecto_branding = Column("ID_PROYECTO_BRANDING", Integer, primary_key=True, index=True)
-    id_proyecto = Column("ID_PROYECTO", Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"))
+    id_proyecto = Column("ID_PROYECTO", Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"), index=True)
     tipo_servicio = Column("TIPO_SERVICIO", SAEnum(ServicioTipo), nullable=False)
     brief_cliente = Column("BRIEF_CLIENTE", Text)
     objetivos = Column("OBJETIVOS", Text)
@@ -342,7 +403,7 @@ class BrandingProyecto(Base):
     fecha_inicio = Column("FECHA_INICIO", Date)
     fecha_entrega_estimada = Column("FECHA_ENTREGA_ESTIMADA", Date)
     fecha_entrega_real = Column("FECHA_ENTREGA_REAL", Date)
-    estado = Column("ESTADO", SAEnum(BrandingEstado), default=BrandingEstado.BRIEF)
+    estado = Column("ESTADO", SAEnum(BrandingEstado), default=BrandingEstado.BRIEF, index=True)
     numero_revisiones = Column("NUMERO_REVISIONES", Integer, default=0)
     revisiones_incluidas = Column("REVISIONES_INCLUIDAS", Integer, default=3)
     feedback_cliente = Column("FEEDBACK_CLIENTE", Text)
@@ -354,7 +415,7 @@ class BrandingEntregable(Base):
     __tablename__ = "BRANDING_ENTREGABLES"
 
     id_entregable = Column("ID_ENTREGABLE", Integer, primary_key=True, index=True)
-    id_proyecto_branding = Column("ID_PROYECTO_BRANDING", Integer, ForeignKey("BRANDING_PROYECTOS.ID_PROYECTO_BRANDING", ondelete="CASCADE"))
+    id_proyecto_branding = Column("ID_PROYECTO_BRANDING", Integer, ForeignKey("BRANDING_PROYECTOS.ID_PROYECTO_BRANDING", ondelete="CASCADE"), index=True)
     nombre_entregable = Column("NOMBRE_ENTREGABLE", String(200), nullable=False)
     tipo_entregable = Column("TIPO_ENTREGABLE", SAEnum(EntregableTipo), nullable=False)
     descripcion = Column("DESCRIPCION", Text)
@@ -362,7 +423,7 @@ class BrandingEntregable(Base):
     nombre_archivo = Column("NOMBRE_ARCHIVO", String(255))
     extension = Column("EXTENSION", String(10))
     tamano_archivo = Column("TAMAÑO_ARCHIVO", Integer)
-    fecha_creacion = Column("FECHA_CREACION", DateTime, server_default=func.now())
+    fecha_creacion = Column("FECHA_CREACION", DateTime, default=ahora, server_default=func.now())
     version = Column("VERSION", String(20), default="1.0")
     estado = Column("ESTADO", SAEnum(EntregableEstado), default=EntregableEstado.BORRADOR)
     creado_por = Column("CREADO_POR", Integer)
@@ -372,9 +433,9 @@ class BrandingRevision(Base):
     __tablename__ = "BRANDING_REVISIONES"
 
     id_revision = Column("ID_REVISION", Integer, primary_key=True, index=True)
-    id_proyecto_branding = Column("ID_PROYECTO_BRANDING", Integer, ForeignKey("BRANDING_PROYECTOS.ID_PROYECTO_BRANDING", ondelete="CASCADE"))
+    id_proyecto_branding = Column("ID_PROYECTO_BRANDING", Integer, ForeignKey("BRANDING_PROYECTOS.ID_PROYECTO_BRANDING", ondelete="CASCADE"), index=True)
     numero_revision = Column("NUMERO_REVISION", Integer, nullable=False)
-    fecha_revision = Column("FECHA_REVISION", DateTime, server_default=func.now())
+    fecha_revision = Column("FECHA_REVISION", DateTime, default=ahora, server_default=func.now())
     tipo_revision = Column("TIPO_REVISION", SAEnum(TipoRevision), nullable=False)
     comentarios = Column("COMENTARIOS", Text)
     cambios_solicitados = Column("CAMBIOS_SOLICITADOS", Text)
@@ -389,13 +450,13 @@ class BrandingFeedbackFecha(Base):
     __tablename__ = "BRANDING_FEEDBACK_FECHAS"
 
     id_feedback = Column("ID_FEEDBACK", Integer, primary_key=True, index=True)
-    id_proyecto_branding = Column("ID_PROYECTO_BRANDING", Integer, ForeignKey("BRANDING_PROYECTOS.ID_PROYECTO_BRANDING", ondelete="CASCADE"))
+    id_proyecto_branding = Column("ID_PROYECTO_BRANDING", Integer, ForeignKey("BRANDING_PROYECTOS.ID_PROYECTO_BRANDING", ondelete="CASCADE"), index=True)
     fecha_feedback = Column("FECHA_FEEDBACK", Date, nullable=False)
     comentario = Column("COMENTARIO", Text, nullable=False)
     prioridad = Column("PRIORIDAD", SAEnum(FeedbackPrioridad), default=FeedbackPrioridad.MEDIA)
     estado = Column("ESTADO", SAEnum(FeedbackEstado), default=FeedbackEstado.PENDIENTE)
     creado_por = Column("CREADO_POR", Integer)
-    fecha_creacion = Column("FECHA_CREACION", DateTime, server_default=func.now())
+    fecha_creacion = Column("FECHA_CREACION", DateTime, default=ahora, server_default=func.now())
 
 class EcommerceProyectoEstado(enum.Enum):
     PLANIFICACION = "PLANIFICACION"
@@ -420,7 +481,7 @@ class EcommerceProyecto(Base):
     __tablename__ = "ECOMMERCE_PROYECTOS"
 
     id_proyecto_ecommerce = Column(Integer, primary_key=True, index=True)
-    id_proyecto = Column(Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"))
+    id_proyecto = Column(Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"), index=True)
     nombre_tienda = Column(String(200))
     url_tienda = Column(String(255), nullable=True)
     dominio_principal = Column(String(255), nullable=True)
@@ -432,7 +493,7 @@ class EcommerceProyecto(Base):
     metodos_envio = Column(Text, nullable=True)
     fecha_lanzamiento_estimada = Column(Date, nullable=True)
     fecha_lanzamiento_real = Column(Date, nullable=True)
-    estado = Column(SAEnum(EcommerceProyectoEstado), default=EcommerceProyectoEstado.PLANIFICACION)
+    estado = Column(SAEnum(EcommerceProyectoEstado), default=EcommerceProyectoEstado.PLANIFICACION, index=True)
     ssl_configurado = Column(Boolean, default=False)
     analytics_configurado = Column(Boolean, default=False)
     seo_configurado = Column(Boolean, default=False)
@@ -443,7 +504,7 @@ class EcommerceCredencial(Base):
     __tablename__ = "ECOMMERCE_CREDENCIALES"
 
     id_credencial = Column(Integer, primary_key=True, index=True)
-    id_proyecto_ecommerce = Column(Integer, ForeignKey("ECOMMERCE_PROYECTOS.id_proyecto_ecommerce"))
+    id_proyecto_ecommerce = Column(Integer, ForeignKey("ECOMMERCE_PROYECTOS.id_proyecto_ecommerce"), index=True)
     tipo_credencial = Column(String(50), nullable=False)
     servicio = Column(String(100), nullable=True)
     usuario = Column(String(200), nullable=True)
@@ -453,13 +514,13 @@ class EcommerceCredencial(Base):
     notas = Column(Text, nullable=True)
     fecha_expiracion = Column(Date, nullable=True)
     activo = Column(Boolean, default=True)
-    fecha_creacion = Column(DateTime, server_default=func.now())
+    fecha_creacion = Column(DateTime, default=ahora, server_default=func.now())
 
 class EcommerceDocumento(Base):
     __tablename__ = "ECOMMERCE_DOCUMENTOS"
 
     id_documento = Column(Integer, primary_key=True, index=True)
-    id_proyecto_ecommerce = Column(Integer, ForeignKey("ECOMMERCE_PROYECTOS.id_proyecto_ecommerce"))
+    id_proyecto_ecommerce = Column(Integer, ForeignKey("ECOMMERCE_PROYECTOS.id_proyecto_ecommerce"), index=True)
     nombre_documento = Column(String(200), nullable=False)
     tipo_documento = Column(String(50), nullable=False)
     descripcion = Column(Text, nullable=True)
@@ -467,7 +528,7 @@ class EcommerceDocumento(Base):
     nombre_archivo = Column(String(255), nullable=False)
     extension = Column(String(10), nullable=False)
     tamano_archivo = Column(Integer, nullable=False)
-    fecha_subida = Column(DateTime, server_default=func.now())
+    fecha_subida = Column(DateTime, default=ahora, server_default=func.now())
     version = Column(String(20), default="1.0")
     es_publico = Column(Boolean, default=False)
     subido_por = Column(Integer, nullable=True)
@@ -476,25 +537,29 @@ class EcommerceDatosMarca(Base):
     __tablename__ = "ECOMMERCE_DATOS_MARCA"
 
     id_datos_marca = Column(Integer, primary_key=True, index=True)
-    id_proyecto_ecommerce = Column(Integer, ForeignKey("ECOMMERCE_PROYECTOS.id_proyecto_ecommerce"))
+    id_proyecto_ecommerce = Column(Integer, ForeignKey("ECOMMERCE_PROYECTOS.id_proyecto_ecommerce"), index=True)
     email_marca = Column(String(200), nullable=True)
     contrasena_email = Column(String(500), nullable=True)
     servidor_smtp = Column(String(100), nullable=True)
     puerto_smtp = Column(Integer, nullable=True)
     configuracion_ssl = Column(Boolean, default=True)
     notas_email = Column(Text, nullable=True)
-    fecha_configuracion = Column(DateTime, server_default=func.now())
+    fecha_configuracion = Column(DateTime, default=ahora, server_default=func.now())
     configurado_por = Column(Integer, nullable=True)
 
+def _saldo_inicial(context):
+    # Una factura nueva aún no tiene pagos: su saldo es el total
+    return context.get_current_parameters()["TOTAL"]
+
 class FinancieroFactura(Base):
     __tablename__ = "FINANCIERO_FACTURAS"
 
     id_factura         = Column("ID_FACTURA", Integer, primary_key=True, index=True)
     numero_factura     = Column("NUMERO_FACTURA", String(50), unique=True, nullable=False)
-    id_proyecto        = Column("ID_PROYECTO", Integer, ForeignKey("PROYECTOS.ID_PROYECTO"), nullable=False)
+    id_proyecto        = Column("ID_PROYECTO", Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"), nullable=False, index=True)
     serie              = Column("SERIE", String(20))
     folio              = Column("FOLIO", Integer)
-    fecha_emision      = Column("FECHA_EMISION", Date, nullable=False)
+    fecha_emision      = Column("FECHA_EMISION", Date, nullable=False, index=True)
     fecha_vencimiento  = Column("FECHA_VENCIMIENTO", Date)
     fecha_pago         = Column("FECHA_PAGO", Date)
     subtotal           = Column("SUBTOTAL", DECIMAL(18,2), nullable=False)
@@ -503,7 +568,7 @@ class FinancieroFactura(Base):
     total              = Column("TOTAL", DECIMAL(18,2), nullable=False)
     moneda             = Column("MONEDA", String(3), default="MXN")
     tipo_cambio        = Column("TIPO_CAMBIO", DECIMAL(18,4), default=1.0)
-    estado             = Column("ESTADO", String(20), default="BORRADOR")
+    estado             = Column("ESTADO", String(20), default="BORRADOR", index=True)
     metodo_pago        = Column("METODO_PAGO", String(50))
     forma_pago         = Column("FORMA_PAGO", String(50))
     condiciones_pago   = Column("CONDICIONES_PAGO", String(255))
@@ -512,8 +577,12 @@ class FinancieroFactura(Base):
     archivo_xml        = Column("ARCHIVO_XML", LargeBinary)
     archivo_pdf        = Column("ARCHIVO_PDF", LargeBinary)
     nombre_archivo_pdf = Column("NOMBRE_ARCHIVO_PDF", String(255))
-    creada_por         = Column("CREADA_POR", Integer, ForeignKey("USUARIOS.ID_USUARIO"))
-    fecha_creacion     = Column("FECHA_CREACION", DateTime(timezone=True), server_default=func.now())
+    creada_por         = Column("CREADA_POR", Integer, ForeignKey("USUARIOS.ID_USUARIO"), index=True)
+    fecha_creacion     = Column("FECHA_CREACION", DateTime(timezone=True), default=ahora_con_zona, server_default=func.now())
+    # Acumulados de sus pagos; los mantiene services.facturacion en la misma
+    # transacción que cada alta, cambio o baja de pago
+    monto_pagado       = Column("MONTO_PAGADO", DECIMAL(18,2), nullable=False, default=0, server_default="0")
+    saldo              = Column("SALDO", DECIMAL(18,2), nullable=False, default=_saldo_inicial, server_default="0", index=True)
 
 
 # ——— FINANCIERO_PAGOS ———
@@ -522,9 +591,9 @@ class FinancieroPago(Base):
 
     id_pago            = Column("ID_PAGO", Integer, primary_key=True, index=True)
     numero_pago        = Column("NUMERO_PAGO", String(50), unique=True, nullable=False)
-    id_factura         = Column("ID_FACTURA", Integer, ForeignKey("FINANCIERO_FACTURAS.ID_FACTURA"), nullable=False)
+    id_factura         = Column("ID_FACTURA", Integer, ForeignKey("FINANCIERO_FACTURAS.ID_FACTURA"), nullable=False, index=True)
     monto              = Column("MONTO", DECIMAL(18,2), nullable=False)
-    fecha_pago         = Column("FECHA_PAGO", Date, nullable=False)
+    fecha_pago         = Column("FECHA_PAGO", Date, nullable=False, index=True)
     metodo_pago        = Column("METODO_PAGO", String(50), nullable=False)
     forma_pago         = Column("FORMA_PAGO", String(50))
     referencia         = Column("REFERENCIA", String(100))
@@ -533,8 +602,8 @@ class FinancieroPago(Base):
     comprobante        = Column("COMPROBANTE", LargeBinary)
     nombre_comprobante = Column("NOMBRE_COMPROBANTE", String(255))
     notas              = Column("NOTAS", Text)
-    registrado_por     = Column("REGISTRADO_POR", Integer, ForeignKey("USUARIOS.ID_USUARIO"))
-    fecha_registro     = Column("FECHA_REGISTRO", DateTime(timezone=True), server_default=func.now())
+    registrado_por     = Column("REGISTRADO_POR", Integer, ForeignKey("USUARIOS.ID_USUARIO"), index=True)
+    fecha_registro     = Column("FECHA_REGISTRO", DateTime(timezone=True), default=ahora_con_zona, server_default=func.now())
 
 
 # ——— FINANCIERO_GASTOS ———
@@ -543,21 +612,21 @@ class FinancieroGasto(Base):
 
     id_gasto           = Column("ID_GASTO", Integer, primary_key=True, index=True)
     numero_gasto       = Column("NUMERO_GASTO", String(50), unique=True, nullable=False)
-    id_proyecto        = Column("ID_PROYECTO", Integer, ForeignKey("PROYECTOS.ID_PROYECTO"))
+    id_proyecto        = Column("ID_PROYECTO", Integer, ForeignKey("PROYECTOS_PEDIDOS.ID_PROYECTO"), index=True)
     concepto           = Column("CONCEPTO", String(255), nullable=False)
     descripcion        = Column("DESCRIPCION", Text)
     monto              = Column("MONTO", DECIMAL(18,2), nullable=False)
     moneda             = Column("MONEDA", String(3), default="MXN")
-    fecha_gasto        = Column("FECHA_GASTO", Date, nullable=False)
-    categoria          = Column("CATEGORIA", String(100), nullable=False)
+    fecha_gasto        = Column("FECHA_GASTO", Date, nullable=False, index=True)
+    categoria          = Column("CATEGORIA", String(100), nullable=False, index=True)
     proveedor          = Column("PROVEEDOR", String(100))
     metodo_pago        = Column("METODO_PAGO", String(50))
     deducible          = Column("DEDUCIBLE", Boolean, default=True)
     comprobante        = Column("COMPROBANTE", LargeBinary)
     nombre_comprobante = Column("NOMBRE_COMPROBANTE", String(255))
     notas              = Column("NOTAS", Text)
-    registrado_por     = Column("REGISTRADO_POR", Integer, ForeignKey("USUARIOS.ID_USUARIO"))
-    fecha_registro     = Column("FECHA_REGISTRO", DateTime(timezone=True), server_default=func.now())
+    registrado_por     = Column("REGISTRADO_POR", Integer, ForeignKey("USUARIOS.ID_USUARIO"), index=True)
+    fecha_registro     = Column("FECHA_REGISTRO", DateTime(timezone=True), default=ahora_con_zona, server_default=func.now())
 
 
 # ——— FINANCIERO_CUENTAS_COBRAR ———
@@ -565,16 +634,29 @@ class FinancieroCuentaCobrar(Base):
     __tablename__ = "FINANCIERO_CUENTAS_COBRAR"
 
     id_cuenta_cobrar  = Column("ID_CUENTA_COBRAR", Integer, primary_key=True, index=True)
-    id_cliente        = Column("ID_CLIENTE", Integer, ForeignKey("CLIENTES.ID_CLIENTE"), nullable=False)
-    id_factura        = Column("ID_FACTURA", Integer, ForeignKey("FINANCIERO_FACTURAS.ID_FACTURA"))
+    id_cliente        = Column("ID_CLIENTE", Integer, ForeignKey("CRM_CLIENTES.ID_CLIENTE"), nullable=False, index=True)
+    id_factura        = Column("ID_FACTURA", Integer, ForeignKey("FINANCIERO_FACTURAS.ID_FACTURA"), index=True)
     concepto          = Column("CONCEPTO", String(255), nullable=False)
     monto             = Column("MONTO", DECIMAL(18,2), nullable=False)
     saldo_pendiente   = Column("SALDO_PENDIENTE", DECIMAL(18,2), nullable=False)
-    fecha_vencimiento = Column("FECHA_VENCIMIENTO", Date, nullable=False)
+    fecha_vencimiento = Column("FECHA_VENCIMIENTO", Date, nullable=False, index=True)
     dias_vencido      = Column("DIAS_VENCIDO", Integer, default=0)
-    estado            = Column("ESTADO", String(20), default="VIGENTE")
+    estado            = Column("ESTADO", String(20), default="VIGENTE", index=True)
     notas             = Column("NOTAS", Text)
-    fecha_creacion    = Column("FECHA_CREACION", DateTime(timezone=True), server_default=func.now())
+    fecha_creacion    = Column("FECHA_CREACION", DateTime(timezone=True), default=ahora_con_zona, server_default=func.now())
+
+# ——— FINANCIERO_FLUJO_DIARIO ———
+# Entradas (pagos) y salidas (gastos) acumuladas por día y moneda; las mantiene
+# services.flujo en cada alta, cambio o baja de pagos y gastos
+class FinancieroFlujoDiario(Base):
+    __tablename__ = "FINANCIERO_FLUJO_DIARIO"
+
+    fecha               = Column("FECHA", Date, primary_key=True)
+    moneda              = Column("MONEDA", String(3), primary_key=True)
+    entradas            = Column("ENTRADAS", DECIMAL(18,2), nullable=False, default=0, server_default="0")
+    salidas             = Column("SALIDAS", DECIMAL(18,2), nullable=False, default=0, server_default="0")
+    num_pagos           = Column("NUM_PAGOS", Integer, nullable=False, default=0, server_default="0")
+    num_gastos          = Column("NUM_GASTOS", Integer, nullable=False, default=0, server_default="0")
 
 class AuditLog(Base):
     __tablename__ = "AUDIT_LOGS"
@@ -588,9 +670,11 @@ class AuditLog(Base):
     user_agent = Column("USER_AGENT", String(500))
     ip_address = Column("IP_ADDRESS", String(45))
     status_code = Column("STATUS_CODE", Integer)
-    timestamp = Column("TIMESTAMP", DateTime(timezone=True), nullable=False)
+    timestamp = Column("TIMESTAMP", DateTime(timezone=True), nullable=False, index=True)
     
     # Índices para optimizar consultas
     __table_args__ = (
+        # Logs de una API key ordenados por fecha (/audit/logs?api_key=...)
+        Index("ix_AUDIT_LOGS_API_KEY_TIMESTAMP", "API_KEY", "TIMESTAMP"),
         {'mysql_engine': 'InnoDB'}
     )
\ No newline at end of file
@@ -0,0 +1,216 @@
+# profiling.py
+import asyncio
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from metrics import get_route_template
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Directorio del anillo de perfiles (compartido por todos los workers)
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "valbrand_profiles"))
+
+# Número máximo de perfiles conservados; los más antiguos se eliminan
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+# Fracción de peticiones perfiladas por muestreo (0 = solo bajo demanda)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Cabecera para solicitar el perfil de una petición concreta
+PROFILE_HEADER = "X-Profile"
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9A-Za-z_-]+$")
+
+
+class RequestProfile:
+    """Perfiles cProfile recogidos durante una petición"""
+
+    def __init__(self):
+        self.profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            self.profilers.append(profiler)
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def _profiled_call(call):
+    """Envolver un endpoint síncrono para perfilarlo en el hilo donde se ejecuta"""
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        session = _current_profile.get()
+        if session is None:
+            return call(*args, **kwargs)
+
+        # cProfile usa por defecto un reloj de pared (time.perf_counter)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profiler.disable()
+            session.add(profiler)
+
+    return wrapper
+
+
+def instrument_routes(app: FastAPI) -> None:
+    """Preparar los endpoints síncronos para poder ser perfilados"""
+    # FastAPI ejecuta los endpoints síncronos en el threadpool; cProfile solo
+    # perfila el hilo donde se activa, así que se activa dentro del endpoint
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+
+        call = route.dependant.call
+        if asyncio.iscoroutinefunction(call) or getattr(call, "_profiled", False):
+            continue
+
+        wrapper = _profiled_call(call)
+        wrapper._profiled = True
+        route.dependant.call = wrapper
+
+
+def _should_profile(request: Request) -> bool:
+    # Solo se atiende la cabecera si viene con una API key válida
+    if request.headers.get(PROFILE_HEADER) == "1":
+        return request.headers.get("X-API-Key") == settings.API_KEY
+
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _profile_paths(profile_id: str):
+    return (
+        os.path.join(PROFILE_DIR, f"{profile_id}.prof"),
+        os.path.join(PROFILE_DIR, f"{profile_id}.json"),
+    )
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        # Otro worker pudo haberlo eliminado al mismo tiempo
+        pass
+
+
+def _prune_ring() -> None:
+    """Conservar solo los PROFILE_MAX_FILES perfiles más recientes"""
+    entries = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(".prof"):
+            path = os.path.join(PROFILE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), name[:-len(".prof")]))
+            except FileNotFoundError:
+                continue
+
+    entries.sort(reverse=True)
+    for _, profile_id in entries[PROFILE_MAX_FILES:]:
+        for path in _profile_paths(profile_id):
+            _remove_quietly(path)
+
+
+def save_profile(session: RequestProfile, metadata: Dict[str, Any]) -> Optional[str]:
+    """Guardar el perfil combinado de la petición en el anillo en disco"""
+    if not session.profilers:
+        # La petición no llegó a ejecutar un endpoint (404, validación, etc.)
+        return None
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    prof_path, meta_path = _profile_paths(profile_id)
+
+    stats = pstats.Stats(session.profilers[0])
+    for profiler in session.profilers[1:]:
+        stats.add(profiler)
+    stats.dump_stats(prof_path)
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"id": profile_id, **metadata}, f)
+
+    _prune_ring()
+    return profile_id
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Metadatos de los perfiles disponibles, del más reciente al más antiguo"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (FileNotFoundError, ValueError):
+            continue
+
+    profiles.sort(key=lambda p: p["timestamp"], reverse=True)
+    return profiles
+
+
+def get_profile_path(profile_id: str) -> Optional[str]:
+    """Ruta del archivo .prof (None si el ID no es válido o no existe)"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    prof_path, _ = _profile_paths(profile_id)
+    return prof_path if os.path.exists(prof_path) else None
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if not _should_profile(request):
+            return await call_next(request)
+
+        session = RequestProfile()
+        token = _current_profile.set(session)
+        start_time = time.perf_counter()
+
+        try:
+            response = await call_next(request)
+        finally:
+            _current_profile.reset(token)
+
+        metadata = {
+            "method": request.method,
+            "route": get_route_template(request),
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "duration_ms": round((time.perf_counter() - start_time) * 1000, 2),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+        try:
+            profile_id = await run_in_threadpool(save_profile, session, metadata)
+        except OSError as e:
+            logger.error("No se pudo guardar el perfil de %s: %s", metadata["route"], e)
+            profile_id = None
+
+        if profile_id:
+            response.headers["X-Profile-Id"] = profile_id
+        return response
@@ -0,0 +1,196 @@
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from fastapi import HTTPException, Query, Request, status
+from sqlalchemy import inspect
+from sqlalchemy.types import Boolean, Date, DateTime, Enum as SAEnum, Integer, LargeBinary, Numeric
+
+
+def non_blob_attrs(model) -> List[str]:
+    """Nombres de atributos del modelo excluyendo columnas binarias (BLOB)"""
+    return [
+        attr.key
+        for attr in inspect(model).column_attrs
+        if not isinstance(attr.columns[0].type, LargeBinary)
+    ]
+
+
+def non_blob_columns(model) -> list:
+    """Columnas instrumentadas del modelo sin BLOBs, listas para un select()"""
+    return [getattr(model, key) for key in non_blob_attrs(model)]
+
+
+# ——— FILTROS Y ORDEN DE LISTADOS ———
+#
+# Sintaxis de query params:
+#   campo=valor            igualdad
+#   campo__gte=valor       también __lte, __gt, __lt
+#   campo__in=a,b,c        lista separada por comas
+#   ordenar=campo,-otro    '-' para descendente
+#
+# Solo se aceptan columnas con índice (llave primaria, unique o index=True)
+# para que cada filtro se resuelva con un índice en MySQL.
+
+ORDER_PARAM = "ordenar"
+
+# Query params de los listados que no son filtros; cualquier otro que no sea
+# una columna del modelo responde 400 (un filtro mal escrito no debe
+# devolver el listado completo)
+LIST_PARAMS = frozenset({"skip", "limit", ORDER_PARAM, "formato"})
+
+# Máximo de valores en un filtro __in
+FILTER_MAX_IN_VALUES = 500
+
+FILTER_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "gte": lambda col, v: col >= v,
+    "lte": lambda col, v: col <= v,
+    "gt": lambda col, v: col > v,
+    "lt": lambda col, v: col < v,
+    "in": lambda col, v: col.in_(v),
+}
+
+_TRUE_VALUES = {"1", "true", "si", "sí"}
+_FALSE_VALUES = {"0", "false", "no"}
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def filterable_attrs(model) -> Dict[str, Any]:
+    """Atributos que admiten filtro y orden: llave primaria, únicos o indexados"""
+    campos = {}
+    for attr in inspect(model).column_attrs:
+        column = attr.columns[0]
+        if column.primary_key or column.index or column.unique:
+            campos[attr.key] = column
+    return campos
+
+
+def _parse_value(column, param: str, raw: str) -> Any:
+    """Convertir el valor del query param al tipo de la columna"""
+    tipo = column.type
+    try:
+        if isinstance(tipo, SAEnum):
+            if tipo.enum_class is not None:
+                return tipo.enum_class(raw)
+            if raw not in tipo.enums:
+                raise ValueError
+            return raw
+        if isinstance(tipo, Boolean):
+            valor = raw.lower()
+            if valor not in _TRUE_VALUES | _FALSE_VALUES:
+                raise ValueError
+            return valor in _TRUE_VALUES
+        if isinstance(tipo, Integer):
+            return int(raw)
+        if isinstance(tipo, Numeric):
+            return Decimal(raw)
+        if isinstance(tipo, DateTime):
+            return datetime.fromisoformat(raw)
+        if isinstance(tipo, Date):
+            return date.fromisoformat(raw)
+    except (ValueError, InvalidOperation):
+        raise _bad_request(f"Valor inválido para '{param}': {raw}")
+    return raw
+
+
+def _date_only(column, raw: str) -> bool:
+    return isinstance(column.type, DateTime) and len(raw) == 10
+
+
+def _compile_filter(attr, column, param: str, operador: str, raw: str):
+    if operador == "in":
+        valores = [v.strip() for v in raw.split(",") if v.strip()]
+        if not valores:
+            raise _bad_request(f"'{param}' requiere al menos un valor")
+        if len(valores) > FILTER_MAX_IN_VALUES:
+            raise _bad_request(f"'{param}' admite como máximo {FILTER_MAX_IN_VALUES} valores")
+        return attr.in_([_parse_value(column, param, v) for v in valores])
+
+    valor = _parse_value(column, param, raw)
+
+    if _date_only(column, raw):
+        # Una fecha sin hora sobre una columna DateTime abarca el día completo
+        inicio = datetime.combine(valor.date(), time.min)
+        fin = datetime.combine(valor.date(), time.max)
+        if not operador:
+            return attr.between(inicio, fin)
+        valor = fin if operador in ("lte", "gt") else inicio
+
+    if not operador:
+        return attr == valor
+    return FILTER_OPERATORS[operador](attr, valor)
+
+
+class ListFilters:
+    """Condiciones WHERE y ORDER BY ya validadas de un listado"""
+
+    def __init__(self, criterios: list, orden: list):
+        self.criterios = criterios
+        self.orden = orden
+
+    def apply(self, query):
+        """Aplicar a un Query del ORM o a un select()"""
+        if self.criterios:
+            query = query.filter(*self.criterios)
+        if self.orden:
+            query = query.order_by(*self.orden)
+        return query
+
+
+def list_filters(model, parametros: Iterable[str] = ()):
+    """Dependencia que compila los query params de un listado en filtros y orden.
+
+    Se ignoran LIST_PARAMS y los `parametros` propios del endpoint; un nombre
+    desconocido, una columna sin índice o un operador desconocido responden 400.
+    """
+    permitidos = LIST_PARAMS | set(parametros)
+    mapper = inspect(model)
+    campos = filterable_attrs(model)
+    columnas = {attr.key for attr in mapper.column_attrs}
+    pk = getattr(model, mapper.get_property_by_column(mapper.primary_key[0]).key)
+    disponibles = ", ".join(sorted(campos))
+
+    def _campo(nombre: str, param: str):
+        if nombre not in campos:
+            raise _bad_request(
+                f"'{param}': el campo '{nombre}' no admite filtros ni orden. Campos disponibles: {disponibles}"
+            )
+        return getattr(model, nombre), campos[nombre]
+
+    def dependency(
+        request: Request,
+        ordenar: Optional[str] = Query(
+            None,
+            description=f"Campos separados por coma, '-' para descendente. Disponibles: {disponibles}",
+        ),
+    ) -> ListFilters:
+        criterios = []
+        for param, raw in request.query_params.items():
+            if param in permitidos:
+                continue
+            nombre, _, operador = param.partition("__")
+            if nombre not in columnas:
+                raise _bad_request(f"Parámetro desconocido '{param}'. Campos disponibles: {disponibles}")
+            if operador and operador not in FILTER_OPERATORS:
+                raise _bad_request(
+                    f"Operador '{operador}' no soportado en '{param}'. Use: {', '.join(FILTER_OPERATORS)}"
+                )
+            attr, column = _campo(nombre, param)
+            criterios.append(_compile_filter(attr, column, param, operador, raw))
+
+        orden = []
+        if ordenar:
+            for nombre in (n.strip() for n in ordenar.split(",")):
+                if not nombre:
+                    continue
+                descendente = nombre.startswith("-")
+                attr, _ = _campo(nombre.lstrip("-"), ORDER_PARAM)
+                orden.append(attr.desc() if descendente else attr.asc())
+            # Desempate por llave primaria para que la paginación sea estable
+            orden.append(pk.asc())
+
+        return ListFilters(criterios, orden)
+
+    return dependency
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 import models, schemas
 from dependencies import get_db, get_api_key
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(prefix="/archivos-moldes", tags=["archivos-moldes"], dependencies=[Depends(get_api_key)])
 
@@ -26,9 +27,8 @@ def upload_archivo(archivo: UploadFile=File(...), id_molde: int=None, db: Sessio
     )
     db.add(db_arch)
     db.commit()
-    db.refresh(db_arch)
     return db_arch
 
 @router.get("/", response_model=List[schemas.ArchivoMoldeOut])
-def list_archivos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(models.MolderiaArchivo).offset(skip).limit(limit).all()
\ No newline at end of file
+def list_archivos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.MolderiaArchivo)), db: Session = Depends(get_db)):
+    return filtros.apply(db.query(models.MolderiaArchivo)).offset(skip).limit(limit).all()
\ No newline at end of file
@@ -4,8 +4,11 @@ from datetime import timedelta
 import models
 from schemas import LoginResponse, LoginRequest, UserInfo, TokenResponse, MessageResponse, ForgotPasswordRequest, ResetPasswordRequest
 import auth_utils
+import logging
 from dependencies import get_db, get_api_key
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/auth",
     tags=["authentication"],
@@ -172,8 +175,8 @@ def forgot_password(
     reset_token = auth_utils.set_reset_token(db, usuario)
     
     # Aquí normalmente enviarías un email con el token
-    # Por ahora solo lo loggeamos (NO hacer esto en producción)
-    print(f"Token de reset para {usuario.email}: {reset_token}")
+    # Por ahora solo se registra en DEBUG (desactivado por defecto en producción)
+    logger.debug("Token de reset para %s: %s", usuario.email, reset_token)
     
     return MessageResponse(
         message="Si el email existe, se ha enviado un enlace de recuperación"
@@ -5,6 +5,7 @@ from database import get_db
 from dependencies import get_api_key
 from models import BrandingEntregable
 from schemas import EntregableCreate, EntregableOut
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(prefix="/branding/entregables", tags=["branding_entregables"], dependencies=[Depends(get_api_key)])
 
@@ -13,12 +14,11 @@ def create_entregable(item: EntregableCreate, db: Session = Depends(get_db)):
    db_obj = BrandingEntregable(**item.model_dump())
    db.add(db_obj)
    db.commit()
-   db.refresh(db_obj)
    return db_obj
 
 @router.get("/", response_model=List[EntregableOut])
-def list_entregables(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-   return db.query(BrandingEntregable).offset(skip).limit(limit).all()
+def list_entregables(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(BrandingEntregable)), db: Session = Depends(get_db)):
+   return filtros.apply(db.query(BrandingEntregable)).offset(skip).limit(limit).all()
 
 @router.get("/{id}", response_model=EntregableOut)
 def get_entregable(id: int, db: Session = Depends(get_db)):
@@ -5,6 +5,7 @@ from database import get_db
 from dependencies import get_api_key
 from models import BrandingFeedbackFecha
 from schemas import FeedbackFechaCreate, FeedbackFechaOut
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(prefix="/branding/feedback", tags=["branding_feedback"], dependencies=[Depends(get_api_key)])
 
@@ -13,12 +14,11 @@ def create_feedback(item: FeedbackFechaCreate, db: Session = Depends(get_db)):
    db_obj = BrandingFeedbackFecha(**item.model_dump())
    db.add(db_obj)
    db.commit()
-   db.refresh(db_obj)
    return db_obj
 
 @router.get("/", response_model=List[FeedbackFechaOut])
-def list_feedback(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-   return db.query(BrandingFeedbackFecha).offset(skip).limit(limit).all()
+def list_feedback(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(BrandingFeedbackFecha)), db: Session = Depends(get_db)):
+   return filtros.apply(db.query(BrandingFeedbackFecha)).offset(skip).limit(limit).all()
 
 @router.get("/{id}", response_model=FeedbackFechaOut)
 def get_feedback(id: int, db: Session = Depends(get_db)):
@@ -5,6 +5,7 @@ from database import get_db
 from dependencies import get_api_key
 from models import BrandingProyecto
 from schemas import BrandingProyectoCreate, BrandingProyectoUpdate, BrandingProyectoOut
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(prefix="/branding/proyectos", tags=["branding_proyectos"], dependencies=[Depends(get_api_key)])
 
@@ -13,12 +14,11 @@ def create_proyecto(item: BrandingProyectoCreate, db: Session = Depends(get_db))
    db_obj = BrandingProyecto(**item.model_dump())
    db.add(db_obj)
    db.commit()
-   db.refresh(db_obj)
    return db_obj
 
 @router.get("/", response_model=List[BrandingProyectoOut])
-def list_proyectos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-   return db.query(BrandingProyecto).offset(skip).limit(limit).all()
+def list_proyectos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(BrandingProyecto)), db: Session = Depends(get_db)):
+   return filtros.apply(db.query(BrandingProyecto)).offset(skip).limit(limit).all()
 
 @router.get("/{id}", response_model=BrandingProyectoOut)
 def get_proyecto(id: int, db: Session = Depends(get_db)):
@@ -35,7 +35,6 @@ def update_proyecto(id: int, item: BrandingProyectoUpdate, db: Session = Depends
    for k, v in item.model_dump(exclude_unset=True).items():
        setattr(db_obj, k, v)
    db.commit()
-   db.refresh(db_obj)
    return db_obj
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -5,6 +5,7 @@ from database import get_db
 from dependencies import get_api_key
 from models import BrandingRevision
 from schemas import RevisionCreate, RevisionOut
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(prefix="/branding/revisiones", tags=["branding_revisiones"], dependencies=[Depends(get_api_key)])
 
@@ -13,12 +14,11 @@ def create_revision(item: RevisionCreate, db: Session = Depends(get_db)):
    db_obj = BrandingRevision(**item.model_dump())
    db.add(db_obj)
    db.commit()
-   db.refresh(db_obj)
    return db_obj
 
 @router.get("/", response_model=List[RevisionOut])
-def list_revisiones(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-   return db.query(BrandingRevision).offset(skip).limit(limit).all()
+def list_revisiones(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(BrandingRevision)), db: Session = Depends(get_db)):
+   return filtros.apply(db.query(BrandingRevision)).offset(skip).limit(limit).all()
 
 @router.get("/{id}", response_model=RevisionOut)
 def get_revision(id: int, db: Session = Depends(get_db)):
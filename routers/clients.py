@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.orm import Session
 from typing import List
 import models, schemas
 from dependencies import get_db, get_api_key
+from import_utils import import_csv
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(
     prefix="/clients",
@@ -15,12 +17,16 @@ def create_cliente(cliente: schemas.ClienteCreate, db: Session = Depends(get_db)
     db_cliente = models.CRMCliente(**cliente.model_dump())
     db.add(db_cliente)
     db.commit()
-    db.refresh(db_cliente)
     return db_cliente
 
+@router.post("/import", response_model=schemas.ImportResult)
+def import_clientes(archivo: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Importar clientes desde CSV; los existentes se actualizan por email"""
+    return import_csv(db, archivo, schemas.ClienteCreate, models.CRMCliente, models.CRMCliente.email)
+
 @router.get("/", response_model=List[schemas.Cliente])
-def read_clientes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(models.CRMCliente).offset(skip).limit(limit).all()
+def read_clientes(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.CRMCliente)), db: Session = Depends(get_db)):
+    return filtros.apply(db.query(models.CRMCliente)).offset(skip).limit(limit).all()
 
 @router.get("/{cliente_id}", response_model=schemas.Cliente)
 def read_cliente(cliente_id: int, db: Session = Depends(get_db)):
@@ -51,7 +57,6 @@ def update_cliente(
         setattr(db_cliente, field, value)
     
     db.commit()
-    db.refresh(db_cliente)
     return db_cliente
 
 @router.patch("/{cliente_id}", response_model=schemas.Cliente)
@@ -74,7 +79,6 @@ def patch_cliente(
         setattr(db_cliente, field, value)
     
     db.commit()
-    db.refresh(db_cliente)
     return db_cliente
 
 @router.delete("/{cliente_id}", status_code=204)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 import models, schemas
 from dependencies import get_db
 from dependencies import get_api_key
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(prefix="/ecommerce/documentos", tags=["E-Commerce Documentos"], dependencies=[Depends(get_api_key)])
 
@@ -34,12 +35,12 @@ def upload_documento(
        es_publico=es_publico,
        subido_por=subido_por
    )
-   db.add(obj); db.commit(); db.refresh(obj)
+   db.add(obj); db.commit()
    return obj
 
 @router.get("/", response_model=List[schemas.EcommerceDocumentoOut])
-def list_documentos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-   return db.query(models.EcommerceDocumento).offset(skip).limit(limit).all()
+def list_documentos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.EcommerceDocumento)), db: Session = Depends(get_db)):
+   return filtros.apply(db.query(models.EcommerceDocumento)).offset(skip).limit(limit).all()
 
 @router.get("/{id}", response_model=schemas.EcommerceDocumentoOut)
 def get_documento(id: int, db: Session = Depends(get_db)):
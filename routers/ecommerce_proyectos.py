@@ -4,18 +4,19 @@ from sqlalchemy.orm import Session
 import models, schemas
 from dependencies import get_db
 from dependencies import get_api_key
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(prefix="/ecommerce/proyectos", tags=["E-Commerce Proyectos"], dependencies=[Depends(get_api_key)])
 
 @router.post("/", response_model=schemas.EcommerceProyectoOut)
 def create_proyecto(proyecto: schemas.EcommerceProyectoCreate, db: Session = Depends(get_db)):
    db_obj = models.EcommerceProyecto(**proyecto.model_dump())
-   db.add(db_obj); db.commit(); db.refresh(db_obj)
+   db.add(db_obj); db.commit()
    return db_obj
 
 @router.get("/", response_model=List[schemas.EcommerceProyectoOut])
-def list_proyectos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-   return db.query(models.EcommerceProyecto).offset(skip).limit(limit).all()
+def list_proyectos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.EcommerceProyecto)), db: Session = Depends(get_db)):
+   return filtros.apply(db.query(models.EcommerceProyecto)).offset(skip).limit(limit).all()
 
 @router.get("/{id}", response_model=schemas.EcommerceProyectoOut)
 def get_proyecto(id: int, db: Session = Depends(get_db)):
@@ -30,7 +31,7 @@ def update_proyecto(id: int, proyecto: schemas.EcommerceProyectoUpdate, db: Sess
    if not obj:
        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
    for k, v in proyecto.model_dump(exclude_unset=True).items(): setattr(obj, k, v)
-   db.commit(); db.refresh(obj)
+   db.commit()
    return obj
 
 @router.delete("/{id}")
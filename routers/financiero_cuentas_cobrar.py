@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+from database import hoy
 from dependencies import get_db, get_api_key
+from export_utils import EXPORT_FORMAT_PATTERN, build_export_query, stream_export
 from models import FinancieroCuentaCobrar
-from schemas import CuentaCobrarCreate, CuentaCobrarOut, CuentaCobrarUpdate
+from query_utils import ListFilters, list_filters
+from schemas import AntiguedadCliente, CuentaCobrarCreate, CuentaCobrarOut, CuentaCobrarUpdate, RecalculoAntiguedad
+from services.cartera import recalcular_antiguedad, reporte_antiguedad
 
 router = APIRouter(
    prefix="/financiero/cuentas-cobrar",
@@ -13,12 +19,71 @@ router = APIRouter(
 @router.post("/", response_model=CuentaCobrarOut, status_code=status.HTTP_201_CREATED)
 def create_cuenta(c: CuentaCobrarCreate, db: Session = Depends(get_db)):
    db_c = FinancieroCuentaCobrar(**c.model_dump())
-   db.add(db_c); db.commit(); db.refresh(db_c)
+   db.add(db_c); db.commit()
    return db_c
 
 @router.get("/", response_model=list[CuentaCobrarOut])
-def list_cuentas(db: Session = Depends(get_db)):
-   return db.query(FinancieroCuentaCobrar).all()
+def list_cuentas(
+   skip: int = 0,
+   limit: Optional[int] = Query(None, description="Sin límite se devuelven todas las cuentas"),
+   filtros: ListFilters = Depends(list_filters(FinancieroCuentaCobrar)),
+   db: Session = Depends(get_db)
+):
+   if skip < 0:
+       raise HTTPException(
+           status_code=status.HTTP_400_BAD_REQUEST,
+           detail="El parámetro 'skip' debe ser mayor o igual a 0"
+       )
+   if limit is not None and (limit <= 0 or limit > 1000):
+       raise HTTPException(
+           status_code=status.HTTP_400_BAD_REQUEST,
+           detail="El parámetro 'limit' debe estar entre 1 y 1000"
+       )
+   return filtros.apply(db.query(FinancieroCuentaCobrar)).offset(skip).limit(limit).all()
+
+@router.get("/export")
+def export_cuentas(
+   formato: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+   fecha_desde: Optional[date] = Query(None, description="Vencimiento desde (YYYY-MM-DD)"),
+   fecha_hasta: Optional[date] = Query(None, description="Vencimiento hasta (YYYY-MM-DD)"),
+   id_cliente: Optional[int] = Query(None),
+   estado: Optional[str] = Query(None)
+):
+   """Exportar cuentas por cobrar en CSV o XLSX"""
+   stmt = build_export_query(
+       FinancieroCuentaCobrar,
+       FinancieroCuentaCobrar.fecha_vencimiento,
+       fecha_desde,
+       fecha_hasta,
+       id_cliente=id_cliente,
+       estado=estado
+   )
+   return stream_export(FinancieroCuentaCobrar, stmt, formato, "cuentas_cobrar")
+
+@router.get("/aging", response_model=list[AntiguedadCliente])
+def aging_cuentas(
+   id_cliente: Optional[int] = Query(None),
+   skip: int = Query(0, ge=0),
+   limit: int = Query(100, ge=1, le=1000),
+   db: Session = Depends(get_db)
+):
+   """Saldo abierto por cliente en tramos de 0-30, 31-60, 61-90 y más de 90 días.
+
+   Usa los días vencidos almacenados; se actualizan con POST /aging/recalcular
+   o con `python -m services.cartera`.
+   """
+   return reporte_antiguedad(db, id_cliente=id_cliente, skip=skip, limit=limit)
+
+@router.post("/aging/recalcular", response_model=RecalculoAntiguedad)
+def recalcular_aging(
+   fecha_corte: Optional[date] = Query(None, description="Fecha de corte (por defecto hoy)"),
+   db: Session = Depends(get_db)
+):
+   """Recalcular días vencidos y estado de la cartera en un solo UPDATE"""
+   fecha_corte = fecha_corte or hoy()
+   actualizadas = recalcular_antiguedad(db, fecha_corte)
+   db.commit()
+   return {"fecha_corte": fecha_corte, "actualizadas": actualizadas}
 
 @router.get("/{cuenta_id}", response_model=CuentaCobrarOut)
 def get_cuenta(cuenta_id: int, db: Session = Depends(get_db)):
@@ -34,7 +99,7 @@ def update_cuenta(cuenta_id: int, c: CuentaCobrarUpdate, db: Session = Depends(g
        raise HTTPException(404, "Cuenta por cobrar no encontrada")
    for k, v in c.model_dump(exclude_unset=True).items():
        setattr(db_c, k, v)
-   db.commit(); db.refresh(db_c)
+   db.commit()
    return db_c
 
 @router.delete("/{cuenta_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
 from dependencies import get_db, get_api_key
+from export_utils import EXPORT_FORMAT_PATTERN, build_export_query, stream_export
 from models import FinancieroFactura
-from schemas import FacturaCreate, FacturaOut, FacturaUpdate
+from schemas import ConciliacionSaldos, FacturaCreate, FacturaOut, FacturaUpdate
+from query_utils import ListFilters, list_filters
+from services.facturacion import CONCILIACION_LOTE, conciliar_saldos
 
 router = APIRouter(
     prefix="/financiero/facturas",
@@ -18,7 +25,6 @@ def create_factura(factura: FacturaCreate, db: Session = Depends(get_db)):
         db_factura = FinancieroFactura(**factura.model_dump())
         db.add(db_factura)
         db.commit()
-        db.refresh(db_factura)
         return db_factura
     except SQLAlchemyError as e:
         db.rollback()
@@ -28,9 +34,18 @@ def create_factura(factura: FacturaCreate, db: Session = Depends(get_db)):
         )
 
 @router.get("/", response_model=List[FacturaOut])
-def list_facturas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def list_facturas(
+    skip: int = 0,
+    limit: int = 100,
+    abiertas: Optional[bool] = Query(None, description="true: con saldo pendiente; false: liquidadas"),
+    filtros: ListFilters = Depends(list_filters(FinancieroFactura, parametros=("abiertas",))),
+    db: Session = Depends(get_db)
+):
     try:
-        facturas = db.query(FinancieroFactura).offset(skip).limit(limit).all()
+        query = filtros.apply(db.query(FinancieroFactura))
+        if abiertas is not None:
+            query = query.filter(FinancieroFactura.saldo > 0 if abiertas else FinancieroFactura.saldo <= 0)
+        facturas = query.offset(skip).limit(limit).all()
         return facturas
     except SQLAlchemyError:
         raise HTTPException(
@@ -38,6 +53,41 @@ def list_facturas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
             detail="Error al obtener las facturas"
         )
 
+@router.get("/export")
+def export_facturas(
+    formato: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    fecha_desde: Optional[date] = Query(None, description="Fecha de emisión desde (YYYY-MM-DD)"),
+    fecha_hasta: Optional[date] = Query(None, description="Fecha de emisión hasta (YYYY-MM-DD)"),
+    id_proyecto: Optional[int] = Query(None),
+    estado: Optional[str] = Query(None)
+):
+    """Exportar facturas (sin archivos XML/PDF) en CSV o XLSX"""
+    stmt = build_export_query(
+        FinancieroFactura,
+        FinancieroFactura.fecha_emision,
+        fecha_desde,
+        fecha_hasta,
+        id_proyecto=id_proyecto,
+        estado=estado
+    )
+    return stream_export(FinancieroFactura, stmt, formato, "facturas")
+
+@router.post("/conciliar-saldos", response_model=ConciliacionSaldos)
+def conciliar_saldos_facturas(
+    corregir: bool = Query(False, description="Reescribir los acumulados con diferencias"),
+    lote: int = Query(CONCILIACION_LOTE, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """Verificar monto pagado y saldo de cada factura contra la suma de sus pagos"""
+    try:
+        return conciliar_saldos(db, corregir=corregir, lote=lote)
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al conciliar los saldos"
+        )
+
 @router.get("/{factura_id}", response_model=FacturaOut)
 def get_factura(factura_id: int, db: Session = Depends(get_db)):
     if factura_id <= 0:
@@ -86,8 +136,18 @@ def update_factura(factura_id: int, factura_update: FacturaUpdate, db: Session =
         for field, value in update_data.items():
             setattr(db_factura, field, value)
         
+        if update_data.get("total") is not None:
+            # Con la fila bloqueada ningún pago paralelo cambia monto_pagado
+            # hasta el commit; el valor leído queda también en el objeto
+            monto_pagado = db.scalar(
+                select(FinancieroFactura.monto_pagado)
+                .where(FinancieroFactura.id_factura == factura_id)
+                .with_for_update()
+            ) or Decimal("0")
+            set_committed_value(db_factura, "monto_pagado", monto_pagado)
+            db_factura.saldo = Decimal(str(update_data["total"])) - monto_pagado
+        
         db.commit()
-        db.refresh(db_factura)
         return db_factura
         
     except SQLAlchemyError:
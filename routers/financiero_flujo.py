@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Optional
+from datetime import date
+from dependencies import get_db, get_api_key
+from schemas import FlujoPeriodo, FlujoReconstruccion
+from services.flujo import GRANULARIDADES, reconstruir_flujo, serie_flujo
+
+router = APIRouter(
+    prefix="/financiero/flujo",
+    tags=["financiero"],
+    dependencies=[Depends(get_api_key)]
+)
+
+def _validar_rango(fecha_desde: Optional[date], fecha_hasta: Optional[date]):
+    if fecha_desde and fecha_hasta and fecha_desde > fecha_hasta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'fecha_desde' debe ser anterior o igual a 'fecha_hasta'"
+        )
+
+@router.get("/", response_model=List[FlujoPeriodo])
+def get_flujo(
+    fecha_desde: date = Query(..., description="Inicio del periodo (YYYY-MM-DD)"),
+    fecha_hasta: date = Query(..., description="Fin del periodo (YYYY-MM-DD)"),
+    granularidad: str = Query("dia", pattern=f"^({'|'.join(GRANULARIDADES)})$"),
+    moneda: Optional[str] = Query(None, min_length=3, max_length=3),
+    db: Session = Depends(get_db)
+):
+    """Entradas (pagos), salidas (gastos) y neto por periodo y moneda.
+
+    Se lee de la tabla diaria materializada; las semanas empiezan en lunes y
+    los periodos sin movimientos no aparecen.
+    """
+    _validar_rango(fecha_desde, fecha_hasta)
+
+    try:
+        return serie_flujo(db, fecha_desde, fecha_hasta, granularidad, moneda)
+    except SQLAlchemyError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener el flujo de efectivo"
+        )
+
+@router.post("/reconstruir", response_model=FlujoReconstruccion)
+def post_reconstruir_flujo(
+    fecha_desde: Optional[date] = Query(None, description="Sin fechas se reconstruye todo el histórico"),
+    fecha_hasta: Optional[date] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Recalcular el flujo diario del rango desde pagos y gastos"""
+    _validar_rango(fecha_desde, fecha_hasta)
+
+    try:
+        return reconstruir_flujo(db, fecha_desde, fecha_hasta)
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al reconstruir el flujo de efectivo"
+        )
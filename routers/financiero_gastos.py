@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
+from typing import List, Optional
+from datetime import date
 from dependencies import get_db, get_api_key
+from export_utils import EXPORT_FORMAT_PATTERN, build_export_query, stream_export
 from models import FinancieroGasto
 from schemas import GastoCreate, GastoOut, GastoUpdate
+from query_utils import ListFilters, list_filters
+from services.flujo import registrar_gastos
 
 router = APIRouter(
     prefix="/financiero/gastos",
@@ -17,8 +21,8 @@ def create_gasto(gasto: GastoCreate, db: Session = Depends(get_db)):
     try:
         db_gasto = FinancieroGasto(**gasto.model_dump())
         db.add(db_gasto)
+        registrar_gastos(db, [(gasto.fecha_gasto, gasto.moneda, gasto.monto, 1)])
         db.commit()
-        db.refresh(db_gasto)
         return db_gasto
     except SQLAlchemyError as e:
         db.rollback()
@@ -28,9 +32,9 @@ def create_gasto(gasto: GastoCreate, db: Session = Depends(get_db)):
         )
 
 @router.get("/", response_model=List[GastoOut])
-def list_gastos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def list_gastos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(FinancieroGasto)), db: Session = Depends(get_db)):
     try:
-        gastos = db.query(FinancieroGasto).offset(skip).limit(limit).all()
+        gastos = filtros.apply(db.query(FinancieroGasto)).offset(skip).limit(limit).all()
         return gastos
     except SQLAlchemyError:
         raise HTTPException(
@@ -38,6 +42,25 @@ def list_gastos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
             detail="Error al obtener los gastos"
         )
 
+@router.get("/export")
+def export_gastos(
+    formato: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    fecha_desde: Optional[date] = Query(None, description="Fecha del gasto desde (YYYY-MM-DD)"),
+    fecha_hasta: Optional[date] = Query(None, description="Fecha del gasto hasta (YYYY-MM-DD)"),
+    id_proyecto: Optional[int] = Query(None),
+    categoria: Optional[str] = Query(None)
+):
+    """Exportar gastos (sin comprobantes) en CSV o XLSX"""
+    stmt = build_export_query(
+        FinancieroGasto,
+        FinancieroGasto.fecha_gasto,
+        fecha_desde,
+        fecha_hasta,
+        id_proyecto=id_proyecto,
+        categoria=categoria
+    )
+    return stream_export(FinancieroGasto, stmt, formato, "gastos")
+
 @router.get("/{gasto_id}", response_model=GastoOut)
 def get_gasto(gasto_id: int, db: Session = Depends(get_db)):
     if gasto_id <= 0:
@@ -83,11 +106,14 @@ def update_gasto(gasto_id: int, gasto_update: GastoUpdate, db: Session = Depends
                 detail="No se proporcionaron datos para actualizar"
             )
         
+        # Revertir el gasto en el flujo y aplicarlo con los valores nuevos
+        flujo = [(db_gasto.fecha_gasto, db_gasto.moneda, db_gasto.monto, -1)]
         for field, value in update_data.items():
             setattr(db_gasto, field, value)
+        flujo.append((db_gasto.fecha_gasto, db_gasto.moneda, db_gasto.monto, 1))
+        registrar_gastos(db, flujo)
         
         db.commit()
-        db.refresh(db_gasto)
         return db_gasto
         
     except SQLAlchemyError:
@@ -114,6 +140,7 @@ def delete_gasto(gasto_id: int, db: Session = Depends(get_db)):
             )
         
         db.delete(db_gasto)
+        registrar_gastos(db, [(db_gasto.fecha_gasto, db_gasto.moneda, db_gasto.monto, -1)])
         db.commit()
         
     except SQLAlchemyError:
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
+from typing import List, Optional
+from datetime import date
+from bulk_utils import BULK_MAX_ITEMS, bulk_insert
 from dependencies import get_db, get_api_key
-from models import FinancieroPago
-from schemas import PagoCreate, PagoOut, PagoUpdate
+from export_utils import EXPORT_FORMAT_PATTERN, build_export_query, stream_export
+from models import FinancieroFactura, FinancieroPago
+from schemas import BulkCreateResponse, PagoCreate, PagoOut, PagoUpdate
+from query_utils import ListFilters, list_filters
+from services.facturacion import aplicar_pagos
+from services.flujo import registrar_pagos
 
 router = APIRouter(
     prefix="/financiero/pagos",
@@ -17,8 +24,9 @@ def create_pago(pago: PagoCreate, db: Session = Depends(get_db)):
     try:
         db_pago = FinancieroPago(**pago.model_dump())
         db.add(db_pago)
+        aplicar_pagos(db, [(pago.id_factura, pago.monto)])
+        registrar_pagos(db, [(pago.id_factura, pago.fecha_pago, pago.monto, 1)])
         db.commit()
-        db.refresh(db_pago)
         return db_pago
     except SQLAlchemyError as e:
         db.rollback()
@@ -27,10 +35,34 @@ def create_pago(pago: PagoCreate, db: Session = Depends(get_db)):
             detail="Error al crear el pago"
         )
 
+@router.post("/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+def create_pagos_bulk(
+    pagos: List[PagoCreate] = Body(..., min_length=1, max_length=BULK_MAX_ITEMS),
+    db: Session = Depends(get_db)
+):
+    """Registrar un lote de pagos en una sola transacción"""
+    try:
+        ids = bulk_insert(
+            db,
+            FinancieroPago,
+            [p.model_dump() for p in pagos],
+            natural_key=FinancieroPago.numero_pago
+        )
+        aplicar_pagos(db, [(p.id_factura, p.monto) for p in pagos])
+        registrar_pagos(db, [(p.id_factura, p.fecha_pago, p.monto, 1) for p in pagos])
+        db.commit()
+        return {"created": len(ids), "ids": ids}
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error al registrar los pagos"
+        )
+
 @router.get("/", response_model=List[PagoOut])
-def list_pagos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def list_pagos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(FinancieroPago)), db: Session = Depends(get_db)):
     try:
-        pagos = db.query(FinancieroPago).offset(skip).limit(limit).all()
+        pagos = filtros.apply(db.query(FinancieroPago)).offset(skip).limit(limit).all()
         return pagos
     except SQLAlchemyError:
         raise HTTPException(
@@ -38,6 +70,37 @@ def list_pagos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
             detail="Error al obtener los pagos"
         )
 
+@router.get("/export")
+def export_pagos(
+    formato: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    fecha_desde: Optional[date] = Query(None, description="Fecha de pago desde (YYYY-MM-DD)"),
+    fecha_hasta: Optional[date] = Query(None, description="Fecha de pago hasta (YYYY-MM-DD)"),
+    id_proyecto: Optional[int] = Query(None, description="Pagos de facturas de este proyecto"),
+    id_factura: Optional[int] = Query(None),
+    estado: Optional[str] = Query(None, description="Estado de la factura pagada")
+):
+    """Exportar pagos (sin comprobantes) en CSV o XLSX"""
+    criterios = []
+
+    # Los pagos no tienen proyecto ni estado propios; se filtran por su factura
+    if id_proyecto is not None or estado is not None:
+        facturas = select(FinancieroFactura.id_factura)
+        if id_proyecto is not None:
+            facturas = facturas.where(FinancieroFactura.id_proyecto == id_proyecto)
+        if estado is not None:
+            facturas = facturas.where(FinancieroFactura.estado == estado)
+        criterios.append(FinancieroPago.id_factura.in_(facturas))
+
+    stmt = build_export_query(
+        FinancieroPago,
+        FinancieroPago.fecha_pago,
+        fecha_desde,
+        fecha_hasta,
+        *criterios,
+        id_factura=id_factura
+    )
+    return stream_export(FinancieroPago, stmt, formato, "pagos")
+
 @router.get("/{pago_id}", response_model=PagoOut)
 def get_pago(pago_id: int, db: Session = Depends(get_db)):
     if pago_id <= 0:
@@ -83,11 +146,17 @@ def update_pago(pago_id: int, pago_update: PagoUpdate, db: Session = Depends(get
                 detail="No se proporcionaron datos para actualizar"
             )
         
+        # Revertir el pago en su factura anterior y aplicarlo con los valores nuevos
+        movimientos = [(db_pago.id_factura, -db_pago.monto)]
+        flujo = [(db_pago.id_factura, db_pago.fecha_pago, db_pago.monto, -1)]
         for field, value in update_data.items():
             setattr(db_pago, field, value)
+        movimientos.append((db_pago.id_factura, db_pago.monto))
+        flujo.append((db_pago.id_factura, db_pago.fecha_pago, db_pago.monto, 1))
+        aplicar_pagos(db, movimientos)
+        registrar_pagos(db, flujo)
         
         db.commit()
-        db.refresh(db_pago)
         return db_pago
         
     except SQLAlchemyError:
@@ -114,6 +183,8 @@ def delete_pago(pago_id: int, db: Session = Depends(get_db)):
             )
         
         db.delete(db_pago)
+        aplicar_pagos(db, [(db_pago.id_factura, -db_pago.monto)])
+        registrar_pagos(db, [(db_pago.id_factura, db_pago.fecha_pago, db_pago.monto, -1)])
         db.commit()
         
     except SQLAlchemyError:
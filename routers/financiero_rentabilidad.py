@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Optional
+from datetime import date
+from dependencies import get_db, get_api_key
+from schemas import RentabilidadReporte
+from services.rentabilidad import rentabilidad_por_proyecto
+
+router = APIRouter(
+    prefix="/financiero/rentabilidad",
+    tags=["financiero"],
+    dependencies=[Depends(get_api_key)]
+)
+
+@router.get("/", response_model=RentabilidadReporte)
+def get_rentabilidad(
+    fecha_desde: Optional[date] = Query(None, description="Inicio del periodo (YYYY-MM-DD)"),
+    fecha_hasta: Optional[date] = Query(None, description="Fin del periodo (YYYY-MM-DD)"),
+    id_proyecto: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Ingresos contra gastos, costo de producción y de materiales por proyecto.
+
+    Cada fuente se filtra por su propia fecha: emisión de la factura, fecha del
+    gasto, inicio estimado del plan y asignación del material.
+    """
+    if fecha_desde and fecha_hasta and fecha_desde > fecha_hasta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'fecha_desde' debe ser anterior o igual a 'fecha_hasta'"
+        )
+
+    try:
+        return rentabilidad_por_proyecto(db, fecha_desde, fecha_hasta, id_proyecto)
+    except SQLAlchemyError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al calcular la rentabilidad"
+        )
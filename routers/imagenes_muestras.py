@@ -4,6 +4,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Optional
 import models, schemas
 from dependencies import get_db, get_api_key
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(
     prefix="/imagenes-muestras", 
@@ -57,7 +58,6 @@ def upload_imagen(
         
         db.add(db_imagen)
         db.commit()
-        db.refresh(db_imagen)
         return db_imagen
         
     except SQLAlchemyError:
@@ -76,7 +76,7 @@ def upload_imagen(
 def list_imagenes(
     skip: int = 0, 
     limit: int = 100, 
-    id_muestra: Optional[int] = None,
+    filtros: ListFilters = Depends(list_filters(models.MolderiaImagenMuestra)),
     db: Session = Depends(get_db)
 ):
     # Validar parámetros de paginación
@@ -92,19 +92,9 @@ def list_imagenes(
             detail="El parámetro 'limit' debe estar entre 1 y 1000"
         )
     
-    # Validar ID de muestra si se filtra
-    if id_muestra is not None and id_muestra <= 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="ID de muestra inválido para filtro"
-        )
-    
     try:
-        query = db.query(models.MolderiaImagenMuestra)
-        
-        # Aplicar filtro por ID de muestra si se especifica
-        if id_muestra is not None:
-            query = query.filter(models.MolderiaImagenMuestra.id_muestra == id_muestra)
+        # id_muestra y demás columnas se filtran con `filtros`
+        query = filtros.apply(db.query(models.MolderiaImagenMuestra))
         
         imagenes = query.offset(skip).limit(limit).all()
         return imagenes
@@ -3,7 +3,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List
 import models, schemas
+import logging
 from dependencies import get_db, get_api_key
+from query_utils import ListFilters, list_filters
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/moldes", 
@@ -14,33 +18,30 @@ router = APIRouter(
 @router.post("/", response_model=schemas.MoldeOut, status_code=status.HTTP_201_CREATED)
 def create_molde(molde: schemas.MoldeCreate, db: Session = Depends(get_db)):
     try:
-        # Agregar logging para debugging
-        print(f"Datos recibidos: {molde.model_dump()}")
+        logger.debug("Datos recibidos: %s", molde)
         
         db_molde = models.MolderiaMolde(**molde.model_dump())
         db.add(db_molde)
         db.commit()
-        db.refresh(db_molde)
         return db_molde
         
     except SQLAlchemyError as e:
         db.rollback()
-        # Mostrar el error específico para debugging
-        print(f"Error SQL: {str(e)}")
+        logger.error("Error SQL al crear molde: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error al crear el molde: {str(e)}"
         )
     except Exception as e:
         db.rollback()
-        print(f"Error general: {str(e)}")
+        logger.exception("Error inesperado al crear molde")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error inesperado: {str(e)}"
         )
 
 @router.get("/", response_model=List[schemas.MoldeOut])
-def read_moldes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_moldes(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.MolderiaMolde)), db: Session = Depends(get_db)):
     # Validar parámetros de paginación
     if skip < 0:
         raise HTTPException(
@@ -55,7 +56,7 @@ def read_moldes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
         )
     
     try:
-        moldes = db.query(models.MolderiaMolde).offset(skip).limit(limit).all()
+        moldes = filtros.apply(db.query(models.MolderiaMolde)).offset(skip).limit(limit).all()
         return moldes
     except SQLAlchemyError:
         raise HTTPException(
@@ -112,7 +113,6 @@ def update_molde(molde_id: int, molde_update: schemas.MoldeUpdate, db: Session =
             setattr(db_molde, field, value)
         
         db.commit()
-        db.refresh(db_molde)
         return db_molde
         
     except SQLAlchemyError:
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
+from typing import List, Optional
+from datetime import date
 import models, schemas
+from bulk_utils import bulk_criteria, bulk_delete, bulk_update
 from dependencies import get_db, get_api_key
+from query_utils import ListFilters, list_filters
+from services.muestras import AGRUPACIONES, analitica_muestras, refrescar_resumen
 
 router = APIRouter(
     prefix="/muestras", 
@@ -17,7 +21,6 @@ def create_muestra(muestra: schemas.MuestraCreate, db: Session = Depends(get_db)
         db_muestra = models.MolderiaMuestra(**muestra.model_dump())
         db.add(db_muestra)
         db.commit()
-        db.refresh(db_muestra)
         return db_muestra
     except SQLAlchemyError:
         db.rollback()
@@ -27,7 +30,7 @@ def create_muestra(muestra: schemas.MuestraCreate, db: Session = Depends(get_db)
         )
 
 @router.get("/", response_model=List[schemas.MuestraOut])
-def read_muestras(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_muestras(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.MolderiaMuestra)), db: Session = Depends(get_db)):
     # Validar parámetros de paginación
     if skip < 0:
         raise HTTPException(
@@ -42,7 +45,7 @@ def read_muestras(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
         )
     
     try:
-        muestras = db.query(models.MolderiaMuestra).offset(skip).limit(limit).all()
+        muestras = filtros.apply(db.query(models.MolderiaMuestra)).offset(skip).limit(limit).all()
         return muestras
     except SQLAlchemyError:
         raise HTTPException(
@@ -50,6 +53,88 @@ def read_muestras(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
             detail="Error al obtener las muestras"
         )
 
+@router.patch("/bulk", response_model=schemas.BulkAffectedResponse)
+def update_muestras_bulk(datos: schemas.MuestraBulkUpdate, db: Session = Depends(get_db)):
+    """Actualizar en un solo UPDATE las muestras indicadas por IDs o filtro"""
+    criterios = bulk_criteria(models.MolderiaMuestra, datos.ids, datos.filtro)
+
+    cambios = datos.cambios.model_dump(exclude_unset=True)
+    if not cambios:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No se proporcionaron datos para actualizar"
+        )
+
+    try:
+        affected = bulk_update(db, models.MolderiaMuestra, criterios, cambios)
+        db.commit()
+        return {"affected": affected}
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al actualizar las muestras"
+        )
+
+@router.delete("/bulk", response_model=schemas.BulkAffectedResponse)
+def delete_muestras_bulk(datos: schemas.MuestraBulkDelete, db: Session = Depends(get_db)):
+    """Eliminar en un solo DELETE las muestras indicadas por IDs o filtro"""
+    criterios = bulk_criteria(models.MolderiaMuestra, datos.ids, datos.filtro)
+
+    try:
+        affected = bulk_delete(db, models.MolderiaMuestra, criterios)
+        db.commit()
+        return {"affected": affected}
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al eliminar las muestras"
+        )
+
+@router.get("/analytics", response_model=schemas.MuestrasAnalytics)
+def get_muestras_analytics(
+    agrupar_por: str = Query("proyecto", pattern=f"^({'|'.join(AGRUPACIONES)})$"),
+    fecha_desde: Optional[date] = Query(None, description="Mes de creación inicial (YYYY-MM-DD)"),
+    fecha_hasta: Optional[date] = Query(None, description="Mes de creación final (YYYY-MM-DD)"),
+    id_proyecto: Optional[int] = None,
+    id_molde: Optional[int] = Query(None, description="0 para muestras sin molde"),
+    db: Session = Depends(get_db)
+):
+    """Ciclo de entrega, tasa de retraso y costo de las muestras por grupo.
+
+    Se lee del resumen mensual que reconstruye el job nocturno; 'actualizado'
+    indica la fecha de ese cálculo.
+    """
+    if fecha_desde and fecha_hasta and fecha_desde > fecha_hasta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'fecha_desde' debe ser anterior o igual a 'fecha_hasta'"
+        )
+
+    try:
+        return analitica_muestras(db, agrupar_por, fecha_desde, fecha_hasta, id_proyecto, id_molde)
+    except SQLAlchemyError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener la analítica de muestras"
+        )
+
+@router.post("/analytics/refrescar", response_model=schemas.RefrescoResumenMuestras)
+def post_refrescar_analytics(
+    desde: Optional[date] = Query(None, description="Sin fecha se reconstruye todo el resumen"),
+    db: Session = Depends(get_db)
+):
+    """Reconstruir el resumen de muestras sin esperar al job nocturno"""
+    try:
+        return refrescar_resumen(db, desde)
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al reconstruir el resumen de muestras"
+        )
+
 @router.get("/{muestra_id}", response_model=schemas.MuestraOut)
 def read_muestra(muestra_id: int, db: Session = Depends(get_db)):
     if muestra_id <= 0:
@@ -99,7 +184,6 @@ def update_muestra(muestra_id: int, muestra_update: schemas.MuestraUpdate, db: S
             setattr(db_muestra, field, value)
         
         db.commit()
-        db.refresh(db_muestra)
         return db_muestra
         
     except SQLAlchemyError:
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 from typing import List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
+from bulk_utils import BULK_MAX_ITEMS, bulk_criteria, bulk_delete, bulk_insert, bulk_update
 from dependencies import get_db, get_api_key
 import models, schemas
+from query_utils import ListFilters, list_filters
+from services.programacion import reprogramar
+from services.progreso import actualizar_progreso
 
 router = APIRouter(
     prefix="/produccion/detalle_plan",
@@ -16,8 +21,10 @@ def crear_detalle(detalle: schemas.DetallePlanCreate, db: Session = Depends(get_
     try:
         db_detalle = models.ProduccionDetallePlan(**detalle.model_dump())
         db.add(db_detalle)
+        db.flush()
+        reprogramar(db, [db_detalle.id_plan])
+        actualizar_progreso(db, [db_detalle.id_plan])
         db.commit()
-        db.refresh(db_detalle)
         return db_detalle
     except SQLAlchemyError:
         db.rollback()
@@ -26,8 +33,27 @@ def crear_detalle(detalle: schemas.DetallePlanCreate, db: Session = Depends(get_
             detail="Error al crear el detalle del plan"
         )
 
+@router.post("/bulk", response_model=schemas.BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+def crear_detalles_bulk(
+    detalles: List[schemas.DetallePlanCreate] = Body(..., min_length=1, max_length=BULK_MAX_ITEMS),
+    db: Session = Depends(get_db)
+):
+    """Crear varias etapas de plan en una sola transacción"""
+    try:
+        ids = bulk_insert(db, models.ProduccionDetallePlan, [d.model_dump() for d in detalles])
+        reprogramar(db, {d.id_plan for d in detalles})
+        actualizar_progreso(db, {d.id_plan for d in detalles})
+        db.commit()
+        return {"created": len(ids), "ids": ids}
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error al crear los detalles del plan"
+        )
+
 @router.get("/", response_model=List[schemas.DetallePlanOut])
-def listar_detalles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def listar_detalles(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.ProduccionDetallePlan)), db: Session = Depends(get_db)):
     # Validar parámetros de paginación
     if skip < 0:
         raise HTTPException(
@@ -42,7 +68,7 @@ def listar_detalles(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
         )
     
     try:
-        detalles = db.query(models.ProduccionDetallePlan).offset(skip).limit(limit).all()
+        detalles = filtros.apply(db.query(models.ProduccionDetallePlan)).offset(skip).limit(limit).all()
         return detalles
     except SQLAlchemyError:
         raise HTTPException(
@@ -50,6 +76,57 @@ def listar_detalles(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
             detail="Error al obtener los detalles del plan"
         )
 
+@router.patch("/bulk", response_model=schemas.BulkAffectedResponse)
+def actualizar_detalles_bulk(datos: schemas.DetallePlanBulkUpdate, db: Session = Depends(get_db)):
+    """Actualizar en un solo UPDATE los detalles indicados por IDs o filtro"""
+    criterios = bulk_criteria(models.ProduccionDetallePlan, datos.ids, datos.filtro)
+
+    cambios = datos.cambios.model_dump(exclude_unset=True)
+    if not cambios:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No se proporcionaron datos para actualizar"
+        )
+
+    try:
+        planes = set(db.scalars(
+            select(models.ProduccionDetallePlan.id_plan).where(*criterios).distinct()
+        ))
+        affected = bulk_update(db, models.ProduccionDetallePlan, criterios, cambios)
+        if "id_plan" in cambios:
+            planes.add(cambios["id_plan"])
+        reprogramar(db, planes)
+        actualizar_progreso(db, planes)
+        db.commit()
+        return {"affected": affected}
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al actualizar los detalles"
+        )
+
+@router.delete("/bulk", response_model=schemas.BulkAffectedResponse)
+def borrar_detalles_bulk(datos: schemas.DetallePlanBulkDelete, db: Session = Depends(get_db)):
+    """Eliminar en un solo DELETE los detalles indicados por IDs o filtro"""
+    criterios = bulk_criteria(models.ProduccionDetallePlan, datos.ids, datos.filtro)
+
+    try:
+        planes = set(db.scalars(
+            select(models.ProduccionDetallePlan.id_plan).where(*criterios).distinct()
+        ))
+        affected = bulk_delete(db, models.ProduccionDetallePlan, criterios)
+        reprogramar(db, planes)
+        actualizar_progreso(db, planes)
+        db.commit()
+        return {"affected": affected}
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al eliminar los detalles"
+        )
+
 @router.get("/{id_detalle}", response_model=schemas.DetallePlanOut)
 def obtener_detalle(id_detalle: int, db: Session = Depends(get_db)):
     if id_detalle <= 0:
@@ -95,11 +172,15 @@ def actualizar_detalle(id_detalle: int, detalle_update: schemas.DetallePlanUpdat
                 detail="No se proporcionaron datos para actualizar"
             )
         
+        planes = {db_detalle.id_plan}
         for field, value in update_data.items():
             setattr(db_detalle, field, value)
+        planes.add(db_detalle.id_plan)
         
+        db.flush()
+        reprogramar(db, planes)
+        actualizar_progreso(db, planes)
         db.commit()
-        db.refresh(db_detalle)
         return db_detalle
         
     except SQLAlchemyError:
@@ -126,6 +207,9 @@ def borrar_detalle(id_detalle: int, db: Session = Depends(get_db)):
             )
         
         db.delete(db_detalle)
+        db.flush()
+        reprogramar(db, [db_detalle.id_plan])
+        actualizar_progreso(db, [db_detalle.id_plan])
         db.commit()
         
     except SQLAlchemyError:
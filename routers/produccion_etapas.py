@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from dependencies import get_db, get_api_key
 import models, schemas
+from query_utils import ListFilters, list_filters
+from services.programacion import reprogramar
+from services.progreso import actualizar_progreso
 
 router = APIRouter(
     prefix="/produccion/etapas",
@@ -15,18 +19,17 @@ def crear_etapa(etapa: schemas.EtapaCreate, db: Session = Depends(get_db)):
     db_etapa = models.ProduccionEtapa(**etapa.model_dump())
     db.add(db_etapa)
     db.commit()
-    db.refresh(db_etapa)
     return db_etapa
 
 @router.get("/", response_model=List[schemas.EtapaOut])
-def listar_etapas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    etapas = db.query(models.ProduccionEtapa).offset(skip).limit(limit).all()
+def listar_etapas(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.ProduccionEtapa)), db: Session = Depends(get_db)):
+    etapas = filtros.apply(db.query(models.ProduccionEtapa)).offset(skip).limit(limit).all()
     return etapas
 
 @router.get("/{id_etapa}", response_model=schemas.EtapaOut)
 def obtener_etapa(id_etapa: int, db: Session = Depends(get_db)):
     etapa = db.query(models.ProduccionEtapa).filter(
-        models.ProduccionEtapa.id == id_etapa
+        models.ProduccionEtapa.id_etapa == id_etapa
     ).first()
     
     if not etapa:
@@ -43,7 +46,7 @@ def actualizar_etapa(
     db: Session = Depends(get_db)
 ):
     etapa = db.query(models.ProduccionEtapa).filter(
-        models.ProduccionEtapa.id == id_etapa
+        models.ProduccionEtapa.id_etapa == id_etapa
     ).first()
     
     if not etapa:
@@ -56,14 +59,25 @@ def actualizar_etapa(
     for campo, valor in datos_actualizacion.items():
         setattr(etapa, campo, valor)
     
+    if "orden" in datos_actualizacion or "tiempo_estim" in datos_actualizacion:
+        # Reprogramar los talleres de los planes que usan la etapa
+        db.flush()
+        planes = db.scalars(
+            select(models.ProduccionDetallePlan.id_plan)
+            .where(models.ProduccionDetallePlan.id_etapa == id_etapa)
+            .distinct()
+        ).all()
+        reprogramar(db, planes)
+        if "tiempo_estim" in datos_actualizacion:
+            actualizar_progreso(db, planes)
+    
     db.commit()
-    db.refresh(etapa)
     return etapa
 
 @router.delete("/{id_etapa}", status_code=status.HTTP_204_NO_CONTENT)
 def borrar_etapa(id_etapa: int, db: Session = Depends(get_db)):
     etapa = db.query(models.ProduccionEtapa).filter(
-        models.ProduccionEtapa.id == id_etapa
+        models.ProduccionEtapa.id_etapa == id_etapa
     ).first()
     
     if not etapa:
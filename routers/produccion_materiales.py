@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from typing import List, Optional, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from dependencies import get_db, get_api_key
+from import_utils import import_csv
 import models, schemas
+from query_utils import ListFilters, list_filters
+from services.inventario import ajustar_stock, registrar_movimientos
+from services.materiales import faltantes_materiales
 
 router = APIRouter(
     prefix="/produccion/materiales",
@@ -12,21 +17,70 @@ router = APIRouter(
 
 @router.post("/", response_model=schemas.MaterialOut, status_code=status.HTTP_201_CREATED)
 def crear_material(material: schemas.MaterialCreate, db: Session = Depends(get_db)):
-    db_material = models.ProduccionMaterial(**material.model_dump())
+    datos = material.model_dump()
+    stock_inicial = datos.pop("stock_actual", None)
+    db_material = models.ProduccionMaterial(**datos, stock_actual=0)
     db.add(db_material)
+    db.flush()
+
+    # El stock inicial entra por el libro de movimientos
+    if stock_inicial:
+        registrar_movimientos(db, [{
+            "id_material": db_material.id_material,
+            "tipo": "AJUSTE",
+            "cantidad": stock_inicial,
+            "referencia": "Stock inicial",
+        }], permitir_negativo=True)
+
     db.commit()
-    db.refresh(db_material)
     return db_material
 
+@router.post("/import", response_model=schemas.ImportResult)
+def importar_materiales(archivo: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Importar el catálogo de materiales desde CSV; upsert por codigo_material.
+
+    El stock_actual del archivo no se escribe en la tabla: la diferencia con el
+    stock vigente entra al libro como AJUSTE en el mismo lote.
+    """
+    return import_csv(
+        db, archivo, schemas.MaterialCreate, models.ProduccionMaterial,
+        models.ProduccionMaterial.codigo_material,
+        campos_excluidos={"stock_actual"}, al_escribir=_ajustar_stock_importado
+    )
+
+def _ajustar_stock_importado(db: Session, filas: List[Tuple[schemas.MaterialCreate, set]]):
+    nuevos = {
+        datos.codigo_material: datos.stock_actual
+        for datos, campos in filas
+        if "stock_actual" in campos and datos.stock_actual is not None
+    }
+    if not nuevos:
+        return
+    ids = dict(db.execute(
+        select(models.ProduccionMaterial.codigo_material, models.ProduccionMaterial.id_material)
+        .where(models.ProduccionMaterial.codigo_material.in_(list(nuevos)))
+    ).all())
+    ajustar_stock(db, {ids[codigo]: stock for codigo, stock in nuevos.items()}, "Importación CSV")
+
 @router.get("/", response_model=List[schemas.MaterialOut])
-def listar_materiales(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    materiales = db.query(models.ProduccionMaterial).offset(skip).limit(limit).all()
+def listar_materiales(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.ProduccionMaterial)), db: Session = Depends(get_db)):
+    materiales = filtros.apply(db.query(models.ProduccionMaterial)).offset(skip).limit(limit).all()
     return materiales
 
+@router.get("/faltantes", response_model=List[schemas.MaterialFaltante])
+def listar_faltantes(
+    categoria: Optional[str] = Query(None),
+    incluir_presupuestos: bool = Query(False, description="Contar también proyectos en PRESUPUESTO"),
+    db: Session = Depends(get_db)
+):
+    """Materiales cuyo stock no cubre lo pendiente de los proyectos abiertos o
+    queda bajo el mínimo, con la cantidad sugerida a pedir"""
+    return faltantes_materiales(db, categoria, incluir_presupuestos)
+
 @router.get("/{id_material}", response_model=schemas.MaterialOut)
 def obtener_material(id_material: int, db: Session = Depends(get_db)):
     material = db.query(models.ProduccionMaterial).filter(
-        models.ProduccionMaterial.id == id_material
+        models.ProduccionMaterial.id_material == id_material
     ).first()
     
     if not material:
@@ -42,8 +96,11 @@ def actualizar_material(
     datos: schemas.MaterialUpdate, 
     db: Session = Depends(get_db)
 ):
+    datos_actualizacion = datos.model_dump(exclude_unset=True)
+    nuevo_stock = datos_actualizacion.pop("stock_actual", None)
+
     material = db.query(models.ProduccionMaterial).filter(
-        models.ProduccionMaterial.id == id_material
+        models.ProduccionMaterial.id_material == id_material
     ).first()
     
     if not material:
@@ -52,18 +109,20 @@ def actualizar_material(
             detail="Material no encontrado"
         )
     
-    datos_actualizacion = datos.model_dump(exclude_unset=True)
     for campo, valor in datos_actualizacion.items():
         setattr(material, campo, valor)
+
+    # El ajuste se calcula contra el stock bloqueado, no contra el leído arriba
+    if nuevo_stock is not None:
+        ajustar_stock(db, {id_material: nuevo_stock}, "Ajuste manual")
     
     db.commit()
-    db.refresh(material)
     return material
 
 @router.delete("/{id_material}", status_code=status.HTTP_204_NO_CONTENT)
 def borrar_material(id_material: int, db: Session = Depends(get_db)):
     material = db.query(models.ProduccionMaterial).filter(
-        models.ProduccionMaterial.id == id_material
+        models.ProduccionMaterial.id_material == id_material
     ).first()
     
     if not material:
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 from typing import List
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from bulk_utils import BULK_MAX_ITEMS, bulk_insert
 from dependencies import get_db, get_api_key
 import models, schemas
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(
     prefix="/produccion/materiales_proyecto",
@@ -15,18 +18,34 @@ def crear_mat_proy(mat: schemas.MatProyectoCreate, db: Session = Depends(get_db)
     db_material_proyecto = models.ProduccionMaterialProyecto(**mat.model_dump())
     db.add(db_material_proyecto)
     db.commit()
-    db.refresh(db_material_proyecto)
     return db_material_proyecto
 
+@router.post("/bulk", response_model=schemas.BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+def crear_mat_proy_bulk(
+    materiales: List[schemas.MatProyectoCreate] = Body(..., min_length=1, max_length=BULK_MAX_ITEMS),
+    db: Session = Depends(get_db)
+):
+    """Asignar varios materiales a proyectos en una sola transacción"""
+    try:
+        ids = bulk_insert(db, models.ProduccionMaterialProyecto, [m.model_dump() for m in materiales])
+        db.commit()
+        return {"created": len(ids), "ids": ids}
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error al asignar los materiales"
+        )
+
 @router.get("/", response_model=List[schemas.MatProyectoOut])
-def listar_mat_proy(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    materiales_proyecto = db.query(models.ProduccionMaterialProyecto).offset(skip).limit(limit).all()
+def listar_mat_proy(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.ProduccionMaterialProyecto)), db: Session = Depends(get_db)):
+    materiales_proyecto = filtros.apply(db.query(models.ProduccionMaterialProyecto)).offset(skip).limit(limit).all()
     return materiales_proyecto
 
 @router.get("/{id_mat_proy}", response_model=schemas.MatProyectoOut)
 def obtener_mat_proy(id_mat_proy: int, db: Session = Depends(get_db)):
     material_proyecto = db.query(models.ProduccionMaterialProyecto).filter(
-        models.ProduccionMaterialProyecto.id == id_mat_proy
+        models.ProduccionMaterialProyecto.id_mat_proy == id_mat_proy
     ).first()
     
     if not material_proyecto:
@@ -43,7 +62,7 @@ def actualizar_mat_proy(
     db: Session = Depends(get_db)
 ):
     material_proyecto = db.query(models.ProduccionMaterialProyecto).filter(
-        models.ProduccionMaterialProyecto.id == id_mat_proy
+        models.ProduccionMaterialProyecto.id_mat_proy == id_mat_proy
     ).first()
     
     if not material_proyecto:
@@ -57,13 +76,12 @@ def actualizar_mat_proy(
         setattr(material_proyecto, campo, valor)
     
     db.commit()
-    db.refresh(material_proyecto)
     return material_proyecto
 
 @router.delete("/{id_mat_proy}", status_code=status.HTTP_204_NO_CONTENT)
 def borrar_mat_proy(id_mat_proy: int, db: Session = Depends(get_db)):
     material_proyecto = db.query(models.ProduccionMaterialProyecto).filter(
-        models.ProduccionMaterialProyecto.id == id_mat_proy
+        models.ProduccionMaterialProyecto.id_mat_proy == id_mat_proy
     ).first()
     
     if not material_proyecto:
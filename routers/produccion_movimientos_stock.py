@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from bulk_utils import BULK_MAX_ITEMS
+from dependencies import get_db, get_api_key
+import models, schemas
+from query_utils import ListFilters, list_filters
+from services.inventario import registrar_movimientos, tomar_corte, verificar_stock
+
+router = APIRouter(
+    prefix="/produccion/movimientos_stock",
+    tags=["produccion", "materiales"],
+    dependencies=[Depends(get_api_key)]
+)
+
+@router.post("/", response_model=schemas.MovimientoStockOut, status_code=status.HTTP_201_CREATED)
+def registrar_movimiento(
+    movimiento: schemas.MovimientoStockCreate,
+    permitir_negativo: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """Registrar una entrada, salida o ajuste y aplicarlo al stock del material"""
+    try:
+        ids = registrar_movimientos(db, [movimiento.model_dump()], permitir_negativo)
+        db.commit()
+        return db.get(models.ProduccionMovimientoStock, ids[0])
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error al registrar el movimiento"
+        )
+
+@router.post("/bulk", response_model=schemas.BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+def registrar_movimientos_bulk(
+    movimientos: List[schemas.MovimientoStockCreate] = Body(..., min_length=1, max_length=BULK_MAX_ITEMS),
+    permitir_negativo: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """Registrar un lote de movimientos en una sola transacción; si alguno no
+    procede (material inexistente o stock insuficiente) no se aplica ninguno"""
+    try:
+        ids = registrar_movimientos(db, [m.model_dump() for m in movimientos], permitir_negativo)
+        db.commit()
+        return {"created": len(ids), "ids": ids}
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error al registrar los movimientos"
+        )
+
+@router.get("/", response_model=List[schemas.MovimientoStockOut])
+def listar_movimientos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.ProduccionMovimientoStock)), db: Session = Depends(get_db)):
+    movimientos = filtros.apply(db.query(models.ProduccionMovimientoStock)).offset(skip).limit(limit).all()
+    return movimientos
+
+@router.post("/corte", response_model=schemas.CorteStock)
+def crear_corte(db: Session = Depends(get_db)):
+    """Guardar el stock que da el libro para los materiales con movimientos nuevos"""
+    try:
+        corte = tomar_corte(db)
+        db.commit()
+        return corte
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al guardar el corte de stock"
+        )
+
+@router.get("/verificar", response_model=schemas.VerificacionStock)
+def verificar(id_material: Optional[int] = Query(None), db: Session = Depends(get_db)):
+    """Comparar stock_actual contra el último corte más los movimientos posteriores"""
+    try:
+        return verificar_stock(db, id_material)
+    except SQLAlchemyError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al verificar el stock"
+        )
+
+@router.get("/{id_movimiento}", response_model=schemas.MovimientoStockOut)
+def obtener_movimiento(id_movimiento: int, db: Session = Depends(get_db)):
+    movimiento = db.get(models.ProduccionMovimientoStock, id_movimiento)
+    if not movimiento:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Movimiento no encontrado"
+        )
+    return movimiento
@@ -1,8 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from datetime import date
 from sqlalchemy.orm import Session
 from dependencies import get_db, get_api_key
 import models, schemas
+from query_utils import ListFilters, list_filters
+from services.programacion import gantt, programar_todo, reprogramar
+from services.progreso import actualizar_progreso
+
+# Campos del plan que mueven su programación
+CAMPOS_PROGRAMACION = ("id_taller", "fecha_ini_est", "estado", "prioridad")
+
+# Campos del plan que cambian el avance de su proyecto
+CAMPOS_PROGRESO = ("id_proyecto", "estado")
 
 router = APIRouter(
     prefix="/produccion/planes",
@@ -19,10 +29,11 @@ def crear_plan(
     plan: schemas.PlanCreate, 
     db: Session = Depends(get_db)
 ):
-    db_plan = models.ProduccionPlan(**plan.model_dump())
+    db_plan = models.ProduccionPlan(**plan.model_dump(), fecha_ini_solicitada=plan.fecha_ini_est)
     db.add(db_plan)
+    db.flush()
+    actualizar_progreso(db, [db_plan.id_plan])
     db.commit()
-    db.refresh(db_plan)
     return db_plan
 
 @router.get(
@@ -32,15 +43,44 @@ def crear_plan(
 def listar_planes(
     skip: int = 0, 
     limit: int = 100, 
+    filtros: ListFilters = Depends(list_filters(models.ProduccionPlan)),
     db: Session = Depends(get_db)
 ):
     return (
-        db.query(models.ProduccionPlan)
+        filtros.apply(db.query(models.ProduccionPlan))
           .offset(skip)
           .limit(limit)
           .all()
     )
 
+@router.get(
+    "/gantt",
+    response_model=List[schemas.GanttPlan]
+)
+def obtener_gantt(
+    id_taller: Optional[int] = Query(None),
+    id_proyecto: Optional[int] = Query(None),
+    fecha_desde: Optional[date] = Query(None, description="Planes que terminan desde (YYYY-MM-DD)"),
+    fecha_hasta: Optional[date] = Query(None, description="Planes que empiezan hasta (YYYY-MM-DD)"),
+    incluir_completados: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """Planes con sus etapas programadas para un diagrama de Gantt"""
+    return gantt(db, id_taller, id_proyecto, fecha_desde, fecha_hasta, incluir_completados)
+
+@router.post(
+    "/programar",
+    response_model=schemas.ProgramacionResumen
+)
+def programar_planes(
+    id_taller: Optional[int] = Query(None, description="Solo los planes de este taller"),
+    db: Session = Depends(get_db)
+):
+    """Recalcular las fechas de todos los planes activos (o de un taller)"""
+    resumen = programar_todo(db, id_taller)
+    db.commit()
+    return resumen
+
 @router.get(
     "/{id_plan}", 
     response_model=schemas.PlanOut
@@ -82,11 +122,21 @@ def actualizar_plan(
         )
 
     cambios = datos.model_dump(exclude_unset=True)
+    taller_anterior, proyecto_anterior = plan.id_taller, plan.id_proyecto
     for campo, valor in cambios.items():
         setattr(plan, campo, valor)
+    # El inicio pedido limita la programación, que reescribe fecha_ini_est
+    if "fecha_ini_est" in cambios:
+        plan.fecha_ini_solicitada = cambios["fecha_ini_est"]
+
+    if any(campo in cambios for campo in CAMPOS_PROGRAMACION):
+        db.flush()
+        reprogramar(db, [id_plan], [taller_anterior])
+    if any(campo in cambios for campo in CAMPOS_PROGRESO):
+        db.flush()
+        actualizar_progreso(db, [id_plan], [proyecto_anterior])
 
     db.commit()
-    db.refresh(plan)
     return plan
 
 @router.delete(
@@ -109,5 +159,9 @@ def borrar_plan(
         )
 
     db.delete(plan)
+    db.flush()
+    # Libera su lugar en el taller
+    reprogramar(db, id_talleres=[plan.id_taller])
+    actualizar_progreso(db, id_proyectos=[plan.id_proyecto])
     db.commit()
     # FastAPI con 204_NO_CONTENT no devuelve body
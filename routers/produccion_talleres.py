@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from datetime import date
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from dependencies import get_db, get_api_key
 import models, schemas
-import json
+import logging
+from query_utils import ListFilters, list_filters
+from services.capacidad import CARGA_MAX_SEMANAS, carga_talleres
+from services.programacion import reprogramar
+
+logger = logging.getLogger(__name__)
+
+# Campos del taller que cambian la programación de sus planes
+CAMPOS_PROGRAMACION = ("capacidad", "estado")
 
 router = APIRouter(
     prefix="/produccion/talleres",
@@ -14,54 +23,22 @@ router = APIRouter(
 
 @router.post("/", response_model=schemas.TallerOut, status_code=status.HTTP_201_CREATED)
 def crear_taller(taller: schemas.TallerCreate, db: Session = Depends(get_db)):
-    print(f"=== CREANDO NUEVO TALLER ===")
-    
-    # Log de datos recibidos
-    try:
-        datos_recibidos = taller.model_dump()
-        print(f"Datos recibidos: {json.dumps(datos_recibidos, indent=2, default=str)}")
-    except Exception as e:
-        print(f"Error al serializar datos recibidos: {e}")
-        print(f"Datos recibidos (raw): {taller}")
-    
-    # Log de validación del schema
-    print(f"Tipo de schema recibido: {type(taller)}")
-    print(f"Campos del schema: {list(taller.model_fields.keys()) if hasattr(taller, 'model_fields') else 'No disponible'}")
+    datos_recibidos = taller.model_dump()
+
+    # El volcado del payload solo se calcula si DEBUG está activo para este módulo
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Creando taller con datos: %s", taller.model_dump_json())
     
     try:
-        # Crear el objeto de base de datos
-        print("Creando objeto ProduccionTaller...")
-        db_taller = models.ProduccionTaller(**taller.model_dump())
-        print(f"Objeto creado exitosamente: {type(db_taller)}")
-        
-        # Log de los datos que se van a insertar
-        print("Datos a insertar en la BD:")
-        for campo, valor in taller.model_dump().items():
-            print(f"  {campo}: {valor} (tipo: {type(valor)})")
-        
-        # Intentar guardar en la base de datos
-        print("Agregando objeto a la sesión de BD...")
+        db_taller = models.ProduccionTaller(**datos_recibidos)
         db.add(db_taller)
-        
-        print("Ejecutando commit...")
         db.commit()
         
-        print("Ejecutando refresh...")
-        db.refresh(db_taller)
-        
-        print(f"Taller creado exitosamente con ID: {db_taller.id}")
-        
-        # Log del objeto retornado
-        print("Datos del taller creado:")
-        for column in db_taller.__table__.columns:
-            valor = getattr(db_taller, column.name)
-            print(f"  {column.name}: {valor} (tipo: {type(valor)})")
-        
+        logger.info("Taller creado id=%s codigo=%s", db_taller.id, db_taller.codigo)
         return db_taller
         
     except IntegrityError as e:
-        print(f"Error de integridad en la BD: {e}")
-        print(f"Detalles del error: {e.orig}")
+        logger.warning("Error de integridad al crear taller: %s", e.orig)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -69,8 +46,7 @@ def crear_taller(taller: schemas.TallerCreate, db: Session = Depends(get_db)):
         )
     
     except Exception as e:
-        print(f"Error inesperado al crear taller: {e}")
-        print(f"Tipo de error: {type(e)}")
+        logger.exception("Error inesperado al crear taller")
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -78,50 +54,65 @@ def crear_taller(taller: schemas.TallerCreate, db: Session = Depends(get_db)):
         )
 
 @router.get("/", response_model=List[schemas.TallerOut])
-def listar_talleres(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    print(f"=== LISTANDO TALLERES ===")
-    print(f"Parámetros: skip={skip}, limit={limit}")
-    
+def listar_talleres(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.ProduccionTaller)), db: Session = Depends(get_db)):
     try:
-        talleres = db.query(models.ProduccionTaller).offset(skip).limit(limit).all()
-        print(f"Talleres encontrados: {len(talleres)}")
-        
-        # Log de cada taller encontrado
-        for i, taller in enumerate(talleres):
-            print(f"Taller {i+1}: ID={taller.id}, Codigo={taller.codigo}, Nombre={taller.nombre}")
-        
+        talleres = filtros.apply(db.query(models.ProduccionTaller)).offset(skip).limit(limit).all()
+        logger.debug("Talleres encontrados: %d (skip=%d, limit=%d)", len(talleres), skip, limit)
         return talleres
         
     except Exception as e:
-        print(f"Error al listar talleres: {e}")
+        logger.exception("Error al listar talleres")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al obtener talleres: {str(e)}"
         )
 
+@router.get("/carga", response_model=List[schemas.CargaTaller])
+def obtener_carga_talleres(
+    fecha_desde: Optional[date] = Query(None, description="Semana inicial (YYYY-MM-DD); por defecto la actual"),
+    semanas: int = Query(8, ge=1, le=CARGA_MAX_SEMANAS),
+    id_taller: Optional[int] = Query(None),
+    solo_sobrecargados: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """Planes activos, unidades y utilización por taller y semana.
+
+    Las unidades de cada plan se reparten entre las semanas que abarca; un
+    taller está sobrecargado en una semana si sus unidades superan su
+    capacidad semanal. Los talleres sin planes en el rango no aparecen.
+    """
+    try:
+        talleres = carga_talleres(db, fecha_desde, semanas, id_taller)
+    except Exception as e:
+        logger.exception("Error al calcular la carga de talleres")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al calcular la carga de talleres: {str(e)}"
+        )
+
+    if solo_sobrecargados:
+        talleres = [t for t in talleres if t["sobrecargado"]]
+    return talleres
+
 @router.get("/{id_taller}", response_model=schemas.TallerOut)
 def obtener_taller(id_taller: int, db: Session = Depends(get_db)):
-    print(f"=== OBTENIENDO TALLER ID: {id_taller} ===")
-    
     try:
         taller = db.query(models.ProduccionTaller).filter(
             models.ProduccionTaller.id == id_taller
         ).first()
         
         if not taller:
-            print(f"Taller con ID {id_taller} no encontrado")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, 
                 detail="Taller no encontrado"
             )
         
-        print(f"Taller encontrado: {taller.codigo} - {taller.nombre}")
         return taller
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error al obtener taller {id_taller}: {e}")
+        logger.exception("Error al obtener taller %s", id_taller)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al obtener taller: {str(e)}"
@@ -133,43 +124,41 @@ def actualizar_taller(
     datos: schemas.TallerUpdate, 
     db: Session = Depends(get_db)
 ):
-    print(f"=== ACTUALIZANDO TALLER ID: {id_taller} ===")
-    
     try:
-        # Log de datos recibidos
         datos_actualizacion = datos.model_dump(exclude_unset=True)
-        print(f"Datos de actualización: {json.dumps(datos_actualizacion, indent=2, default=str)}")
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Actualizando taller %s con datos: %s",
+                id_taller, datos.model_dump_json(exclude_unset=True)
+            )
         
         taller = db.query(models.ProduccionTaller).filter(
             models.ProduccionTaller.id == id_taller
         ).first()
         
         if not taller:
-            print(f"Taller con ID {id_taller} no encontrado para actualizar")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, 
                 detail="Taller no encontrado"
             )
         
-        print(f"Taller encontrado: {taller.codigo} - {taller.nombre}")
-        
-        # Aplicar actualizaciones
-        print("Aplicando actualizaciones:")
         for campo, valor in datos_actualizacion.items():
-            valor_anterior = getattr(taller, campo, None)
             setattr(taller, campo, valor)
-            print(f"  {campo}: {valor_anterior} -> {valor}")
+
+        if any(campo in datos_actualizacion for campo in CAMPOS_PROGRAMACION):
+            db.flush()
+            reprogramar(db, id_talleres=[id_taller])
         
         db.commit()
-        db.refresh(taller)
         
-        print(f"Taller actualizado exitosamente")
+        logger.info("Taller actualizado id=%s campos=%s", id_taller, list(datos_actualizacion))
         return taller
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error al actualizar taller {id_taller}: {e}")
+        logger.exception("Error al actualizar taller %s", id_taller)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -178,31 +167,26 @@ def actualizar_taller(
 
 @router.delete("/{id_taller}", status_code=status.HTTP_204_NO_CONTENT)
 def borrar_taller(id_taller: int, db: Session = Depends(get_db)):
-    print(f"=== BORRANDO TALLER ID: {id_taller} ===")
-    
     try:
         taller = db.query(models.ProduccionTaller).filter(
             models.ProduccionTaller.id == id_taller
         ).first()
         
         if not taller:
-            print(f"Taller con ID {id_taller} no encontrado para borrar")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, 
                 detail="Taller no encontrado"
             )
         
-        print(f"Taller encontrado para borrar: {taller.codigo} - {taller.nombre}")
-        
         db.delete(taller)
         db.commit()
         
-        print(f"Taller borrado exitosamente")
+        logger.info("Taller borrado id=%s", id_taller)
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error al borrar taller {id_taller}: {e}")
+        logger.exception("Error al borrar taller %s", id_taller)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
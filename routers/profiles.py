@@ -0,0 +1,55 @@
+# profiles.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse
+from typing import List
+from pydantic import BaseModel
+import io
+import pstats
+import profiling
+from dependencies import get_api_key
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["admin"],
+    dependencies=[Depends(get_api_key)]
+)
+
+class ProfileInfo(BaseModel):
+    id: str
+    method: str
+    route: str
+    path: str
+    status_code: int
+    duration_ms: float
+    timestamp: str
+
+@router.get("/", response_model=List[ProfileInfo])
+def get_profiles():
+    """Listar los perfiles guardados (del más reciente al más antiguo)"""
+    return profiling.list_profiles()
+
+@router.get("/{profile_id}")
+def download_profile(
+    profile_id: str,
+    formato: str = Query("prof", pattern="^(prof|texto)$", description="prof (pstats) o texto"),
+    limite: int = Query(40, ge=1, le=500, description="Funciones en el resumen de texto")
+):
+    """Descargar un perfil como archivo pstats o como resumen de texto"""
+    path = profiling.get_profile_path(profile_id)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil no encontrado"
+        )
+
+    if formato == "texto":
+        output = io.StringIO()
+        stats = pstats.Stats(path, stream=output)
+        stats.sort_stats("cumulative").print_stats(limite)
+        return PlainTextResponse(output.getvalue())
+
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename=f"{profile_id}.prof"
+    )
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 import models, schemas
 from dependencies import get_db, get_api_key
+from query_utils import ListFilters, list_filters
 
 router = APIRouter(
     prefix="/project-types",
@@ -15,12 +16,11 @@ def create_tipo(tipo: schemas.ProyectoTipoCreate, db: Session = Depends(get_db))
     db_tipo = models.ProyectoTipo(**tipo.model_dump())
     db.add(db_tipo)
     db.commit()
-    db.refresh(db_tipo)
     return db_tipo
 
 @router.get("/", response_model=List[schemas.ProyectoTipoOut])
-def read_tipos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tipos = db.query(models.ProyectoTipo).offset(skip).limit(limit).all()
+def read_tipos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.ProyectoTipo)), db: Session = Depends(get_db)):
+    tipos = filtros.apply(db.query(models.ProyectoTipo)).offset(skip).limit(limit).all()
     return tipos
 
 @router.get("/{id}", response_model=schemas.ProyectoTipoOut)
@@ -57,7 +57,6 @@ def update_tipo(
         setattr(db_tipo, campo, valor)
     
     db.commit()
-    db.refresh(db_tipo)
     return db_tipo
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
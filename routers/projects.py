@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import inspect, select
 from sqlalchemy.orm import Session
 from typing import List
 import models, schemas
 from dependencies import get_db, get_api_key
+from query_utils import ListFilters, list_filters, non_blob_columns
 
 router = APIRouter(
     prefix="/projects",
@@ -15,12 +17,11 @@ def create_proyecto(proy: schemas.ProyectoCreate, db: Session = Depends(get_db))
     db_proyecto = models.Proyecto(**proy.model_dump())
     db.add(db_proyecto)
     db.commit()
-    db.refresh(db_proyecto)
     return db_proyecto
 
 @router.get("/", response_model=List[schemas.ProyectoOut])
-def read_proyectos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    proyectos = db.query(models.Proyecto).offset(skip).limit(limit).all()
+def read_proyectos(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.Proyecto)), db: Session = Depends(get_db)):
+    proyectos = filtros.apply(db.query(models.Proyecto)).offset(skip).limit(limit).all()
     return proyectos
 
 @router.get("/{id}", response_model=schemas.ProyectoOut)
@@ -36,6 +37,58 @@ def read_proyecto(id: int, db: Session = Depends(get_db)):
         )
     return proyecto
 
+def _select_rows(db: Session, model, *criterios) -> list:
+    """Filas del modelo sin columnas BLOB, ordenadas por llave primaria"""
+    stmt = (
+        select(*non_blob_columns(model))
+        .where(*criterios)
+        .order_by(*inspect(model).primary_key)
+    )
+    return db.execute(stmt).all()
+
+@router.get("/{id}/overview", response_model=schemas.ProyectoOverview)
+def read_proyecto_overview(id: int, db: Session = Depends(get_db)):
+    """Proyecto con todas sus entidades relacionadas en un número fijo de consultas"""
+    proyecto = db.get(models.Proyecto, id)
+    if not proyecto:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail="Proyecto no encontrado"
+        )
+
+    # Una consulta por entidad; los hijos de segundo nivel se cargan con un
+    # único IN sobre los IDs del primer nivel
+    muestras = _select_rows(db, models.MolderiaMuestra, models.MolderiaMuestra.id_proyecto == id)
+    planes = _select_rows(db, models.ProduccionPlan, models.ProduccionPlan.id_proyecto == id)
+    facturas = _select_rows(db, models.FinancieroFactura, models.FinancieroFactura.id_proyecto == id)
+
+    muestra_ids = [m.id_muestra for m in muestras]
+    plan_ids = [p.id_plan for p in planes]
+    factura_ids = [f.id_factura for f in facturas]
+
+    return {
+        "proyecto": proyecto,
+        "moldes": _select_rows(db, models.MolderiaMolde, models.MolderiaMolde.id_proyecto == id),
+        "muestras": muestras,
+        "imagenes_muestras": _select_rows(
+            db, models.MolderiaImagenMuestra, models.MolderiaImagenMuestra.id_muestra.in_(muestra_ids)
+        ) if muestra_ids else [],
+        "planes": planes,
+        "detalles_plan": _select_rows(
+            db, models.ProduccionDetallePlan, models.ProduccionDetallePlan.id_plan.in_(plan_ids)
+        ) if plan_ids else [],
+        "materiales": _select_rows(
+            db, models.ProduccionMaterialProyecto, models.ProduccionMaterialProyecto.id_proyecto == id
+        ),
+        "branding": _select_rows(db, models.BrandingProyecto, models.BrandingProyecto.id_proyecto == id),
+        "ecommerce": _select_rows(db, models.EcommerceProyecto, models.EcommerceProyecto.id_proyecto == id),
+        "facturas": facturas,
+        "pagos": _select_rows(
+            db, models.FinancieroPago, models.FinancieroPago.id_factura.in_(factura_ids)
+        ) if factura_ids else [],
+        "gastos": _select_rows(db, models.FinancieroGasto, models.FinancieroGasto.id_proyecto == id),
+    }
+
 @router.put("/{id}", response_model=schemas.ProyectoOut)
 def update_proyecto(
     id: int, 
@@ -57,7 +110,6 @@ def update_proyecto(
         setattr(db_proyecto, campo, valor)
     
     db.commit()
-    db.refresh(db_proyecto)
     return db_proyecto
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -4,6 +4,7 @@ from typing import List
 from passlib.context import CryptContext
 import models, schemas
 from dependencies import get_db, get_api_key
+from query_utils import ListFilters, list_filters
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -20,12 +21,11 @@ def create_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)
     db_usuario = models.Usuario(**user_data, contrasena=hashed_password)
     db.add(db_usuario)
     db.commit()
-    db.refresh(db_usuario)
     return db_usuario
 
 @router.get("/", response_model=List[schemas.Usuario])
-def read_usuarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    usuarios = db.query(models.Usuario).offset(skip).limit(limit).all()
+def read_usuarios(skip: int = 0, limit: int = 100, filtros: ListFilters = Depends(list_filters(models.Usuario)), db: Session = Depends(get_db)):
+    usuarios = filtros.apply(db.query(models.Usuario)).offset(skip).limit(limit).all()
     return usuarios
 
 @router.get("/{user_id}", response_model=schemas.Usuario)
@@ -68,7 +68,6 @@ def update_usuario(
         setattr(db_usuario, campo, valor)
     
     db.commit()
-    db.refresh(db_usuario)
     return db_usuario
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -129,6 +128,5 @@ def create_initial_admin(db: Session = Depends(get_db)):
     
     db.add(db_usuario)
     db.commit()
-    db.refresh(db_usuario)
     
     return db_usuario
\ No newline at end of file
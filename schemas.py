@@ -287,6 +287,57 @@ class MuestraOut(MuestraBase):
     class Config: 
         from_attributes = True
 
+class MuestraFiltro(BaseModel):
+    id_proyecto: Optional[int] = None
+    id_molde: Optional[int] = None
+    estado: Optional[MuestraEstado] = None
+
+class MuestraBulkUpdate(BaseModel):
+    ids: Optional[List[int]] = None
+    filtro: Optional[MuestraFiltro] = None
+    cambios: MuestraUpdate
+
+class MuestraBulkDelete(BaseModel):
+    ids: Optional[List[int]] = None
+    filtro: Optional[MuestraFiltro] = None
+
+class DistribucionCiclo(BaseModel):
+    ciclo_0_7: int
+    ciclo_8_14: int
+    ciclo_15_30: int
+    ciclo_31_mas: int
+
+class MuestraMetricas(BaseModel):
+    muestras: int
+    entregadas: int
+    a_tiempo: int
+    con_retraso: int
+    vencidas_pendientes: int
+    tasa_retraso: Optional[float] = None
+    ciclo_promedio_dias: Optional[float] = None
+    ciclo_min_dias: Optional[int] = None
+    ciclo_max_dias: Optional[int] = None
+    retraso_promedio_dias: Optional[float] = None
+    distribucion_ciclo: DistribucionCiclo
+    costo_total: float
+    costo_promedio: Optional[float] = None
+
+class MuestraAnalyticsGrupo(MuestraMetricas):
+    clave: str
+
+class MuestrasAnalytics(BaseModel):
+    agrupar_por: str
+    fecha_desde: Optional[date] = None
+    fecha_hasta: Optional[date] = None
+    actualizado: Optional[datetime] = None
+    total: MuestraMetricas
+    grupos: List[MuestraAnalyticsGrupo]
+
+class RefrescoResumenMuestras(BaseModel):
+    desde: Optional[date] = None
+    filas: int
+    fecha_calculo: datetime
+
 class ImagenMuestraBase(BaseModel):
     id_muestra: int
     nombre_imagen: Optional[str]
@@ -347,6 +398,20 @@ class TallerOut(TallerBase):
     class Config: 
         from_attributes = True
 
+class CargaSemana(BaseModel):
+    semana: date
+    planes: int
+    unidades: float
+    utilizacion: Optional[float] = None
+    sobrecargado: bool
+
+class CargaTaller(BaseModel):
+    id_taller: int
+    nombre: str
+    capacidad: Optional[int] = None
+    semanas: List[CargaSemana]
+    sobrecargado: bool
+
 class EtapaBase(BaseModel):
     nombre: str
     descripcion: Optional[str]
@@ -405,6 +470,7 @@ class PlanUpdate(BaseModel):
 class PlanOut(PlanBase):
     id_plan: int
     cantidad_comp: int
+    progreso_porcentaje: float = 0
     fecha_ini_real: Optional[date]
     fecha_fin_real: Optional[date]
     fecha_creacion: datetime
@@ -441,6 +507,47 @@ class DetallePlanOut(DetallePlanBase):
     class Config: 
         from_attributes = True
 
+class DetallePlanFiltro(BaseModel):
+    id_plan: Optional[int] = None
+    id_etapa: Optional[int] = None
+    estado: Optional[str] = None
+    responsable: Optional[str] = None
+
+class DetallePlanBulkUpdate(BaseModel):
+    ids: Optional[List[int]] = None
+    filtro: Optional[DetallePlanFiltro] = None
+    cambios: DetallePlanUpdate
+
+class DetallePlanBulkDelete(BaseModel):
+    ids: Optional[List[int]] = None
+    filtro: Optional[DetallePlanFiltro] = None
+
+class GanttEtapa(BaseModel):
+    id_detalle: int
+    id_etapa: Optional[int] = None
+    nombre_etapa: Optional[str] = None
+    orden: Optional[int] = None
+    estado: Optional[str] = None
+    inicio: Optional[date] = None
+    fin: Optional[date] = None
+    pct_completado: float = 0
+
+class GanttPlan(BaseModel):
+    id_plan: int
+    codigo_plan: str
+    id_proyecto: Optional[int] = None
+    id_taller: Optional[int] = None
+    estado: Optional[str] = None
+    prioridad: Optional[str] = None
+    inicio: Optional[date] = None
+    fin: Optional[date] = None
+    etapas: List[GanttEtapa]
+
+class ProgramacionResumen(BaseModel):
+    planes: int
+    etapas_actualizadas: int
+    planes_actualizados: int
+
 class MaterialBase(BaseModel):
     codigo_material: str
     nombre: str
@@ -474,6 +581,54 @@ class MaterialOut(MaterialBase):
     class Config: 
         from_attributes = True
 
+class MovimientoStockCreate(BaseModel):
+    id_material: int
+    tipo: str = Field(..., pattern="^(ENTRADA|SALIDA|AJUSTE)$")
+    cantidad: float
+    id_proyecto: Optional[int] = None
+    referencia: Optional[str] = Field(None, max_length=100)
+    notas: Optional[str] = None
+    registrado_por: Optional[int] = None
+
+class MovimientoStockOut(MovimientoStockCreate):
+    id_movimiento: int
+    stock_resultante: Optional[float] = None
+    fecha: datetime
+    class Config: 
+        from_attributes = True
+
+class CorteStock(BaseModel):
+    ultimo_movimiento: Optional[int] = None
+    materiales: int
+
+class DiferenciaStock(BaseModel):
+    id_material: int
+    codigo_material: str
+    stock_actual: float
+    stock_esperado: float
+    diferencia: float
+
+class VerificacionStock(BaseModel):
+    revisados: int
+    con_diferencia: int
+    diferencias: List[DiferenciaStock]
+
+class MaterialFaltante(BaseModel):
+    id_material: int
+    codigo_material: str
+    nombre: str
+    categoria: Optional[str] = None
+    unidad_medida: Optional[str] = None
+    proveedor: Optional[str] = None
+    stock_actual: float
+    stock_minimo: float
+    requerido: float
+    proyectos: int
+    disponible: float
+    faltante: float
+    sugerido: float
+    costo_estimado: Optional[float] = None
+
 class MatProyectoBase(BaseModel):
     id_proyecto: int
     id_material: int
@@ -838,9 +993,24 @@ class FacturaUpdate(BaseModel):
 class FacturaOut(FacturaBase):
     id_factura: int
     fecha_creacion: datetime
+    monto_pagado: float = 0
+    saldo: float = 0
     class Config:
         from_attributes = True
 
+class DiferenciaSaldo(BaseModel):
+    id_factura: int
+    monto_pagado: float
+    monto_pagado_real: float
+    saldo: float
+    saldo_real: float
+
+class ConciliacionSaldos(BaseModel):
+    revisadas: int
+    con_diferencia: int
+    corregidas: int
+    diferencias: List[DiferenciaSaldo]
+
 # ——— PAGOS ———
 class PagoBase(BaseModel):
     numero_pago: str
@@ -954,4 +1124,147 @@ class CuentaCobrarUpdate(BaseModel):
 class CuentaCobrarOut(CuentaCobrarBase):
     id_cuenta_cobrar: int
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AntiguedadCliente(BaseModel):
+    id_cliente: int
+    nombre_cliente: Optional[str] = None
+    cuentas: int
+    dias_0_30: float
+    dias_31_60: float
+    dias_61_90: float
+    dias_90_mas: float
+    total: float
+
+class RecalculoAntiguedad(BaseModel):
+    fecha_corte: date
+    actualizadas: int
+
+# ——— RENTABILIDAD ———
+class RentabilidadMontos(BaseModel):
+    ingresos: float
+    gastos: float
+    costo_produccion: float
+    costo_materiales: float
+    costo_total: float
+    utilidad: float
+    margen: Optional[float] = None
+
+class RentabilidadProyecto(RentabilidadMontos):
+    id_proyecto: int
+    nombre_proyecto: Optional[str] = None
+
+class RentabilidadReporte(BaseModel):
+    fecha_desde: Optional[date] = None
+    fecha_hasta: Optional[date] = None
+    moneda: str
+    proyectos: List[RentabilidadProyecto]
+    totales: RentabilidadMontos
+    monedas_sin_tipo_cambio: List[str]
+
+# ——— FLUJO DE EFECTIVO ———
+class FlujoPeriodo(BaseModel):
+    periodo: date
+    moneda: str
+    entradas: float
+    salidas: float
+    neto: float
+    num_pagos: int
+    num_gastos: int
+
+class FlujoReconstruccion(BaseModel):
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+    tramos: int
+
+# ——— VISTA 360 DE PROYECTO ———
+class FacturaResumen(BaseModel):
+    id_factura: int
+    numero_factura: str
+    id_proyecto: int
+    serie: Optional[str] = None
+    folio: Optional[int] = None
+    fecha_emision: date
+    fecha_vencimiento: Optional[date] = None
+    fecha_pago: Optional[date] = None
+    subtotal: float
+    descuento: Optional[float] = 0
+    impuestos: float
+    total: float
+    moneda: Optional[str] = "MXN"
+    tipo_cambio: Optional[float] = 1.0
+    estado: Optional[str] = None
+    metodo_pago: Optional[str] = None
+    forma_pago: Optional[str] = None
+    uuid_sat: Optional[str] = None
+    nombre_archivo_pdf: Optional[str] = None
+    fecha_creacion: Optional[datetime] = None
+    monto_pagado: float = 0
+    saldo: float = 0
+    class Config:
+        from_attributes = True
+
+class PagoResumen(BaseModel):
+    id_pago: int
+    numero_pago: str
+    id_factura: int
+    monto: float
+    fecha_pago: date
+    metodo_pago: str
+    forma_pago: Optional[str] = None
+    referencia: Optional[str] = None
+    banco: Optional[str] = None
+    nombre_comprobante: Optional[str] = None
+    fecha_registro: Optional[datetime] = None
+    class Config:
+        from_attributes = True
+
+class GastoResumen(BaseModel):
+    id_gasto: int
+    numero_gasto: str
+    id_proyecto: Optional[int] = None
+    concepto: str
+    monto: float
+    moneda: Optional[str] = "MXN"
+    fecha_gasto: date
+    categoria: str
+    proveedor: Optional[str] = None
+    metodo_pago: Optional[str] = None
+    deducible: Optional[bool] = True
+    nombre_comprobante: Optional[str] = None
+    fecha_registro: Optional[datetime] = None
+    class Config:
+        from_attributes = True
+
+class ProyectoOverview(BaseModel):
+    proyecto: ProyectoOut
+    moldes: List[MoldeOut]
+    muestras: List[MuestraOut]
+    imagenes_muestras: List[ImagenMuestraOut]
+    planes: List[PlanOut]
+    detalles_plan: List[DetallePlanOut]
+    materiales: List[MatProyectoOut]
+    branding: List[BrandingProyectoOut]
+    ecommerce: List[EcommerceProyectoOut]
+    facturas: List[FacturaResumen]
+    pagos: List[PagoResumen]
+    gastos: List[GastoResumen]
+
+# ——— OPERACIONES MASIVAS ———
+class BulkCreateResponse(BaseModel):
+    created: int
+    ids: List[int]
+
+class BulkAffectedResponse(BaseModel):
+    affected: int
+
+class ImportRowError(BaseModel):
+    fila: int
+    errores: List[str]
+
+class ImportResult(BaseModel):
+    procesadas: int
+    creadas: int
+    actualizadas: int
+    con_error: int
+    errores: List[ImportRowError]
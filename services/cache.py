@@ -0,0 +1,84 @@
+"""Caché en memoria para agregados costosos, invalidada por escrituras en tablas.
+
+Cada INSERT/UPDATE/DELETE que pasa por el engine anota su tabla en la
+conexión, y la versión de la tabla se incrementa cuando la conexión vuelve al
+pool, ya confirmada o revertida la transacción. Incrementarla al ejecutar
+dejaría que otra petición que calcula antes del COMMIT guarde las filas
+anteriores con la versión nueva. Una entrada guarda las versiones de las
+tablas de las que depende y se descarta en cuanto alguna cambia, o al vencer
+su TTL.
+
+La caché y las versiones son por proceso: con varios workers, una escritura
+atendida por otro worker solo se refleja al vencer el TTL. Las sentencias SQL
+escritas como texto (text()) tampoco incrementan versiones.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+from database import engine
+
+# Entradas máximas; al superarlo se descarta la usada hace más tiempo
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = {}
+_entries: "OrderedDict[Hashable, Tuple[float, Tuple[int, ...], Any]]" = OrderedDict()
+
+
+@event.listens_for(engine, "after_execute")
+def _mark_table_written(conn, clauseelement, multiparams, params, execution_options, result):
+    if isinstance(clauseelement, UpdateBase):
+        conn.info.setdefault("tablas_escritas", set()).add(clauseelement.table.name)
+
+
+@event.listens_for(engine, "checkin")
+def _bump_table_versions(dbapi_connection, connection_record):
+    # connection_record.info es el mismo dict que Connection.info
+    tablas = connection_record.info.pop("tablas_escritas", None) if connection_record is not None else None
+    if tablas:
+        with _lock:
+            for nombre in tablas:
+                _versions[nombre] = _versions.get(nombre, 0) + 1
+
+
+def table_versions(tablas: Iterable[str]) -> Tuple[int, ...]:
+    with _lock:
+        return tuple(_versions.get(t, 0) for t in tablas)
+
+
+def get_or_compute(clave: Hashable, tablas: Iterable[str], ttl: float, calcular: Callable[[], Any]) -> Any:
+    """Valor en caché para `clave` o el resultado de `calcular()`.
+
+    `tablas` son los nombres de tabla (__tablename__) de los que depende el valor.
+    """
+    tablas = tuple(tablas)
+    versiones = table_versions(tablas)
+    ahora = time.monotonic()
+
+    with _lock:
+        entrada = _entries.get(clave)
+        if entrada is not None:
+            vence, versiones_guardadas, valor = entrada
+            if vence > ahora and versiones_guardadas == versiones:
+                _entries.move_to_end(clave)
+                return valor
+            del _entries[clave]
+
+    # Se calcula fuera del lock; si dos peticiones coinciden ambas consultan
+    valor = calcular()
+
+    with _lock:
+        _entries[clave] = (ahora + ttl, versiones, valor)
+        _entries.move_to_end(clave)
+        while len(_entries) > CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return valor
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
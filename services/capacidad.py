@@ -0,0 +1,133 @@
+"""Carga semanal de los talleres contra su capacidad.
+
+Un plan activo carga al taller en cada semana (lunes a domingo) que toca entre
+su inicio y su fin, reales o estimados (los estimados los calcula
+services.programacion). Su cantidad_prod se reparte entre esas semanas en
+proporción a los días del plan que caen en cada una. ProduccionTaller.capacidad
+son las unidades que el taller produce por semana (services.programacion
+programa contra el mismo límite), así que la utilización es unidades /
+capacidad y el taller está sobrecargado si la supera.
+
+El cálculo es una sola consulta agrupada por taller y semana, guardada en
+services.cache por unos segundos o hasta que cambian planes o talleres.
+"""
+import os
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import Date, and_, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from database import hoy
+from models import ProduccionPlan, ProduccionTaller
+from services import cache
+from services.cartera import dias_entre
+from services.programacion import ESTADOS_PROGRAMABLES
+
+# Segundos que un resultado puede servirse sin cambios en sus tablas
+CARGA_CACHE_TTL = float(os.getenv("CARGA_CACHE_TTL", "60"))
+
+# Semanas máximas por consulta
+CARGA_MAX_SEMANAS = 26
+
+TABLAS = (ProduccionPlan.__tablename__, ProduccionTaller.__tablename__)
+
+
+def _mayor(dialecto: str, a, b):
+    return func.max(a, b) if dialecto == "sqlite" else func.greatest(a, b)
+
+
+def _menor(dialecto: str, a, b):
+    return func.min(a, b) if dialecto == "sqlite" else func.least(a, b)
+
+
+def inicio_semana(fecha: date) -> date:
+    return fecha - timedelta(days=fecha.weekday())
+
+
+def _calcular(db: Session, desde: date, semanas: int, id_taller: Optional[int]) -> List[Dict]:
+    lunes = [desde + timedelta(weeks=i) for i in range(semanas)]
+    calendario = union_all(*(
+        select(literal(inicio, Date).label("inicio"), literal(inicio + timedelta(days=6), Date).label("fin"))
+        for inicio in lunes
+    )).subquery()
+
+    dialecto = db.get_bind().dialect.name
+    inicio_plan = func.coalesce(ProduccionPlan.fecha_ini_real, ProduccionPlan.fecha_ini_est)
+    fin_plan = func.coalesce(ProduccionPlan.fecha_fin_real, ProduccionPlan.fecha_fin_est, inicio_plan)
+
+    # Parte de cantidad_prod que cae en la semana: días del plan dentro de la
+    # semana / días del plan
+    dias_semana = dias_entre(
+        dialecto,
+        _mayor(dialecto, inicio_plan, calendario.c.inicio),
+        _menor(dialecto, fin_plan, calendario.c.fin),
+    ) + 1
+    dias_plan = dias_entre(dialecto, inicio_plan, fin_plan) + 1
+    unidades = func.coalesce(ProduccionPlan.cantidad_prod, 0) * dias_semana / func.nullif(dias_plan, 0)
+
+    stmt = (
+        select(
+            ProduccionTaller.id,
+            calendario.c.inicio,
+            func.count(ProduccionPlan.id_plan).label("planes"),
+            func.coalesce(func.sum(unidades), 0).label("unidades"),
+        )
+        .join(ProduccionPlan, ProduccionPlan.id_taller == ProduccionTaller.id)
+        .join(calendario, and_(inicio_plan <= calendario.c.fin, fin_plan >= calendario.c.inicio))
+        .where(ProduccionPlan.estado.in_(ESTADOS_PROGRAMABLES))
+        .group_by(ProduccionTaller.id, calendario.c.inicio)
+    )
+    if id_taller is not None:
+        stmt = stmt.where(ProduccionTaller.id == id_taller)
+
+    cargas = defaultdict(dict)
+    for fila in db.execute(stmt):
+        # SQLite devuelve los literales de fecha como texto
+        semana = fila.inicio if isinstance(fila.inicio, date) else date.fromisoformat(str(fila.inicio))
+        cargas[fila.id][semana] = (fila.planes, round(float(fila.unidades), 2))
+    if not cargas:
+        return []
+
+    talleres = db.execute(
+        select(ProduccionTaller.id, ProduccionTaller.nombre, ProduccionTaller.capacidad)
+        .where(ProduccionTaller.id.in_(list(cargas)))
+        .order_by(ProduccionTaller.id)
+    ).all()
+
+    resultado = []
+    for taller in talleres:
+        filas = []
+        for semana in lunes:
+            planes, unidades = cargas[taller.id].get(semana, (0, 0))
+            utilizacion = round(unidades / taller.capacidad * 100, 2) if taller.capacidad else None
+            filas.append({
+                "semana": semana,
+                "planes": planes,
+                "unidades": unidades,
+                "utilizacion": utilizacion,
+                "sobrecargado": bool(taller.capacidad) and unidades > taller.capacidad,
+            })
+        resultado.append({
+            "id_taller": taller.id,
+            "nombre": taller.nombre,
+            "capacidad": taller.capacidad,
+            "semanas": filas,
+            "sobrecargado": any(f["sobrecargado"] for f in filas),
+        })
+    return resultado
+
+
+def carga_talleres(
+    db: Session,
+    desde: Optional[date] = None,
+    semanas: int = 8,
+    id_taller: Optional[int] = None,
+) -> List[Dict]:
+    """Planes y unidades por taller y semana, con utilización y sobrecarga (con caché)"""
+    desde = inicio_semana(desde or hoy())
+    return cache.get_or_compute(
+        ("carga_talleres", desde, semanas, id_taller),
+        TABLAS,
+        CARGA_CACHE_TTL,
+        lambda: _calcular(db, desde, semanas, id_taller),
+    )
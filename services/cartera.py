@@ -0,0 +1,141 @@
+"""Antigüedad de saldos de cuentas por cobrar.
+
+El recálculo actualiza `dias_vencido` y `estado` de toda la cartera con un solo
+UPDATE por conjunto; el reporte por cliente sale de una sola consulta agrupada
+sobre esos valores almacenados.
+
+Uso (p. ej. desde cron, una vez al día):
+    python -m services.cartera
+    python -m services.cartera --fecha-corte 2024-06-30
+"""
+import argparse
+from datetime import date
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, and_, case, cast, func, literal, or_, select, update
+from sqlalchemy.orm import Session
+from database import hoy
+from models import CRMCliente, FinancieroCuentaCobrar
+
+# Estados que mantiene el recálculo. Cualquier otro (CANCELADA, INCOBRABLE,
+# EN_DISPUTA, ...) se asigna a mano y no se modifica.
+ESTADO_VIGENTE = "VIGENTE"
+ESTADO_VENCIDA = "VENCIDA"
+ESTADO_PAGADA = "PAGADA"
+ESTADOS_AUTOMATICOS = (ESTADO_VIGENTE, ESTADO_VENCIDA, ESTADO_PAGADA)
+
+# Cuentas que forman la cartera abierta del reporte
+ESTADOS_ABIERTOS = (ESTADO_VIGENTE, ESTADO_VENCIDA)
+
+# (nombre, día mínimo, día máximo) de cada tramo; None = sin límite
+TRAMOS = (
+    ("dias_0_30", 0, 30),
+    ("dias_31_60", 31, 60),
+    ("dias_61_90", 61, 90),
+    ("dias_90_mas", 91, None),
+)
+
+
+def dias_entre(dialecto: str, desde, hasta):
+    """Expresión SQL con los días de `desde` a `hasta` (fechas)"""
+    if dialecto == "mysql":
+        return func.datediff(hasta, desde)
+    if dialecto == "sqlite":
+        return cast(func.julianday(hasta) - func.julianday(desde), Integer)
+    # PostgreSQL y otros: la resta de fechas da días
+    return hasta - desde
+
+
+def recalcular_antiguedad(db: Session, fecha_corte: Optional[date] = None) -> int:
+    """Actualizar días vencidos y estado de las cuentas con estado automático.
+
+    Solo escribe las filas cuyo valor cambia, así que repetir el recálculo el
+    mismo día no genera escrituras. Devuelve las filas actualizadas (sin commit).
+    """
+    cuenta = FinancieroCuentaCobrar
+    corte = literal(fecha_corte or hoy())
+
+    dias = case(
+        (cuenta.fecha_vencimiento < corte, dias_entre(db.get_bind().dialect.name, cuenta.fecha_vencimiento, corte)),
+        else_=0,
+    )
+    estado = case(
+        (cuenta.saldo_pendiente <= 0, ESTADO_PAGADA),
+        (cuenta.fecha_vencimiento < corte, ESTADO_VENCIDA),
+        else_=ESTADO_VIGENTE,
+    )
+
+    stmt = (
+        update(cuenta)
+        .where(
+            or_(cuenta.estado.in_(ESTADOS_AUTOMATICOS), cuenta.estado.is_(None)),
+            or_(
+                cuenta.dias_vencido.is_(None),
+                cuenta.dias_vencido != dias,
+                cuenta.estado.is_(None),
+                cuenta.estado != estado,
+            ),
+        )
+        .values(dias_vencido=dias, estado=estado)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount
+
+
+def reporte_antiguedad(
+    db: Session,
+    id_cliente: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[Dict]:
+    """Saldo abierto por cliente y tramo de antigüedad, en una consulta agrupada"""
+    cuenta = FinancieroCuentaCobrar
+    dias = func.coalesce(cuenta.dias_vencido, 0)
+
+    columnas_tramo = []
+    for nombre, minimo, maximo in TRAMOS:
+        condicion = dias >= minimo if maximo is None else and_(dias >= minimo, dias <= maximo)
+        columnas_tramo.append(
+            func.sum(case((condicion, cuenta.saldo_pendiente), else_=0)).label(nombre)
+        )
+
+    total = func.sum(cuenta.saldo_pendiente).label("total")
+    stmt = (
+        select(
+            cuenta.id_cliente,
+            func.max(CRMCliente.nombre).label("nombre_cliente"),
+            func.count().label("cuentas"),
+            *columnas_tramo,
+            total,
+        )
+        .outerjoin(CRMCliente, CRMCliente.id_cliente == cuenta.id_cliente)
+        .where(cuenta.estado.in_(ESTADOS_ABIERTOS), cuenta.saldo_pendiente > 0)
+        .group_by(cuenta.id_cliente)
+        .order_by(total.desc(), cuenta.id_cliente)
+        .offset(skip)
+        .limit(limit)
+    )
+    if id_cliente is not None:
+        stmt = stmt.where(cuenta.id_cliente == id_cliente)
+
+    return [dict(fila._mapping) for fila in db.execute(stmt)]
+
+
+def main():
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Recalcular la antigüedad de la cartera")
+    parser.add_argument("--fecha-corte", type=date.fromisoformat, default=None,
+                        help="Fecha de corte YYYY-MM-DD (por defecto hoy)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        actualizadas = recalcular_antiguedad(db, args.fecha_corte)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Cuentas actualizadas: {actualizadas}")
+
+
+if __name__ == "__main__":
+    main()
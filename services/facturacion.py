@@ -0,0 +1,187 @@
+"""Monto pagado y saldo de facturas a partir de sus pagos.
+
+Los acumulados se actualizan con incrementos atómicos en SQL
+(MONTO_PAGADO = MONTO_PAGADO + :delta), sin leer y reescribir el valor, así que
+dos pagos simultáneos de la misma factura no se pisan.
+
+La conciliación recorre las facturas por lotes de llave primaria y compara los
+acumulados contra la suma real de pagos:
+    python -m services.facturacion
+    python -m services.facturacion --corregir --lote 2000
+"""
+import argparse
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, func, inspect, select, update
+from sqlalchemy.orm import Session
+from models import FinancieroFactura, FinancieroPago
+
+# Facturas revisadas por consulta de conciliación
+CONCILIACION_LOTE = 1000
+
+# Máximo de diferencias detalladas en la respuesta de la conciliación
+CONCILIACION_MAX_DETALLE = 100
+
+_columnas = inspect(FinancieroFactura).columns
+_facturas = FinancieroFactura.__table__
+
+# UPDATE ... WHERE ID_FACTURA = ? ejecutable como executemany
+_aplicar_delta = (
+    update(_facturas)
+    .where(_columnas.id_factura == bindparam("b_id_factura"))
+    .values({
+        _columnas.monto_pagado: _columnas.monto_pagado + bindparam("b_delta"),
+        _columnas.saldo: _columnas.saldo - bindparam("b_delta"),
+    })
+)
+
+# Suma de pagos de la factura de la fila que se actualiza
+_pagado_factura = (
+    select(func.coalesce(func.sum(FinancieroPago.monto), 0))
+    .where(FinancieroPago.id_factura == FinancieroFactura.id_factura)
+    .correlate(FinancieroFactura)
+    .scalar_subquery()
+)
+
+
+def _decimal(valor) -> Decimal:
+    return valor if isinstance(valor, Decimal) else Decimal(str(valor))
+
+
+def aplicar_pagos(db: Session, movimientos: Iterable[Tuple[int, object]]) -> None:
+    """Sumar (o restar, con monto negativo) pagos a sus facturas.
+
+    `movimientos` son pares (id_factura, monto); se agrupan por factura y se
+    aplican en un solo executemany. Responde 404 si alguna factura no existe.
+    No hace commit: va en la transacción del pago.
+    """
+    deltas: Dict[int, Decimal] = defaultdict(Decimal)
+    for id_factura, monto in movimientos:
+        deltas[id_factura] += _decimal(monto)
+
+    parametros = [
+        {"b_id_factura": id_factura, "b_delta": delta}
+        for id_factura, delta in deltas.items()
+        if delta
+    ]
+    if not parametros:
+        return
+
+    afectadas = db.execute(_aplicar_delta, parametros).rowcount
+    if afectadas != len(parametros):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Factura no encontrada"
+        )
+
+
+def conciliar_saldos(
+    db: Session,
+    corregir: bool = False,
+    lote: int = CONCILIACION_LOTE,
+    desde_id: int = 0,
+) -> Dict:
+    """Comparar monto pagado y saldo de cada factura contra sus pagos.
+
+    Una consulta agrupada por lote de IDs; con `corregir` las facturas con
+    diferencia del lote se recalculan con un UPDATE correlacionado y se
+    confirman por lote.
+    """
+    pagado_real = func.coalesce(func.sum(FinancieroPago.monto), 0)
+    resumen = {"revisadas": 0, "con_diferencia": 0, "corregidas": 0, "diferencias": []}
+
+    ultimo_id = desde_id
+    while True:
+        ids = select(FinancieroFactura.id_factura).where(
+            FinancieroFactura.id_factura > ultimo_id
+        ).order_by(FinancieroFactura.id_factura).limit(lote).subquery()
+
+        filas = db.execute(
+            select(
+                FinancieroFactura.id_factura,
+                FinancieroFactura.total,
+                FinancieroFactura.monto_pagado,
+                FinancieroFactura.saldo,
+                pagado_real.label("pagado_real"),
+            )
+            .join(ids, ids.c[FinancieroFactura.id_factura.key] == FinancieroFactura.id_factura)
+            .outerjoin(FinancieroPago, FinancieroPago.id_factura == FinancieroFactura.id_factura)
+            .group_by(
+                FinancieroFactura.id_factura,
+                FinancieroFactura.total,
+                FinancieroFactura.monto_pagado,
+                FinancieroFactura.saldo,
+            )
+            .order_by(FinancieroFactura.id_factura)
+        ).all()
+        if not filas:
+            break
+
+        ultimo_id = filas[-1].id_factura
+        resumen["revisadas"] += len(filas)
+
+        correcciones: List[int] = []
+        for fila in filas:
+            pagado = _decimal(fila.pagado_real)
+            saldo = _decimal(fila.total) - pagado
+            if _decimal(fila.monto_pagado) == pagado and _decimal(fila.saldo) == saldo:
+                continue
+
+            resumen["con_diferencia"] += 1
+            if len(resumen["diferencias"]) < CONCILIACION_MAX_DETALLE:
+                resumen["diferencias"].append({
+                    "id_factura": fila.id_factura,
+                    "monto_pagado": float(fila.monto_pagado),
+                    "monto_pagado_real": float(pagado),
+                    "saldo": float(fila.saldo),
+                    "saldo_real": float(saldo),
+                })
+            correcciones.append(fila.id_factura)
+
+        if corregir and correcciones:
+            # La suma se recalcula dentro del UPDATE y no se escribe la leída
+            # arriba: un pago confirmado entre la lectura y la corrección no
+            # se pierde
+            resumen["corregidas"] += db.execute(
+                update(FinancieroFactura)
+                .where(FinancieroFactura.id_factura.in_(correcciones))
+                .values(
+                    monto_pagado=_pagado_factura,
+                    saldo=FinancieroFactura.total - _pagado_factura,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+
+        if len(filas) < lote:
+            break
+
+    return resumen
+
+
+def main(argv: Optional[List[str]] = None):
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Conciliar monto pagado y saldo de facturas")
+    parser.add_argument("--corregir", action="store_true", help="Reescribir los acumulados con diferencias")
+    parser.add_argument("--lote", type=int, default=CONCILIACION_LOTE)
+    parser.add_argument("--desde-id", type=int, default=0, help="Reanudar a partir de este ID de factura")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        resumen = conciliar_saldos(db, corregir=args.corregir, lote=args.lote, desde_id=args.desde_id)
+    finally:
+        db.close()
+
+    print(f"Revisadas: {resumen['revisadas']}  con diferencia: {resumen['con_diferencia']}  "
+          f"corregidas: {resumen['corregidas']}")
+    for d in resumen["diferencias"]:
+        print(f"  factura {d['id_factura']}: pagado {d['monto_pagado']} -> {d['monto_pagado_real']}, "
+              f"saldo {d['saldo']} -> {d['saldo_real']}")
+
+
+if __name__ == "__main__":
+    main()
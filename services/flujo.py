@@ -0,0 +1,270 @@
+"""Flujo de efectivo diario materializado en FINANCIERO_FLUJO_DIARIO.
+
+Cada alta, cambio o baja de un pago (entrada) o gasto (salida) suma su delta a
+la fila (fecha, moneda) con un upsert atómico en la misma transacción. Los
+pagos toman la moneda de su factura.
+
+La reconstrucción recalcula un rango de fechas desde las tablas de origen, por
+tramos de días; sirve como carga inicial y para corregir desvíos (p. ej. tras
+cambiar la moneda de una factura con pagos):
+    python -m services.flujo
+    python -m services.flujo --desde 2023-01-01 --hasta 2023-12-31
+"""
+import argparse
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, inspect, literal, select, union_all, update
+from sqlalchemy.orm import Session
+from models import FinancieroFactura, FinancieroFlujoDiario, FinancieroGasto, FinancieroPago
+from services.rentabilidad import MONEDA_BASE
+
+# Días recalculados por transacción en la reconstrucción
+RECONSTRUCCION_DIAS = 31
+
+GRANULARIDADES = ("dia", "semana", "mes", "anio")
+
+_flujo = FinancieroFlujoDiario.__table__
+_columnas = inspect(FinancieroFlujoDiario).columns
+_SUMAS = ("entradas", "salidas", "num_pagos", "num_gastos")
+
+
+def _moneda(valor: Optional[str]) -> str:
+    return (valor or MONEDA_BASE).upper()
+
+
+def _upsert(db: Session, filas: List[Dict]) -> None:
+    """INSERT de las filas (fecha, moneda) o suma a las existentes, en un executemany"""
+    dialecto = db.get_bind().dialect.name
+    sumas = {getattr(_columnas, c).key for c in _SUMAS}
+
+    if dialecto == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(_flujo)
+        stmt = stmt.on_duplicate_key_update({c: _flujo.c[c] + stmt.inserted[c] for c in sumas})
+    elif dialecto in ("sqlite", "postgresql"):
+        if dialecto == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(_flujo)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_columnas.fecha, _columnas.moneda],
+            set_={c: _flujo.c[c] + stmt.excluded[c] for c in sumas},
+        )
+    else:
+        # Sin upsert nativo: UPDATE y, si la fila no existe, INSERT
+        for fila in filas:
+            claves = (_columnas.fecha == fila[_columnas.fecha.key], _columnas.moneda == fila[_columnas.moneda.key])
+            valores = {_flujo.c[c]: _flujo.c[c] + fila[c] for c in sumas}
+            if db.execute(update(_flujo).where(*claves).values(valores)).rowcount == 0:
+                db.execute(insert(_flujo).values(fila))
+        return
+
+    db.execute(stmt, filas)
+
+
+def aplicar_flujo(db: Session, movimientos: Iterable[Tuple[date, str, Dict]]) -> None:
+    """Sumar deltas (fecha, moneda, {entradas, salidas, num_pagos, num_gastos}).
+
+    Agrupa por (fecha, moneda) y descarta los deltas nulos. No hace commit.
+    """
+    acumulados: Dict[Tuple[date, str], Dict[str, object]] = defaultdict(
+        lambda: {"entradas": Decimal("0"), "salidas": Decimal("0"), "num_pagos": 0, "num_gastos": 0}
+    )
+    for fecha, moneda, deltas in movimientos:
+        fila = acumulados[(fecha, _moneda(moneda))]
+        for campo, valor in deltas.items():
+            fila[campo] += valor
+
+    filas = []
+    for (fecha, moneda), deltas in acumulados.items():
+        if not any(deltas.values()):
+            continue
+        fila = {_columnas.fecha.key: fecha, _columnas.moneda.key: moneda}
+        fila.update({getattr(_columnas, campo).key: valor for campo, valor in deltas.items()})
+        filas.append(fila)
+
+    if filas:
+        _upsert(db, filas)
+
+
+def _decimal(valor) -> Decimal:
+    return valor if isinstance(valor, Decimal) else Decimal(str(valor))
+
+
+def registrar_pagos(db: Session, pagos: Iterable[Tuple[int, date, object, int]]) -> None:
+    """Aplicar pagos (id_factura, fecha_pago, monto, signo) al flujo.
+
+    `signo` es 1 para sumar el pago y -1 para revertirlo. Las monedas de las
+    facturas se leen en una sola consulta.
+    """
+    pagos = list(pagos)
+    if not pagos:
+        return
+
+    ids = {id_factura for id_factura, _, _, _ in pagos}
+    monedas = dict(db.execute(
+        select(FinancieroFactura.id_factura, FinancieroFactura.moneda)
+        .where(FinancieroFactura.id_factura.in_(ids))
+    ).all())
+
+    aplicar_flujo(db, (
+        (fecha, monedas.get(id_factura), {"entradas": _decimal(monto) * signo, "num_pagos": signo})
+        for id_factura, fecha, monto, signo in pagos
+    ))
+
+
+def registrar_gastos(db: Session, gastos: Iterable[Tuple[date, Optional[str], object, int]]) -> None:
+    """Aplicar gastos (fecha_gasto, moneda, monto, signo) al flujo"""
+    aplicar_flujo(db, (
+        (fecha, moneda, {"salidas": _decimal(monto) * signo, "num_gastos": signo})
+        for fecha, moneda, monto, signo in gastos
+    ))
+
+
+def _reconstruir_tramo(db: Session, desde: date, hasta: date) -> None:
+    pagos = (
+        select(
+            FinancieroPago.fecha_pago.label("fecha"),
+            func.upper(func.coalesce(FinancieroFactura.moneda, MONEDA_BASE)).label("moneda"),
+            FinancieroPago.monto.label("entradas"),
+            literal(0).label("salidas"),
+            literal(1).label("num_pagos"),
+            literal(0).label("num_gastos"),
+        )
+        .outerjoin(FinancieroFactura, FinancieroFactura.id_factura == FinancieroPago.id_factura)
+        .where(FinancieroPago.fecha_pago.between(desde, hasta))
+    )
+    gastos = (
+        select(
+            FinancieroGasto.fecha_gasto,
+            func.upper(func.coalesce(FinancieroGasto.moneda, MONEDA_BASE)),
+            literal(0),
+            FinancieroGasto.monto,
+            literal(0),
+            literal(1),
+        )
+        .where(FinancieroGasto.fecha_gasto.between(desde, hasta))
+    )
+    movimientos = union_all(pagos, gastos).subquery()
+    agregados = select(
+        movimientos.c.fecha,
+        movimientos.c.moneda,
+        func.sum(movimientos.c.entradas),
+        func.sum(movimientos.c.salidas),
+        func.sum(movimientos.c.num_pagos),
+        func.sum(movimientos.c.num_gastos),
+    ).group_by(movimientos.c.fecha, movimientos.c.moneda)
+
+    db.execute(delete(_flujo).where(_columnas.fecha.between(desde, hasta)))
+    db.execute(
+        insert(_flujo).from_select(
+            [_columnas.fecha, _columnas.moneda, *(getattr(_columnas, c) for c in _SUMAS)],
+            agregados,
+        )
+    )
+
+
+def reconstruir_flujo(
+    db: Session,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    dias_por_tramo: int = RECONSTRUCCION_DIAS,
+) -> Dict:
+    """Recalcular el flujo del rango desde pagos y gastos; un commit por tramo.
+
+    Sin fechas se toma el rango completo de pagos y gastos.
+    """
+    if desde is None or hasta is None:
+        fechas = db.execute(select(
+            select(func.min(FinancieroPago.fecha_pago)).scalar_subquery(),
+            select(func.max(FinancieroPago.fecha_pago)).scalar_subquery(),
+            select(func.min(FinancieroGasto.fecha_gasto)).scalar_subquery(),
+            select(func.max(FinancieroGasto.fecha_gasto)).scalar_subquery(),
+        )).one()
+        minimos = [f for f in (fechas[0], fechas[2]) if f is not None]
+        maximos = [f for f in (fechas[1], fechas[3]) if f is not None]
+        if not minimos:
+            return {"desde": desde, "hasta": hasta, "tramos": 0}
+        desde = desde or min(minimos)
+        hasta = hasta or max(maximos)
+
+    tramos = 0
+    inicio = desde
+    while inicio <= hasta:
+        fin = min(inicio + timedelta(days=dias_por_tramo - 1), hasta)
+        _reconstruir_tramo(db, inicio, fin)
+        db.commit()
+        tramos += 1
+        inicio = fin + timedelta(days=1)
+
+    return {"desde": desde, "hasta": hasta, "tramos": tramos}
+
+
+def _inicio_periodo(fecha: date, granularidad: str) -> date:
+    if granularidad == "semana":
+        return fecha - timedelta(days=fecha.weekday())
+    if granularidad == "mes":
+        return fecha.replace(day=1)
+    if granularidad == "anio":
+        return fecha.replace(month=1, day=1)
+    return fecha
+
+
+def serie_flujo(
+    db: Session,
+    desde: date,
+    hasta: date,
+    granularidad: str = "dia",
+    moneda: Optional[str] = None,
+) -> List[Dict]:
+    """Entradas, salidas y neto por periodo y moneda a partir de las filas diarias"""
+    stmt = (
+        select(FinancieroFlujoDiario)
+        .where(FinancieroFlujoDiario.fecha.between(desde, hasta))
+        .order_by(FinancieroFlujoDiario.fecha, FinancieroFlujoDiario.moneda)
+    )
+    if moneda is not None:
+        stmt = stmt.where(FinancieroFlujoDiario.moneda == moneda.upper())
+
+    periodos: Dict[Tuple[date, str], Dict] = {}
+    for dia in db.scalars(stmt):
+        # Días cuyos movimientos se revirtieron por completo
+        if not (dia.num_pagos or dia.num_gastos or dia.entradas or dia.salidas):
+            continue
+        clave = (_inicio_periodo(dia.fecha, granularidad), dia.moneda)
+        fila = periodos.get(clave)
+        if fila is None:
+            fila = periodos[clave] = {
+                "periodo": clave[0], "moneda": clave[1],
+                "entradas": Decimal("0"), "salidas": Decimal("0"), "num_pagos": 0, "num_gastos": 0,
+            }
+        for campo in _SUMAS:
+            fila[campo] += getattr(dia, campo)
+
+    for fila in periodos.values():
+        fila["neto"] = fila["entradas"] - fila["salidas"]
+    return list(periodos.values())
+
+
+def main(argv: Optional[List[str]] = None):
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Reconstruir el flujo de efectivo diario")
+    parser.add_argument("--desde", type=date.fromisoformat, default=None)
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None)
+    parser.add_argument("--dias-por-tramo", type=int, default=RECONSTRUCCION_DIAS)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        resultado = reconstruir_flujo(db, args.desde, args.hasta, args.dias_por_tramo)
+    finally:
+        db.close()
+    print(f"Flujo reconstruido de {resultado['desde']} a {resultado['hasta']} en {resultado['tramos']} tramos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""Movimientos de stock de materiales y cortes para verificarlo.
+
+Cada movimiento suma su cantidad firmada a stock_actual con un UPDATE
+(stock_actual = stock_actual + :delta) sobre las filas bloqueadas del material y
+queda registrado en PRODUCCION_MOVIMIENTOS_STOCK en la misma transacción. Un
+lote en el que el stock de algún material pasaría por negativo se rechaza
+completo.
+
+Un corte guarda, por material, el stock que da el libro hasta cierto
+movimiento. Para verificar stock_actual basta sumar al último corte los
+movimientos posteriores, sin recorrer el libro completo:
+    python -m services.inventario --corte
+    python -m services.inventario --verificar
+"""
+import argparse
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import and_, bindparam, func, insert, inspect, literal, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from bulk_utils import bulk_insert
+from database import ahora
+from models import ProduccionMaterial, ProduccionMovimientoStock, ProduccionStockCorte
+
+TIPOS_MOVIMIENTO = ("ENTRADA", "SALIDA", "AJUSTE")
+
+# Un corte solo incluye movimientos con al menos esta antigüedad, para no
+# saltarse los de transacciones que aún no confirman
+CORTE_MARGEN_SEGUNDOS = 300
+
+# Máximo de diferencias detalladas en la verificación
+VERIFICACION_MAX_DETALLE = 100
+
+_columnas = inspect(ProduccionMaterial).columns
+_materiales = ProduccionMaterial.__table__
+
+# UPDATE ... WHERE ID_MATERIAL = ? ejecutable como executemany
+_aplicar_delta = (
+    update(_materiales)
+    .where(_columnas.id_material == bindparam("b_id_material"))
+    .values({_columnas.stock_actual: func.coalesce(_columnas.stock_actual, 0) + bindparam("b_delta")})
+)
+
+
+def _decimal(valor) -> Decimal:
+    return valor if isinstance(valor, Decimal) else Decimal(str(valor))
+
+
+def _cantidad_firmada(tipo: str, cantidad) -> Decimal:
+    cantidad = _decimal(cantidad)
+    if tipo not in TIPOS_MOVIMIENTO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de movimiento inválido: {tipo}"
+        )
+    if tipo == "AJUSTE":
+        if not cantidad:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La cantidad de un ajuste no puede ser cero"
+            )
+        return cantidad
+    if cantidad <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La cantidad de una entrada o salida debe ser mayor a cero"
+        )
+    return cantidad if tipo == "ENTRADA" else -cantidad
+
+
+def _stock_bloqueado(db: Session, ids: Iterable[int]) -> Dict[int, Decimal]:
+    """Stock de los materiales con sus filas bloqueadas hasta el commit"""
+    return {
+        id_material: _decimal(stock or 0)
+        for id_material, stock in db.execute(
+            select(ProduccionMaterial.id_material, ProduccionMaterial.stock_actual)
+            .where(ProduccionMaterial.id_material.in_(list(ids)))
+            .with_for_update()
+        )
+    }
+
+
+def registrar_movimientos(db: Session, movimientos: List[Dict], permitir_negativo: bool = False) -> List[int]:
+    """Aplicar movimientos al stock y registrarlos; devuelve sus IDs en orden.
+
+    `movimientos` son dicts con id_material, tipo y cantidad (positiva para
+    ENTRADA/SALIDA, con signo para AJUSTE) y opcionalmente id_proyecto,
+    referencia, notas y registrado_por. Los materiales se bloquean y los
+    movimientos se recorren en orden: si el stock de alguno pasa por negativo
+    en cualquier punto del lote responde 409, y 404 si algún material no
+    existe. Los deltas se aplican en un solo executemany y el stock nuevo queda
+    en los objetos ya cargados en la sesión. No hace commit.
+    """
+    filas = []
+    for movimiento in movimientos:
+        fila = dict(movimiento)
+        fila["cantidad"] = _cantidad_firmada(fila["tipo"], fila["cantidad"])
+        filas.append(fila)
+    if not filas:
+        return []
+
+    return _aplicar(db, filas, _stock_bloqueado(db, {fila["id_material"] for fila in filas}), permitir_negativo)
+
+
+def _aplicar(db: Session, filas: List[Dict], stock: Dict[int, Decimal], permitir_negativo: bool) -> List[int]:
+    """Recorrer en orden los movimientos firmados sobre el stock bloqueado,
+    aplicar los deltas y registrarlos"""
+    faltan = sorted({fila["id_material"] for fila in filas} - set(stock))
+    if faltan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Material no encontrado: {', '.join(map(str, faltan))}"
+        )
+
+    inicial = dict(stock)
+    insuficientes = set()
+    for fila in filas:
+        stock[fila["id_material"]] += fila["cantidad"]
+        fila["stock_resultante"] = stock[fila["id_material"]]
+        if stock[fila["id_material"]] < 0:
+            insuficientes.add(fila["id_material"])
+    if insuficientes and not permitir_negativo:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Stock insuficiente para los materiales: {', '.join(map(str, sorted(insuficientes)))}"
+        )
+
+    parametros = [
+        {"b_id_material": id_material, "b_delta": stock[id_material] - inicial[id_material]}
+        for id_material in stock
+        if stock[id_material] != inicial[id_material]
+    ]
+    if parametros:
+        db.execute(_aplicar_delta, parametros)
+
+    # Los objetos ya cargados reciben el stock nuevo sin volver a leerlos
+    for id_material in {fila["id_material"] for fila in filas}:
+        material = db.identity_map.get(db.identity_key(ProduccionMaterial, id_material))
+        if material is not None:
+            set_committed_value(material, "stock_actual", stock[id_material])
+
+    return bulk_insert(db, ProduccionMovimientoStock, filas)
+
+
+def ajustar_stock(db: Session, nuevos: Dict[int, object], referencia: str) -> List[int]:
+    """Llevar el stock de cada material al valor indicado con un AJUSTE por la
+    diferencia; los que ya tienen ese valor no generan movimiento. No hace commit.
+    """
+    stock = _stock_bloqueado(db, nuevos)
+    filas = [
+        {
+            "id_material": id_material,
+            "tipo": "AJUSTE",
+            "cantidad": _decimal(valor) - stock.get(id_material, 0),
+            "referencia": referencia,
+        }
+        for id_material, valor in nuevos.items()
+        if _decimal(valor) != stock.get(id_material)
+    ]
+    if not filas:
+        return []
+    return _aplicar(db, filas, stock, permitir_negativo=True)
+
+
+def _ultimo_corte():
+    """Último corte de cada material (id_material, ultimo_movimiento, stock)"""
+    ultimos = (
+        select(
+            ProduccionStockCorte.id_material,
+            func.max(ProduccionStockCorte.ultimo_movimiento).label("ultimo_movimiento"),
+        )
+        .group_by(ProduccionStockCorte.id_material)
+        .subquery()
+    )
+    return (
+        select(ProduccionStockCorte.id_material, ProduccionStockCorte.ultimo_movimiento, ProduccionStockCorte.stock)
+        .join(ultimos, and_(
+            ultimos.c.id_material == ProduccionStockCorte.id_material,
+            ultimos.c.ultimo_movimiento == ProduccionStockCorte.ultimo_movimiento,
+        ))
+        .subquery()
+    )
+
+
+def tomar_corte(db: Session, margen_segundos: int = CORTE_MARGEN_SEGUNDOS) -> Dict:
+    """Guardar un corte de los materiales con movimientos desde su corte anterior.
+
+    El stock del corte sale del libro (corte anterior + movimientos), no de
+    stock_actual, así que la verificación detecta también escrituras directas.
+    No hace commit.
+    """
+    hasta = ahora() - timedelta(seconds=margen_segundos)
+    limite = db.scalar(
+        select(func.max(ProduccionMovimientoStock.id_movimiento))
+        .where(ProduccionMovimientoStock.fecha <= hasta)
+    )
+    if limite is None:
+        return {"ultimo_movimiento": None, "materiales": 0}
+
+    corte = _ultimo_corte()
+    desde = func.coalesce(corte.c.ultimo_movimiento, 0)
+    nuevos = (
+        select(
+            ProduccionMovimientoStock.id_material,
+            literal(limite),
+            func.coalesce(corte.c.stock, 0) + func.sum(ProduccionMovimientoStock.cantidad),
+        )
+        .outerjoin(corte, corte.c.id_material == ProduccionMovimientoStock.id_material)
+        .where(
+            ProduccionMovimientoStock.id_movimiento > desde,
+            ProduccionMovimientoStock.id_movimiento <= limite,
+        )
+        .group_by(ProduccionMovimientoStock.id_material, corte.c.stock)
+    )
+    materiales = db.execute(
+        insert(ProduccionStockCorte).from_select(
+            [ProduccionStockCorte.id_material, ProduccionStockCorte.ultimo_movimiento, ProduccionStockCorte.stock],
+            nuevos,
+        )
+    ).rowcount
+    return {"ultimo_movimiento": limite, "materiales": materiales}
+
+
+def verificar_stock(db: Session, id_material: Optional[int] = None) -> Dict:
+    """Comparar stock_actual contra último corte + movimientos posteriores"""
+    corte = _ultimo_corte()
+    posteriores = (
+        select(func.coalesce(func.sum(ProduccionMovimientoStock.cantidad), 0))
+        .where(
+            ProduccionMovimientoStock.id_material == ProduccionMaterial.id_material,
+            ProduccionMovimientoStock.id_movimiento > func.coalesce(corte.c.ultimo_movimiento, 0),
+        )
+        .correlate(ProduccionMaterial, corte)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            ProduccionMaterial.id_material,
+            ProduccionMaterial.codigo_material,
+            ProduccionMaterial.stock_actual,
+            (func.coalesce(corte.c.stock, 0) + posteriores).label("esperado"),
+        )
+        .outerjoin(corte, corte.c.id_material == ProduccionMaterial.id_material)
+        .order_by(ProduccionMaterial.id_material)
+    )
+    if id_material is not None:
+        stmt = stmt.where(ProduccionMaterial.id_material == id_material)
+
+    resumen = {"revisados": 0, "con_diferencia": 0, "diferencias": []}
+    for fila in db.execute(stmt):
+        resumen["revisados"] += 1
+        actual = _decimal(fila.stock_actual or 0)
+        esperado = _decimal(fila.esperado)
+        if actual == esperado:
+            continue
+        resumen["con_diferencia"] += 1
+        if len(resumen["diferencias"]) < VERIFICACION_MAX_DETALLE:
+            resumen["diferencias"].append({
+                "id_material": fila.id_material,
+                "codigo_material": fila.codigo_material,
+                "stock_actual": actual,
+                "stock_esperado": esperado,
+                "diferencia": actual - esperado,
+            })
+    return resumen
+
+
+def main(argv: Optional[List[str]] = None):
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Cortes y verificación del stock de materiales")
+    parser.add_argument("--corte", action="store_true", help="Guardar un corte del libro de movimientos")
+    parser.add_argument("--verificar", action="store_true", help="Comparar stock_actual contra el libro")
+    args = parser.parse_args(argv)
+    if not (args.corte or args.verificar):
+        parser.error("indique --corte y/o --verificar")
+
+    db = SessionLocal()
+    try:
+        if args.corte:
+            resultado = tomar_corte(db)
+            db.commit()
+            print(f"Corte hasta el movimiento {resultado['ultimo_movimiento']}: {resultado['materiales']} materiales")
+        if args.verificar:
+            resumen = verificar_stock(db)
+            print(f"Revisados: {resumen['revisados']}  con diferencia: {resumen['con_diferencia']}")
+            for d in resumen["diferencias"]:
+                print(f"  material {d['id_material']} ({d['codigo_material']}): "
+                      f"stock {d['stock_actual']} esperado {d['stock_esperado']}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
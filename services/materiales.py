@@ -0,0 +1,123 @@
+"""Requerimientos de materiales (MRP) contra existencias.
+
+Lo pendiente de cada asignación es cantidad_req - cantidad_uso (nunca
+negativo); se suma por material para los proyectos abiertos en una sola
+consulta y se compara en memoria contra stock_actual y stock_minimo:
+  - faltante: lo requerido que el stock no cubre
+  - sugerido: lo que hay que pedir para cubrir lo requerido y quedar en el
+    stock mínimo
+
+El resultado se guarda en services.cache hasta que cambian materiales,
+asignaciones o proyectos (o vence MRP_CACHE_TTL). La caché es por proceso: con
+varios workers, un cambio atendido por otro worker se ve al vencer el TTL, por
+eso es de un minuto.
+"""
+import os
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from models import ProduccionMaterial, ProduccionMaterialProyecto, Proyecto
+from services import cache
+
+# Segundos que un resultado puede servirse sin cambios en sus tablas
+MRP_CACHE_TTL = float(os.getenv("MRP_CACHE_TTL", "60"))
+
+# Proyectos cuyos requerimientos siguen abiertos
+ESTADOS_PROYECTO_ABIERTOS = ("APROBADO", "EN_PROCESO", "PAUSADO")
+
+TABLAS = (
+    ProduccionMaterial.__tablename__,
+    ProduccionMaterialProyecto.__tablename__,
+    Proyecto.__tablename__,
+)
+
+_CERO = Decimal("0")
+
+
+def _calcular(db: Session, categoria: Optional[str], incluir_presupuestos: bool) -> List[Dict]:
+    estados = ESTADOS_PROYECTO_ABIERTOS + (("PRESUPUESTO",) if incluir_presupuestos else ())
+    usado = func.coalesce(ProduccionMaterialProyecto.cantidad_uso, 0)
+    pendiente = case(
+        (ProduccionMaterialProyecto.cantidad_req > usado, ProduccionMaterialProyecto.cantidad_req - usado),
+        else_=0,
+    )
+
+    requerimientos = (
+        select(
+            ProduccionMaterialProyecto.id_material.label("id_material"),
+            func.sum(pendiente).label("requerido"),
+            func.count(func.distinct(ProduccionMaterialProyecto.id_proyecto)).label("proyectos"),
+        )
+        .join(Proyecto, Proyecto.id_proyecto == ProduccionMaterialProyecto.id_proyecto)
+        .where(Proyecto.estado.in_(estados))
+        .group_by(ProduccionMaterialProyecto.id_material)
+        .subquery()
+    )
+
+    stmt = (
+        select(
+            ProduccionMaterial.id_material,
+            ProduccionMaterial.codigo_material,
+            ProduccionMaterial.nombre,
+            ProduccionMaterial.categoria,
+            ProduccionMaterial.unidad_medida,
+            ProduccionMaterial.stock_actual,
+            ProduccionMaterial.stock_minimo,
+            ProduccionMaterial.costo_unitario,
+            ProduccionMaterial.proveedor,
+            func.coalesce(requerimientos.c.requerido, 0).label("requerido"),
+            func.coalesce(requerimientos.c.proyectos, 0).label("proyectos"),
+        )
+        .outerjoin(requerimientos, requerimientos.c.id_material == ProduccionMaterial.id_material)
+        .where(func.coalesce(ProduccionMaterial.estado, "ACTIVO") == "ACTIVO")
+    )
+    if categoria is not None:
+        stmt = stmt.where(ProduccionMaterial.categoria == categoria)
+
+    resultado = []
+    for fila in db.execute(stmt):
+        stock = Decimal(fila.stock_actual or 0)
+        minimo = Decimal(fila.stock_minimo or 0)
+        requerido = Decimal(fila.requerido or 0)
+
+        faltante = max(requerido - stock, _CERO)
+        sugerido = max(requerido + minimo - stock, _CERO)
+        if not sugerido:
+            continue
+
+        costo = Decimal(fila.costo_unitario) * sugerido if fila.costo_unitario is not None else None
+        resultado.append({
+            "id_material": fila.id_material,
+            "codigo_material": fila.codigo_material,
+            "nombre": fila.nombre,
+            "categoria": fila.categoria,
+            "unidad_medida": fila.unidad_medida,
+            "proveedor": fila.proveedor,
+            "stock_actual": stock,
+            "stock_minimo": minimo,
+            "requerido": requerido,
+            "proyectos": fila.proyectos,
+            "disponible": stock - requerido,
+            "faltante": faltante,
+            "sugerido": sugerido,
+            "costo_estimado": round(costo, 2) if costo is not None else None,
+        })
+
+    # Primero lo que ya frena proyectos, luego lo que solo baja del mínimo
+    resultado.sort(key=lambda m: (-m["faltante"], -m["sugerido"], m["id_material"]))
+    return resultado
+
+
+def faltantes_materiales(
+    db: Session,
+    categoria: Optional[str] = None,
+    incluir_presupuestos: bool = False,
+) -> List[Dict]:
+    """Materiales con faltante o bajo mínimo y la cantidad sugerida a pedir (con caché)"""
+    return cache.get_or_compute(
+        ("faltantes_materiales", categoria, incluir_presupuestos),
+        TABLAS,
+        MRP_CACHE_TTL,
+        lambda: _calcular(db, categoria, incluir_presupuestos),
+    )
@@ -0,0 +1,205 @@
+"""Analítica del ciclo de vida de las muestras.
+
+MOLDERIA_MUESTRAS_RESUMEN guarda, por mes de creación, proyecto, molde y
+estado, los conteos y sumas de los que salen las métricas: ciclo (días de la
+creación a la entrega real), entregas a tiempo y con retraso, muestras sin
+entregar con la fecha estimada vencida, un histograma del ciclo y el costo.
+Como son sumas, cualquier agrupación se calcula sobre el resumen sin volver a
+leer las muestras.
+
+El resumen se reconstruye con un job nocturno (completo o desde un mes):
+    python -m services.muestras
+    python -m services.muestras --desde 2024-01-01
+"""
+import argparse
+from datetime import date
+from typing import Dict, List, Optional
+from sqlalchemy import Date, String, and_, case, cast, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from database import ahora
+from models import MolderiaMuestra, MolderiaMuestraResumen
+from services.cartera import dias_entre
+
+AGRUPACIONES = ("proyecto", "molde", "estado", "mes")
+
+# Tramos del histograma de ciclo: (columna, días desde, días hasta)
+_TRAMOS = (("ciclo_0_7", 0, 7), ("ciclo_8_14", 8, 14), ("ciclo_15_30", 15, 30), ("ciclo_31_mas", 31, None))
+
+_SUMAS = (
+    "muestras", "entregadas", "a_tiempo", "con_retraso", "vencidas_pendientes",
+    "dias_ciclo_total", "dias_retraso_total", "ciclo_0_7", "ciclo_8_14", "ciclo_15_30", "ciclo_31_mas",
+    "costo_total", "con_costo",
+)
+
+
+def _inicio_mes(dialecto: str, fecha):
+    """Expresión SQL con el primer día del mes de `fecha`"""
+    if dialecto == "mysql":
+        return cast(func.date_format(fecha, "%Y-%m-01"), Date)
+    if dialecto == "sqlite":
+        return func.date(fecha, "start of month")
+    return cast(func.date_trunc("month", fecha), Date)
+
+
+def _contar(condicion):
+    return func.coalesce(func.sum(case((condicion, 1), else_=0)), 0)
+
+
+def refrescar_resumen(db: Session, desde: Optional[date] = None) -> Dict:
+    """Reconstruir el resumen completo o a partir del mes de `desde` (con commit)"""
+    dialecto = db.get_bind().dialect.name
+    calculo = ahora()
+    muestra = MolderiaMuestra
+
+    # mes y estado son parte de la llave del resumen y no pueden quedar NULL:
+    # sin fecha de creación el mes sale de la entrega (real o estimada) y las
+    # muestras sin ninguna fecha quedan fuera
+    creacion = func.coalesce(muestra.fecha_creacion, muestra.fecha_entrega_real, muestra.fecha_entrega_estimada)
+    mes = _inicio_mes(dialecto, creacion)
+    molde = func.coalesce(muestra.id_molde, 0)
+    estado = func.coalesce(muestra.estado, literal("SIN_ESTADO"), type_=String)
+    entregada = muestra.fecha_entrega_real.isnot(None)
+    con_estimada = and_(entregada, muestra.fecha_entrega_estimada.isnot(None))
+    ciclo = case((entregada, dias_entre(dialecto, muestra.fecha_creacion, muestra.fecha_entrega_real)))
+    retraso = dias_entre(dialecto, muestra.fecha_entrega_estimada, muestra.fecha_entrega_real)
+
+    columnas = {
+        "mes": mes,
+        "id_proyecto": muestra.id_proyecto,
+        "id_molde": molde,
+        "estado": estado,
+        "muestras": func.count(),
+        "entregadas": _contar(entregada),
+        "a_tiempo": _contar(and_(con_estimada, retraso <= 0)),
+        "con_retraso": _contar(and_(con_estimada, retraso > 0)),
+        "vencidas_pendientes": _contar(and_(
+            muestra.fecha_entrega_real.is_(None),
+            muestra.fecha_entrega_estimada < calculo,
+        )),
+        "dias_ciclo_total": func.coalesce(func.sum(ciclo), 0),
+        "dias_retraso_total": func.coalesce(func.sum(case((and_(con_estimada, retraso > 0), retraso), else_=0)), 0),
+        "ciclo_min": func.min(ciclo),
+        "ciclo_max": func.max(ciclo),
+        **{
+            nombre: _contar(ciclo >= minimo if maximo is None else ciclo.between(minimo, maximo))
+            for nombre, minimo, maximo in _TRAMOS
+        },
+        "costo_total": func.coalesce(func.sum(muestra.costo), 0),
+        "con_costo": func.count(muestra.costo),
+        "fecha_calculo": literal(calculo),
+    }
+
+    seleccion = (
+        select(*(expr.label(nombre) for nombre, expr in columnas.items()))
+        .where(creacion.isnot(None))
+        .group_by(mes, muestra.id_proyecto, molde, estado)
+    )
+    borrado = delete(MolderiaMuestraResumen)
+    if desde is not None:
+        desde = desde.replace(day=1)
+        seleccion = seleccion.where(creacion >= desde)
+        borrado = borrado.where(MolderiaMuestraResumen.mes >= desde)
+
+    db.execute(borrado)
+    filas = db.execute(
+        insert(MolderiaMuestraResumen).from_select(
+            [getattr(MolderiaMuestraResumen, nombre) for nombre in columnas],
+            seleccion,
+        )
+    ).rowcount
+    db.commit()
+    return {"desde": desde, "filas": filas, "fecha_calculo": calculo}
+
+
+def _metricas(fila) -> Dict:
+    valores = {nombre: getattr(fila, nombre) or 0 for nombre in _SUMAS}
+    con_fecha = valores["a_tiempo"] + valores["con_retraso"]
+    return {
+        "muestras": valores["muestras"],
+        "entregadas": valores["entregadas"],
+        "a_tiempo": valores["a_tiempo"],
+        "con_retraso": valores["con_retraso"],
+        "vencidas_pendientes": valores["vencidas_pendientes"],
+        "tasa_retraso": round(valores["con_retraso"] / con_fecha * 100, 2) if con_fecha else None,
+        "ciclo_promedio_dias": round(valores["dias_ciclo_total"] / valores["entregadas"], 2) if valores["entregadas"] else None,
+        "ciclo_min_dias": fila.ciclo_min,
+        "ciclo_max_dias": fila.ciclo_max,
+        "retraso_promedio_dias": round(valores["dias_retraso_total"] / valores["con_retraso"], 2) if valores["con_retraso"] else None,
+        "distribucion_ciclo": {nombre: valores[nombre] for nombre, _, _ in _TRAMOS},
+        "costo_total": round(valores["costo_total"], 2),
+        "costo_promedio": round(valores["costo_total"] / valores["con_costo"], 2) if valores["con_costo"] else None,
+    }
+
+
+def analitica_muestras(
+    db: Session,
+    agrupar_por: str = "proyecto",
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    id_proyecto: Optional[int] = None,
+    id_molde: Optional[int] = None,
+) -> Dict:
+    """Métricas de ciclo, puntualidad y costo agrupadas, leídas del resumen"""
+    resumen = MolderiaMuestraResumen
+    dimension = {
+        "proyecto": resumen.id_proyecto,
+        "molde": resumen.id_molde,
+        "estado": resumen.estado,
+        "mes": resumen.mes,
+    }[agrupar_por]
+
+    criterios = []
+    if fecha_desde is not None:
+        criterios.append(resumen.mes >= fecha_desde.replace(day=1))
+    if fecha_hasta is not None:
+        criterios.append(resumen.mes <= fecha_hasta)
+    if id_proyecto is not None:
+        criterios.append(resumen.id_proyecto == id_proyecto)
+    if id_molde is not None:
+        criterios.append(resumen.id_molde == id_molde)
+
+    sumas = [func.sum(getattr(resumen, nombre)).label(nombre) for nombre in _SUMAS]
+    extremos = [func.min(resumen.ciclo_min).label("ciclo_min"), func.max(resumen.ciclo_max).label("ciclo_max")]
+
+    grupos = [
+        {"clave": str(fila.clave), **_metricas(fila)}
+        for fila in db.execute(
+            select(dimension.label("clave"), *sumas, *extremos)
+            .where(*criterios)
+            .group_by(dimension)
+            .order_by(dimension)
+        )
+    ]
+    total = db.execute(
+        select(*sumas, *extremos, func.max(resumen.fecha_calculo).label("fecha_calculo")).where(*criterios)
+    ).one()
+
+    return {
+        "agrupar_por": agrupar_por,
+        "fecha_desde": fecha_desde,
+        "fecha_hasta": fecha_hasta,
+        "actualizado": total.fecha_calculo,
+        "total": _metricas(total),
+        "grupos": grupos,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Reconstruir el resumen de muestras")
+    parser.add_argument("--desde", type=date.fromisoformat, default=None,
+                        help="Solo desde el mes de esta fecha (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        resultado = refrescar_resumen(db, args.desde)
+    finally:
+        db.close()
+    print(f"Resumen de muestras: {resultado['filas']} filas"
+          + (f" desde {resultado['desde']}" if resultado["desde"] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Programación de planes de producción por taller.
+
+Cada plan recorre sus etapas (PRODUCCION_DETALLE_PLAN) en el orden de
+ProduccionEtapa.orden; una etapa dura `tiempo_estim` días naturales, menos lo
+ya avanzado (pct_completado). Las etapas completadas no se reprograman.
+
+ProduccionTaller.capacidad son las unidades que el taller produce por semana,
+igual que en services.capacidad: la cantidad_prod de un plan se reparte por
+igual entre los días de sus etapas pendientes y cada día admite hasta
+capacidad / 7 unidades. Los planes activos del taller se asignan, por
+prioridad, a los primeros días con capacidad libre para todo el plan y no
+antes de su fecha_ini_solicitada; un plan que por sí solo supera ese límite
+ocupa el taller completo. Sin capacidad, el taller no limita.
+
+El resultado se escribe en fecha_ini_est/fecha_fin_est de las etapas y del
+plan (el inicio de su primera etapa pendiente y el fin de la última); solo se
+actualizan las filas cuyas fechas cambian.
+Un cambio en un plan solo mueve a los demás planes de su taller, así que la
+reprogramación incremental recalcula únicamente esos talleres:
+    python -m services.programacion
+    python -m services.programacion --taller 3
+"""
+import argparse
+import math
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import or_, select, true, update
+from sqlalchemy.orm import Session
+import database
+from models import ProduccionDetallePlan, ProduccionEtapa, ProduccionPlan, ProduccionTaller
+
+# Planes que ocupan capacidad y se reprograman
+ESTADOS_PROGRAMABLES = ("PLANIFICADO", "EN_PROCESO")
+
+# Días de una etapa sin tiempo_estim
+ETAPA_DIAS_DEFECTO = 1
+
+_PRIORIDAD = {"URGENTE": 0, "ALTA": 1, "MEDIA": 2, "BAJA": 3}
+
+
+def _dias_restantes(tiempo_estim, pct_completado) -> int:
+    dias = float(tiempo_estim) if tiempo_estim is not None else ETAPA_DIAS_DEFECTO
+    avance = min(max(float(pct_completado or 0), 0), 100)
+    return max(1, math.ceil(dias * (100 - avance) / 100))
+
+
+def _orden_plan(plan, hoy: date):
+    # Los planes ya en proceso conservan su lugar en el taller
+    return (
+        plan.estado != "EN_PROCESO",
+        _PRIORIDAD.get(plan.prioridad, _PRIORIDAD["MEDIA"]),
+        plan.fecha_ini_solicitada or hoy,
+        plan.id_plan,
+    )
+
+
+def _primer_inicio(carga: Dict[date, float], desde: date, dias: int, unidades_dia: float, limite: float) -> date:
+    """Primer día desde `desde` en que caben `dias` seguidos con `unidades_dia` más"""
+    inicio = desde
+    while True:
+        lleno = next((
+            dia for dia in (inicio + timedelta(days=i) for i in range(dias))
+            if carga.get(dia, 0) + unidades_dia > limite + 1e-9
+        ), None)
+        if lleno is None:
+            return inicio
+        inicio = lleno + timedelta(days=1)
+
+
+def _programar(db: Session, criterio, hoy: date) -> Dict:
+    planes = db.execute(
+        select(
+            ProduccionPlan.id_plan,
+            ProduccionPlan.id_taller,
+            ProduccionPlan.estado,
+            ProduccionPlan.prioridad,
+            ProduccionPlan.fecha_ini_est,
+            ProduccionPlan.fecha_fin_est,
+            ProduccionPlan.fecha_ini_solicitada,
+            ProduccionPlan.cantidad_prod,
+            ProduccionTaller.capacidad,
+        )
+        .outerjoin(ProduccionTaller, ProduccionTaller.id == ProduccionPlan.id_taller)
+        .where(criterio, ProduccionPlan.estado.in_(ESTADOS_PROGRAMABLES))
+    ).all()
+    if not planes:
+        return {"planes": 0, "etapas_actualizadas": 0, "planes_actualizados": 0}
+
+    etapas = defaultdict(list)
+    for detalle in db.execute(
+        select(
+            ProduccionDetallePlan.id_detalle,
+            ProduccionDetallePlan.id_plan,
+            ProduccionDetallePlan.estado,
+            ProduccionDetallePlan.fecha_ini_est,
+            ProduccionDetallePlan.fecha_fin_est,
+            ProduccionDetallePlan.fecha_ini_real,
+            ProduccionDetallePlan.pct_completado,
+            ProduccionEtapa.tiempo_estim,
+        )
+        .join(ProduccionPlan, ProduccionPlan.id_plan == ProduccionDetallePlan.id_plan)
+        .outerjoin(ProduccionEtapa, ProduccionEtapa.id_etapa == ProduccionDetallePlan.id_etapa)
+        .where(criterio, ProduccionPlan.estado.in_(ESTADOS_PROGRAMABLES))
+        .order_by(
+            ProduccionDetallePlan.id_plan,
+            ProduccionEtapa.orden.is_(None),
+            ProduccionEtapa.orden,
+            ProduccionDetallePlan.id_detalle,
+        )
+    ):
+        etapas[detalle.id_plan].append(detalle)
+
+    por_taller = defaultdict(list)
+    for plan in planes:
+        por_taller[plan.id_taller].append(plan)
+
+    cambios_etapas: List[Dict] = []
+    cambios_planes: List[Dict] = []
+    for id_taller, planes_taller in por_taller.items():
+        capacidad = planes_taller[0].capacidad if id_taller is not None else None
+        # Unidades ya asignadas a cada día del taller
+        carga: Dict[date, float] = defaultdict(float)
+
+        for plan in sorted(planes_taller, key=lambda p: _orden_plan(p, hoy)):
+            pendientes = [e for e in etapas[plan.id_plan] if e.estado != "COMPLETADO"]
+            if not pendientes:
+                continue
+
+            duraciones = [_dias_restantes(e.tiempo_estim, e.pct_completado) for e in pendientes]
+            cursor = max(plan.fecha_ini_solicitada or hoy, hoy)
+            if capacidad and capacidad > 0:
+                unidades_dia = (plan.cantidad_prod or 0) / sum(duraciones)
+                cursor = _primer_inicio(carga, cursor, sum(duraciones), unidades_dia, max(capacidad / 7, unidades_dia))
+                for i in range(sum(duraciones)):
+                    carga[cursor + timedelta(days=i)] += unidades_dia
+
+            inicio_plan = None
+            for etapa, dias in zip(pendientes, duraciones):
+                inicio = cursor
+                if etapa.estado == "EN_PROCESO" and etapa.fecha_ini_real:
+                    inicio = etapa.fecha_ini_real
+                fin = cursor + timedelta(days=dias - 1)
+                cursor = fin + timedelta(days=1)
+                inicio_plan = inicio_plan or inicio
+                if (etapa.fecha_ini_est, etapa.fecha_fin_est) != (inicio, fin):
+                    cambios_etapas.append({"id_detalle": etapa.id_detalle, "fecha_ini_est": inicio, "fecha_fin_est": fin})
+
+            fin_plan = cursor - timedelta(days=1)
+            if (plan.fecha_ini_est, plan.fecha_fin_est) != (inicio_plan, fin_plan):
+                cambios_planes.append({"id_plan": plan.id_plan, "fecha_ini_est": inicio_plan, "fecha_fin_est": fin_plan})
+
+    # UPDATE por llave primaria ejecutado como executemany
+    if cambios_etapas:
+        db.execute(update(ProduccionDetallePlan), cambios_etapas)
+    if cambios_planes:
+        db.execute(update(ProduccionPlan), cambios_planes)
+
+    return {
+        "planes": len(planes),
+        "etapas_actualizadas": len(cambios_etapas),
+        "planes_actualizados": len(cambios_planes),
+    }
+
+
+def reprogramar(
+    db: Session,
+    id_planes: Iterable[int] = (),
+    id_talleres: Iterable[Optional[int]] = (),
+    hoy: Optional[date] = None,
+) -> Dict:
+    """Reprogramar los talleres de estos planes, más los talleres indicados.
+
+    Los planes sin taller no comparten capacidad y se programan solos.
+    No hace commit: va en la transacción del cambio que lo provoca.
+    """
+    id_planes = set(id_planes)
+    talleres = {t for t in id_talleres if t is not None}
+    sueltos = set()
+    if id_planes:
+        for id_plan, id_taller in db.execute(
+            select(ProduccionPlan.id_plan, ProduccionPlan.id_taller)
+            .where(ProduccionPlan.id_plan.in_(id_planes))
+        ):
+            if id_taller is None:
+                sueltos.add(id_plan)
+            else:
+                talleres.add(id_taller)
+
+    if not talleres and not sueltos:
+        return {"planes": 0, "etapas_actualizadas": 0, "planes_actualizados": 0}
+
+    criterio = or_(ProduccionPlan.id_taller.in_(talleres), ProduccionPlan.id_plan.in_(sueltos))
+    return _programar(db, criterio, hoy or database.hoy())
+
+
+def programar_todo(db: Session, id_taller: Optional[int] = None, hoy: Optional[date] = None) -> Dict:
+    """Reprogramar todos los planes activos, o los de un taller (sin commit)"""
+    criterio = ProduccionPlan.id_taller == id_taller if id_taller is not None else true()
+    return _programar(db, criterio, hoy or database.hoy())
+
+
+def gantt(
+    db: Session,
+    id_taller: Optional[int] = None,
+    id_proyecto: Optional[int] = None,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    incluir_completados: bool = False,
+) -> List[Dict]:
+    """Planes con sus etapas programadas, listos para un diagrama de Gantt"""
+    stmt = select(ProduccionPlan).order_by(ProduccionPlan.id_taller, ProduccionPlan.fecha_ini_est, ProduccionPlan.id_plan)
+    if not incluir_completados:
+        stmt = stmt.where(ProduccionPlan.estado.notin_(("COMPLETADO", "CANCELADO")))
+    if id_taller is not None:
+        stmt = stmt.where(ProduccionPlan.id_taller == id_taller)
+    if id_proyecto is not None:
+        stmt = stmt.where(ProduccionPlan.id_proyecto == id_proyecto)
+    planes = db.scalars(stmt).all()
+    if not planes:
+        return []
+
+    etapas = defaultdict(list)
+    for detalle, nombre, orden in db.execute(
+        select(ProduccionDetallePlan, ProduccionEtapa.nombre, ProduccionEtapa.orden)
+        .outerjoin(ProduccionEtapa, ProduccionEtapa.id_etapa == ProduccionDetallePlan.id_etapa)
+        .where(ProduccionDetallePlan.id_plan.in_([p.id_plan for p in planes]))
+        .order_by(
+            ProduccionDetallePlan.id_plan,
+            ProduccionEtapa.orden.is_(None),
+            ProduccionEtapa.orden,
+            ProduccionDetallePlan.id_detalle,
+        )
+    ):
+        etapas[detalle.id_plan].append({
+            "id_detalle": detalle.id_detalle,
+            "id_etapa": detalle.id_etapa,
+            "nombre_etapa": nombre,
+            "orden": orden,
+            "estado": detalle.estado,
+            "inicio": detalle.fecha_ini_real or detalle.fecha_ini_est,
+            "fin": detalle.fecha_fin_real or detalle.fecha_fin_est,
+            "pct_completado": detalle.pct_completado or 0,
+        })
+
+    resultado = []
+    for plan in planes:
+        tareas = etapas[plan.id_plan]
+        inicios = [t["inicio"] for t in tareas if t["inicio"]]
+        fines = [t["fin"] for t in tareas if t["fin"]]
+        inicio = min(inicios) if inicios else plan.fecha_ini_real or plan.fecha_ini_est
+        fin = max(fines) if fines else plan.fecha_fin_real or plan.fecha_fin_est
+
+        # Planes que no tocan el rango pedido
+        if fecha_desde is not None and fin is not None and fin < fecha_desde:
+            continue
+        if fecha_hasta is not None and inicio is not None and inicio > fecha_hasta:
+            continue
+
+        resultado.append({
+            "id_plan": plan.id_plan,
+            "codigo_plan": plan.codigo_plan,
+            "id_proyecto": plan.id_proyecto,
+            "id_taller": plan.id_taller,
+            "estado": plan.estado,
+            "prioridad": plan.prioridad,
+            "inicio": inicio,
+            "fin": fin,
+            "etapas": tareas,
+        })
+    return resultado
+
+
+def main(argv: Optional[List[str]] = None):
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Reprogramar los planes de producción activos")
+    parser.add_argument("--taller", type=int, default=None, help="Solo los planes de este taller")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        resumen = programar_todo(db, args.taller)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Planes: {resumen['planes']}  etapas actualizadas: {resumen['etapas_actualizadas']}  "
+          f"planes actualizados: {resumen['planes_actualizados']}")
+
+
+if __name__ == "__main__":
+    main()
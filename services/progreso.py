@@ -0,0 +1,135 @@
+"""Avance de planes y proyectos a partir del avance de sus etapas.
+
+El avance de un plan es el promedio de pct_completado de sus etapas ponderado
+por ProduccionEtapa.tiempo_estim (una etapa COMPLETADO cuenta como 100). El de
+un proyecto pondera igual todas las etapas de sus planes no cancelados, así un
+plan largo pesa más que uno corto.
+
+Cada cambio recalcula con dos UPDATE correlacionados solo los planes y
+proyectos afectados. Los proyectos sin planes de producción conservan su
+progreso_porcentaje manual; los que solo tienen planes cancelados o sin etapas
+quedan en 0. Recalcular todo:
+    python -m services.progreso
+"""
+import argparse
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import case, func, select, true, update
+from sqlalchemy.orm import Session
+from models import ProduccionDetallePlan, ProduccionEtapa, ProduccionPlan, Proyecto
+from services.programacion import ETAPA_DIAS_DEFECTO
+
+# Planes que no cuentan para el avance del proyecto
+ESTADOS_PLAN_EXCLUIDOS = ("CANCELADO",)
+
+_peso = func.coalesce(ProduccionEtapa.tiempo_estim, ETAPA_DIAS_DEFECTO)
+_avance = case(
+    (ProduccionDetallePlan.estado == "COMPLETADO", 100),
+    else_=func.coalesce(ProduccionDetallePlan.pct_completado, 0),
+)
+# NULL si no hay etapas que promediar
+_promedio = func.round(func.sum(_avance * _peso) / func.nullif(func.sum(_peso), 0), 2)
+
+
+def _avance_plan():
+    return (
+        select(_promedio)
+        .select_from(ProduccionDetallePlan)
+        .outerjoin(ProduccionEtapa, ProduccionEtapa.id_etapa == ProduccionDetallePlan.id_etapa)
+        .where(ProduccionDetallePlan.id_plan == ProduccionPlan.id_plan)
+        .correlate(ProduccionPlan)
+        .scalar_subquery()
+    )
+
+
+def _avance_proyecto():
+    return (
+        select(_promedio)
+        .select_from(ProduccionDetallePlan)
+        .join(ProduccionPlan, ProduccionPlan.id_plan == ProduccionDetallePlan.id_plan)
+        .outerjoin(ProduccionEtapa, ProduccionEtapa.id_etapa == ProduccionDetallePlan.id_etapa)
+        .where(
+            ProduccionPlan.id_proyecto == Proyecto.id_proyecto,
+            func.coalesce(ProduccionPlan.estado, "").notin_(ESTADOS_PLAN_EXCLUIDOS),
+        )
+        .correlate(Proyecto)
+        .scalar_subquery()
+    )
+
+
+def _actualizar(db: Session, criterio_planes, criterio_proyectos) -> Dict:
+    planes = db.execute(
+        update(ProduccionPlan)
+        .where(criterio_planes)
+        .values(progreso_porcentaje=func.coalesce(_avance_plan(), ProduccionPlan.progreso_porcentaje))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    # Con planes pero sin etapas que cuenten (p. ej. todos cancelados) el
+    # avance es 0; sin planes se conserva el valor manual
+    con_planes = select(ProduccionPlan.id_plan).where(ProduccionPlan.id_proyecto == Proyecto.id_proyecto).exists()
+    proyectos = db.execute(
+        update(Proyecto)
+        .where(criterio_proyectos)
+        .values(progreso_porcentaje=func.coalesce(
+            _avance_proyecto(),
+            case((con_planes, 0), else_=Proyecto.progreso_porcentaje),
+        ))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return {"planes": planes, "proyectos": proyectos}
+
+
+def actualizar_progreso(
+    db: Session,
+    id_planes: Iterable[int] = (),
+    id_proyectos: Iterable[Optional[int]] = (),
+) -> Dict:
+    """Recalcular el avance de estos planes y de sus proyectos, más los
+    proyectos indicados (p. ej. el anterior de un plan que cambió de proyecto).
+
+    No hace commit: va en la transacción del cambio que lo provoca.
+    """
+    id_planes = set(id_planes)
+    proyectos = {p for p in id_proyectos if p is not None}
+    if id_planes:
+        proyectos.update(
+            p for p in db.scalars(
+                select(ProduccionPlan.id_proyecto)
+                .where(ProduccionPlan.id_plan.in_(id_planes))
+                .distinct()
+            ) if p is not None
+        )
+    if not id_planes and not proyectos:
+        return {"planes": 0, "proyectos": 0}
+
+    return _actualizar(
+        db,
+        ProduccionPlan.id_plan.in_(id_planes),
+        Proyecto.id_proyecto.in_(proyectos),
+    )
+
+
+def recalcular_todo(db: Session) -> Dict:
+    """Recalcular el avance de todos los planes y proyectos con planes (sin commit)"""
+    return _actualizar(
+        db,
+        true(),
+        Proyecto.id_proyecto.in_(select(ProduccionPlan.id_proyecto).where(ProduccionPlan.id_proyecto.isnot(None))),
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    from database import SessionLocal
+
+    argparse.ArgumentParser(description="Recalcular el avance de planes y proyectos").parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        resumen = recalcular_todo(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Planes: {resumen['planes']}  proyectos: {resumen['proyectos']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Rentabilidad por proyecto: ingresos facturados contra gastos y costos de producción.
+
+Cada fuente se resume con una sola consulta agrupada por proyecto y el
+resultado se guarda en services.cache hasta que alguna de sus tablas cambia.
+
+Montos en moneda base (MONEDA_BASE):
+  - facturas: total * tipo_cambio de cada factura
+  - gastos: no guardan tipo de cambio; se usa el de TIPOS_CAMBIO
+    (p. ej. "USD=17.20,EUR=18.75") o, si no está, el promedio ponderado de las
+    facturas del periodo en esa moneda. Las monedas sin ninguno de los dos se
+    reportan en `monedas_sin_tipo_cambio` y no se suman.
+  - planes y materiales: se registran en moneda base
+"""
+import os
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from models import (
+    FinancieroFactura, FinancieroGasto, ProduccionMaterialProyecto, ProduccionPlan, Proyecto,
+)
+from services import cache
+
+MONEDA_BASE = os.getenv("MONEDA_BASE", "MXN")
+
+# Segundos que un resultado puede servirse sin cambios en sus tablas
+RENTABILIDAD_CACHE_TTL = float(os.getenv("RENTABILIDAD_CACHE_TTL", "300"))
+
+# Facturas y planes con estos estados no cuentan
+ESTADOS_FACTURA_EXCLUIDOS = ("CANCELADA",)
+ESTADOS_PLAN_EXCLUIDOS = ("CANCELADO",)
+
+TABLAS = (
+    FinancieroFactura.__tablename__,
+    FinancieroGasto.__tablename__,
+    ProduccionPlan.__tablename__,
+    ProduccionMaterialProyecto.__tablename__,
+    Proyecto.__tablename__,
+)
+
+_CERO = Decimal("0")
+
+
+def _tipos_cambio_configurados() -> Dict[str, Decimal]:
+    tipos = {}
+    for par in os.getenv("TIPOS_CAMBIO", "").split(","):
+        moneda, _, valor = par.partition("=")
+        if moneda.strip() and valor.strip():
+            tipos[moneda.strip().upper()] = Decimal(valor.strip())
+    return tipos
+
+
+def _periodo(stmt, columna, fecha_desde: Optional[date], fecha_hasta: Optional[date]):
+    if fecha_desde is not None:
+        stmt = stmt.where(columna >= fecha_desde)
+    if fecha_hasta is not None:
+        stmt = stmt.where(columna <= fecha_hasta)
+    return stmt
+
+
+def _calcular(db: Session, fecha_desde: Optional[date], fecha_hasta: Optional[date], id_proyecto: Optional[int]) -> Dict:
+    filtro_proyecto = (lambda col: [col == id_proyecto]) if id_proyecto is not None else (lambda col: [])
+    moneda_factura = func.upper(func.coalesce(FinancieroFactura.moneda, MONEDA_BASE))
+    moneda_gasto = func.upper(func.coalesce(FinancieroGasto.moneda, MONEDA_BASE))
+
+    # 1) Facturas por proyecto y moneda: total original y convertido
+    facturas = _periodo(
+        select(
+            FinancieroFactura.id_proyecto,
+            moneda_factura.label("moneda"),
+            func.sum(FinancieroFactura.total).label("total"),
+            func.sum(FinancieroFactura.total * func.coalesce(FinancieroFactura.tipo_cambio, 1)).label("total_base"),
+        )
+        .where(
+            func.coalesce(FinancieroFactura.estado, "").notin_(ESTADOS_FACTURA_EXCLUIDOS),
+            *filtro_proyecto(FinancieroFactura.id_proyecto),
+        )
+        .group_by(FinancieroFactura.id_proyecto, moneda_factura),
+        FinancieroFactura.fecha_emision, fecha_desde, fecha_hasta,
+    )
+
+    # 2) Gastos por proyecto y moneda (se convierten después)
+    gastos = _periodo(
+        select(
+            FinancieroGasto.id_proyecto,
+            moneda_gasto.label("moneda"),
+            func.sum(FinancieroGasto.monto).label("total"),
+        )
+        .where(FinancieroGasto.id_proyecto.isnot(None), *filtro_proyecto(FinancieroGasto.id_proyecto))
+        .group_by(FinancieroGasto.id_proyecto, moneda_gasto),
+        FinancieroGasto.fecha_gasto, fecha_desde, fecha_hasta,
+    )
+
+    # 3) Costo real de producción
+    planes = _periodo(
+        select(ProduccionPlan.id_proyecto, func.sum(ProduccionPlan.costo_real).label("total"))
+        .where(
+            ProduccionPlan.id_proyecto.isnot(None),
+            func.coalesce(ProduccionPlan.estado, "").notin_(ESTADOS_PLAN_EXCLUIDOS),
+            *filtro_proyecto(ProduccionPlan.id_proyecto),
+        )
+        .group_by(ProduccionPlan.id_proyecto),
+        ProduccionPlan.fecha_ini_est, fecha_desde, fecha_hasta,
+    )
+
+    # 4) Costo de materiales asignados
+    materiales = _periodo(
+        select(ProduccionMaterialProyecto.id_proyecto, func.sum(ProduccionMaterialProyecto.costo_total).label("total"))
+        .where(ProduccionMaterialProyecto.id_proyecto.isnot(None), *filtro_proyecto(ProduccionMaterialProyecto.id_proyecto))
+        .group_by(ProduccionMaterialProyecto.id_proyecto),
+        ProduccionMaterialProyecto.fecha_asig, fecha_desde, fecha_hasta,
+    )
+
+    proyectos = defaultdict(lambda: {
+        "ingresos": _CERO, "gastos": _CERO, "costo_produccion": _CERO, "costo_materiales": _CERO,
+    })
+
+    # Tipo de cambio implícito de las facturas del periodo, por moneda
+    facturado = defaultdict(lambda: [_CERO, _CERO])
+    for fila in db.execute(facturas):
+        proyectos[fila.id_proyecto]["ingresos"] += fila.total_base or _CERO
+        facturado[fila.moneda][0] += fila.total or _CERO
+        facturado[fila.moneda][1] += fila.total_base or _CERO
+
+    tipos_cambio = {moneda: base / total for moneda, (total, base) in facturado.items() if total}
+    tipos_cambio.update(_tipos_cambio_configurados())
+    tipos_cambio[MONEDA_BASE] = Decimal("1")
+
+    sin_tipo_cambio = set()
+    for fila in db.execute(gastos):
+        tipo = tipos_cambio.get(fila.moneda)
+        if tipo is None:
+            sin_tipo_cambio.add(fila.moneda)
+            continue
+        proyectos[fila.id_proyecto]["gastos"] += (fila.total or _CERO) * tipo
+
+    for fila in db.execute(planes):
+        proyectos[fila.id_proyecto]["costo_produccion"] += fila.total or _CERO
+    for fila in db.execute(materiales):
+        proyectos[fila.id_proyecto]["costo_materiales"] += fila.total or _CERO
+
+    nombres = {}
+    if proyectos:
+        nombres = dict(db.execute(
+            select(Proyecto.id_proyecto, Proyecto.nombre_proyecto)
+            .where(Proyecto.id_proyecto.in_(list(proyectos)))
+        ).all())
+
+    resultado = []
+    totales = dict.fromkeys(
+        ("ingresos", "gastos", "costo_produccion", "costo_materiales", "costo_total", "utilidad"), _CERO
+    )
+    for id_proy in sorted(proyectos):
+        montos = proyectos[id_proy]
+        costo_total = montos["gastos"] + montos["costo_produccion"] + montos["costo_materiales"]
+        utilidad = montos["ingresos"] - costo_total
+        fila = {
+            "id_proyecto": id_proy,
+            "nombre_proyecto": nombres.get(id_proy),
+            **{k: round(v, 2) for k, v in montos.items()},
+            "costo_total": round(costo_total, 2),
+            "utilidad": round(utilidad, 2),
+            "margen": round(utilidad / montos["ingresos"] * 100, 2) if montos["ingresos"] else None,
+        }
+        resultado.append(fila)
+        for k in totales:
+            totales[k] += fila[k]
+
+    return {
+        "fecha_desde": fecha_desde,
+        "fecha_hasta": fecha_hasta,
+        "moneda": MONEDA_BASE,
+        "proyectos": resultado,
+        "totales": {
+            **totales,
+            "margen": round(totales["utilidad"] / totales["ingresos"] * 100, 2) if totales["ingresos"] else None,
+        },
+        "monedas_sin_tipo_cambio": sorted(sin_tipo_cambio),
+    }
+
+
+def rentabilidad_por_proyecto(
+    db: Session,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    id_proyecto: Optional[int] = None,
+) -> Dict:
+    """Ingresos, costos, utilidad y margen por proyecto del periodo (con caché)"""
+    return cache.get_or_compute(
+        ("rentabilidad", fecha_desde, fecha_hasta, id_proyecto),
+        TABLAS,
+        RENTABILIDAD_CACHE_TTL,
+        lambda: _calcular(db, fecha_desde, fecha_hasta, id_proyecto),
+    )
@@ -0,0 +1,130 @@
+# sql_instrumentation.py
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+from database import engine
+from metrics import DB_QUERIES_PER_REQUEST, DB_TIME_PER_REQUEST, get_route_template
+
+logger = logging.getLogger(__name__)
+
+# Logger dedicado para poder enviar el log de consultas lentas a otro destino
+slow_query_logger = logging.getLogger("sql.slow")
+
+# Umbral (ms) a partir del cual una consulta se registra como lenta
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Número de consultas por petición a partir del cual se sospecha un N+1
+QUERY_COUNT_WARNING = int(os.getenv("QUERY_COUNT_WARNING", "50"))
+
+
+class RequestQueryStats:
+    """Acumulador de consultas SQL de una petición"""
+
+    __slots__ = ("request", "query_count", "db_time")
+
+    def __init__(self, request: Optional[Request] = None):
+        self.request = request
+        self.query_count = 0
+        self.db_time = 0.0
+
+    @property
+    def route(self) -> str:
+        if self.request is None:
+            return "-"
+        return get_route_template(self.request)
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "sql_request_stats", default=None
+)
+
+
+def get_current_stats() -> Optional[RequestQueryStats]:
+    """Estadísticas SQL de la petición en curso (None fuera de una petición)"""
+    return _current_stats.get()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    _record_query(statement, executemany, elapsed)
+
+
+@event.listens_for(engine, "handle_error")
+def _handle_error(exception_context):
+    # Una consulta que falla (p. ej. por timeout) no pasa por
+    # after_cursor_execute: sacar aquí su inicio para no acumularlo en la
+    # conexión del pool y contar igual su tiempo
+    conn = exception_context.connection
+    if conn is None or exception_context.statement is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    context = exception_context.execution_context
+    _record_query(
+        exception_context.statement,
+        context.executemany if context is not None else False,
+        elapsed,
+        error=type(exception_context.original_exception).__name__,
+    )
+
+
+def _record_query(statement: str, executemany: bool, elapsed: float, error: Optional[str] = None):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.db_time += elapsed
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= SLOW_QUERY_MS:
+        # Nunca registrar los parámetros: pueden contener contraseñas o BLOBs
+        slow_query_logger.warning(
+            "slow_query route=%s duration_ms=%.1f executemany=%s error=%s statement=%s",
+            stats.route if stats is not None else "-",
+            elapsed_ms,
+            executemany,
+            error or "-",
+            " ".join(statement.split())
+        )
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        stats = RequestQueryStats(request)
+        token = _current_stats.set(stats)
+        start_time = time.perf_counter()
+
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        total_ms = (time.perf_counter() - start_time) * 1000
+        route = stats.route
+
+        DB_QUERIES_PER_REQUEST.labels(route).observe(stats.query_count)
+        DB_TIME_PER_REQUEST.labels(route).observe(stats.db_time)
+
+        if stats.query_count >= QUERY_COUNT_WARNING:
+            logger.warning(
+                "Posible patrón N+1: %s %s ejecutó %d consultas",
+                request.method, route, stats.query_count
+            )
+
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.query_count} queries", '
+            f"total;dur={total_ms:.1f}"
+        )
+        return response
@@ -0,0 +1,180 @@
+"""Asesor de índices: cruza las consultas registradas con los índices existentes.
+
+Lee sentencias SQL de:
+  - logs con líneas del logger "sql.slow" (slow_query ... statement=...)
+  - archivos .sql con sentencias separadas por ';'
+
+y reporta las columnas usadas en WHERE / JOIN ... ON / ORDER BY / GROUP BY que
+no son la primera columna de ningún índice, ordenadas por frecuencia y tiempo.
+Solo se consideran columnas calificadas (tabla.columna o alias.columna), que es
+como las genera SQLAlchemy.
+
+Los índices se toman de los modelos (models.py) o, con --reflejar, de la base
+indicada por DATABASE_URL.
+
+Uso:
+    python tools/index_advisor.py logs/app.log
+    python tools/index_advisor.py consultas.sql --reflejar
+    python tools/index_advisor.py logs/app.log --estricto   # código 1 si faltan índices
+"""
+import argparse
+import os
+import re
+import sys
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+SLOW_LINE = re.compile(r"slow_query .*?duration_ms=(?P<ms>[\d.]+).*? statement=(?P<sql>.+)$")
+
+_IDENT = r"[`\"\[]?(\w+)[`\"\]]?"
+
+TABLE_REF = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE|INTO)\s+{_IDENT}"
+    rf"(?:\s+(?:AS\s+)?(?!(?:WHERE|ON|SET|JOIN|LEFT|RIGHT|INNER|ORDER|GROUP|LIMIT|VALUES)\b){_IDENT})?",
+    re.IGNORECASE,
+)
+
+QUALIFIED_COLUMN = re.compile(rf"{_IDENT}\.{_IDENT}")
+
+# Cláusulas cuyas columnas se benefician de un índice
+CLAUSE = re.compile(
+    r"\b(WHERE|ON|ORDER\s+BY|GROUP\s+BY)\b(.*?)(?=\b(?:WHERE|JOIN|LEFT|RIGHT|INNER|ORDER\s+BY|GROUP\s+BY|HAVING|LIMIT|OFFSET|UNION|FOR\s+UPDATE)\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def leer_sentencias(ruta: str) -> Iterator[Tuple[str, float]]:
+    """(sentencia, duración en ms) de un log sql.slow o de un archivo .sql"""
+    with open(ruta, encoding="utf-8", errors="replace") as f:
+        contenido = f.read()
+
+    encontradas = False
+    for linea in contenido.splitlines():
+        m = SLOW_LINE.search(linea)
+        if m:
+            encontradas = True
+            yield m.group("sql"), float(m.group("ms"))
+
+    if not encontradas:
+        for sentencia in contenido.split(";"):
+            sentencia = " ".join(
+                l for l in sentencia.splitlines() if not l.strip().startswith("--")
+            ).strip()
+            if sentencia:
+                yield sentencia, 0.0
+
+
+def columnas_filtradas(sql: str) -> Set[Tuple[str, str]]:
+    """(tabla, columna) referenciadas en cláusulas que pueden usar un índice"""
+    alias: Dict[str, str] = {}
+    for m in TABLE_REF.finditer(sql):
+        tabla = m.group(1)
+        alias[tabla.upper()] = tabla
+        if m.group(2):
+            alias[m.group(2).upper()] = tabla
+
+    columnas = set()
+    for clausula in CLAUSE.finditer(sql):
+        for m in QUALIFIED_COLUMN.finditer(clausula.group(2)):
+            tabla = alias.get(m.group(1).upper())
+            if tabla is not None:
+                columnas.add((tabla.upper(), m.group(2).upper()))
+    return columnas
+
+
+def indices_modelos() -> Dict[str, Set[str]]:
+    """Primera columna de cada índice (y de la llave primaria) según models.py"""
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    os.environ.setdefault("API_KEY", "index-advisor")
+    import models
+
+    cubiertas: Dict[str, Set[str]] = defaultdict(set)
+    for tabla in models.Base.metadata.tables.values():
+        nombre = tabla.name.upper()
+        pk = list(tabla.primary_key.columns)
+        if pk:
+            cubiertas[nombre].add(pk[0].name.upper())
+        for indice in tabla.indexes:
+            cubiertas[nombre].add(list(indice.columns)[0].name.upper())
+        for columna in tabla.columns:
+            if columna.unique:
+                cubiertas[nombre].add(columna.name.upper())
+    return cubiertas
+
+
+def indices_reflejados() -> Dict[str, Set[str]]:
+    """Primera columna de cada índice existente en la base (DATABASE_URL)"""
+    from sqlalchemy import inspect
+    from database import engine
+
+    inspector = inspect(engine)
+    cubiertas: Dict[str, Set[str]] = defaultdict(set)
+    for tabla in inspector.get_table_names():
+        nombre = tabla.upper()
+        pk = inspector.get_pk_constraint(tabla).get("constrained_columns") or []
+        if pk:
+            cubiertas[nombre].add(pk[0].upper())
+        for indice in inspector.get_indexes(tabla):
+            if indice["column_names"] and indice["column_names"][0]:
+                cubiertas[nombre].add(indice["column_names"][0].upper())
+        for unico in inspector.get_unique_constraints(tabla):
+            cubiertas[nombre].add(unico["column_names"][0].upper())
+    return cubiertas
+
+
+def analizar(rutas: List[str], cubiertas: Dict[str, Set[str]]) -> List[dict]:
+    """Columnas sin índice con su número de apariciones y tiempo acumulado"""
+    usos: Dict[Tuple[str, str], dict] = {}
+    for ruta in rutas:
+        for sql, ms in leer_sentencias(ruta):
+            for tabla, columna in columnas_filtradas(sql):
+                if tabla not in cubiertas or columna in cubiertas[tabla]:
+                    continue
+                uso = usos.setdefault((tabla, columna), {"tabla": tabla, "columna": columna, "consultas": 0, "ms": 0.0})
+                uso["consultas"] += 1
+                uso["ms"] += ms
+    return sorted(usos.values(), key=lambda u: (u["ms"], u["consultas"]), reverse=True)
+
+
+def imprimir(faltantes: List[dict], origen: str) -> None:
+    if not faltantes:
+        print(f"Todas las columnas filtradas tienen índice ({origen})")
+        return
+
+    print(f"Columnas filtradas sin índice ({origen}):")
+    print(f"{'tabla':<32}{'columna':<28}{'consultas':>10}{'ms total':>12}")
+    for uso in faltantes:
+        print(f"{uso['tabla']:<32}{uso['columna']:<28}{uso['consultas']:>10}{uso['ms']:>12.1f}")
+
+    print("\nSugerencias:")
+    for uso in faltantes:
+        print(f"CREATE INDEX `ix_{uso['tabla']}_{uso['columna']}` ON `{uso['tabla']}` (`{uso['columna']}`);")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Reportar columnas filtradas sin índice")
+    parser.add_argument("archivos", nargs="+", help="Logs con sql.slow o archivos .sql")
+    parser.add_argument("--reflejar", action="store_true",
+                        help="Leer los índices de la base (DATABASE_URL) en lugar de models.py")
+    parser.add_argument("--estricto", action="store_true",
+                        help="Terminar con código 1 si hay columnas sin índice")
+    args = parser.parse_args(argv)
+
+    if args.reflejar:
+        cubiertas, origen = indices_reflejados(), "base de datos"
+    else:
+        cubiertas, origen = indices_modelos(), "models.py"
+
+    faltantes = analizar(args.archivos, cubiertas)
+    imprimir(faltantes, origen)
+
+    if args.estricto and faltantes:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()